@@ -1,3 +1,5 @@
+import collections
+import concurrent.futures
 import datetime
 import functools
 import json
@@ -5,6 +7,7 @@ import logging
 import os
 import shutil
 import subprocess
+import time
 import traceback
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
@@ -13,10 +16,23 @@ import conbenchlegacy.runner
 import pyarrow
 from benchclients import ConbenchClient
 
-from benchmarks import _sources
+from benchmarks import (
+    _isolation,
+    _memory,
+    _perf,
+    _profile,
+    _publish,
+    _r,
+    _sources,
+    _streaming,
+    _timing,
+)
 
 logging.basicConfig(format="%(levelname)s: %(message)s")
 
+# How often to look for the results of batched R cases
+R_RESULTS_POLL_SECONDS = 0.5
+
 
 def _now_formatted() -> str:
     now = datetime.datetime.now(datetime.timezone.utc)
@@ -77,12 +93,56 @@ class ConbenchCommunicator(conbenchlegacy.runner.Conbench):
         return self._conbench_client
 
     def publish(self, benchmark: dict) -> None:
-        self.conbench_client.post("/benchmark-results/", benchmark)
+        # Posted from a background thread, see _publish.py
+        _publish.publish("/benchmark-results/", benchmark, self._post)
+
+    def _post(self, path: str, benchmark: dict) -> None:
+        self.conbench_client.post(path, benchmark)
+
+    def execute_r_command(self, r_command: str, quiet: bool = True):
+        """Run R commands in one long-lived R session (see _r.py), rather
+        than starting R for each command."""
+        if not _r.enabled:
+            return super().execute_r_command(r_command, quiet=quiet)
+        return _r.session().execute(r_command, quiet=quiet)
+
+    @functools.cached_property
+    def r_info(self) -> Dict[str, str]:
+        version, _ = self.execute_r_command("cat(version[['version.string']], '\\n')")
+        return {"benchmark_language": "R", "benchmark_language_version": version}
+
+
+def _isolated(run):
+    """Wrap a benchmark's run() to run each case in a worker process, when
+    isolation is enabled (see _isolation.py)."""
+
+    @functools.wraps(run)
+    def wrapper(self, *args, **kwargs):
+        if args or getattr(self, "external", False) or not _isolation.enabled():
+            return run(self, *args, **kwargs)
+        return _isolation.run(self, kwargs)
+
+    return wrapper
 
 
 class Benchmark(conbenchlegacy.runner.Benchmark):
     arguments = []
-    options = {"cpu_count": {"type": int}}
+    options = {
+        "cpu_count": {"type": int},
+        "io_thread_count": {"type": int},
+        "memory_pool": {"type": str},
+        "profile": {"type": bool},
+    }
+    # Generated sources (see _generate.py) that can be passed by name, e.g.
+    # for scaling sweeps. Never part of "ALL" or "TEST".
+    sources_generated = []
+    # Where isolated workers run, see _isolation.py
+    isolation = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "run" in cls.__dict__:
+            cls.run = _isolated(cls.__dict__["run"])
 
     def __init__(self):
         super().__init__()
@@ -112,14 +172,32 @@ class Benchmark(conbenchlegacy.runner.Benchmark):
         cpu_count = options.get("cpu_count", None)
         if cpu_count is not None:
             pyarrow.set_cpu_count(cpu_count)
+        io_thread_count = options.get("io_thread_count", None)
+        if io_thread_count is not None:
+            pyarrow.set_io_thread_count(io_thread_count)
+        memory_pool = options.get("memory_pool", None)
+        if memory_pool is not None:
+            _memory.use_pool(memory_pool)
         tags, info, context = self._get_tags_info_context(case, extra_tags)
+        self.conbench.set_python_info_and_context(info, context)
         try:
-            benchmark, output = self.conbench.benchmark(
-                f,
+            # Time with our own engine (see _timing.py) rather than
+            # conbench.benchmark(), which only knows fixed iteration counts.
+            timer = _timing.Timer.from_options(
+                options,
+                drop_caches=self.conbench.sync_and_drop_caches,
+                probes=[_memory.MemoryProbe(), *_perf.probes()],
+            )
+            data, output = timer.run(f)
+            if options.get("profile", False):
+                self._profile(f, info)
+            benchmark, _ = self.conbench.record(
+                {"data": data, "unit": "s"},
                 self.name,
                 tags=tags,
                 info=info,
                 context=context,
+                optional_benchmark_info=self._optional_benchmark_info(timer.info()),
                 github=self.github_info,
                 options=options,
                 publish=os.environ.get("DRY_RUN") is None,
@@ -135,6 +213,14 @@ class Benchmark(conbenchlegacy.runner.Benchmark):
             )
         return benchmark, output
 
+    def _profile(self, f, info: Dict[str, Any]) -> None:
+        """Profile one more iteration, outside the timed ones (see
+        _profile.py), adding the profile's path to the info."""
+        try:
+            info["profile"] = _profile.profile(f, self.name)
+        except Exception:
+            logging.exception("failed to profile %s", self.name)
+
     def record(
         self,
         result,
@@ -153,6 +239,11 @@ class Benchmark(conbenchlegacy.runner.Benchmark):
         tags, info, context = self._get_tags_info_context(case, extra_tags)
         info.update(**extra_info)
         context.update(**extra_context)
+        # The work was done elsewhere: only what its runner measured, e.g.
+        # arrowbench for R, is recorded, not this process's memory use.
+        optional_benchmark_info = self._optional_benchmark_info(
+            optional_benchmark_info or {}
+        )
         benchmark_result, output = self.conbench.record(
             result=result,
             name=name,
@@ -160,7 +251,7 @@ class Benchmark(conbenchlegacy.runner.Benchmark):
             tags=tags,
             info=info,
             context=context,
-            optional_benchmark_info=optional_benchmark_info or {},
+            optional_benchmark_info=optional_benchmark_info,
             github=self.github_info,
             options=options,
             output=output,
@@ -172,24 +263,35 @@ class Benchmark(conbenchlegacy.runner.Benchmark):
 
         return benchmark_result, output
 
+    def _optional_benchmark_info(self, optional_benchmark_info):
+        if self.isolation:
+            optional_benchmark_info["isolation"] = self.isolation
+        return optional_benchmark_info
+
     def execute_command(self, command):
+        """Run a child process to completion, returning the last lines of
+        its stdout and stderr (see _streaming.py)."""
+        tails = {
+            name: collections.deque(maxlen=_streaming.log_tail)
+            for name in ("stdout", "stderr")
+        }
+        for name, line in self.stream_command(command):
+            tails[name].append(line)
+        return "".join(tails["stdout"]), "".join(tails["stderr"])
+
+    def stream_command(self, command):
+        """Run a child process, yielding ("stdout" or "stderr", line) as it
+        writes them (see _streaming.py)."""
         try:
             print("voltrondata/labs-benchmarks child process:", command)
-            result = subprocess.run(command, capture_output=True, check=True)
+            yield from _streaming.stream_command(command)
         except subprocess.CalledProcessError as e:
             print("voltrondata/labs-benchmarks child process was unsuccessful.")
-            stdout = e.stdout.decode() if e.stdout else ""
-            stderr = e.stderr.decode() if e.stderr else ""
-            print("stdout:\n", stdout)
-            print("stderr:\n", stderr)
+            print("stdout (last lines):\n", e.stdout)
+            print("stderr (last lines):\n", e.stderr)
             raise e
 
         print("voltrondata/labs-benchmarks child process was successful.")
-        stdout = result.stdout.decode() if result.stdout else ""
-        stderr = result.stderr.decode() if result.stderr else ""
-        print("stdout:\n", stdout)
-        print("stderr:\n", stderr)
-        return stdout, stderr
 
     def get_sources(self, source: Union[list, _sources.Source, str]) -> list:
         if isinstance(source, list):
@@ -197,21 +299,22 @@ class Benchmark(conbenchlegacy.runner.Benchmark):
         if isinstance(source, _sources.Source):
             return [source]
         if source == "ALL":
-            return [_sources.Source(s) for s in self.sources]
+            return [_sources.registry.get(s) for s in self.sources]
         if source == "TEST":
-            return [_sources.Source(s) for s in self.sources_test]
+            return [_sources.registry.get(s) for s in self.sources_test]
 
         available_sources = [
             "ALL",
             "TEST",
             *self.sources,
             *self.sources_test,
+            *self.sources_generated,
         ]
         if source not in available_sources:
             msg = f"Source can only be one of {available_sources}."
             raise Exception(msg)
 
-        return [_sources.Source(source)]
+        return [_sources.registry.get(source)]
 
     def version_case(self, case: tuple) -> Optional[int]:
         """
@@ -229,6 +332,11 @@ class Benchmark(conbenchlegacy.runner.Benchmark):
         self, options: Dict[str, Any], source: Optional[_sources.Source] = None
     ) -> Dict[str, Any]:
         cpu_tag = {"cpu_count": options.get("cpu_count", None)}
+        # Only tagged when chosen, so default runs keep their history
+        if options.get("io_thread_count") is not None:
+            cpu_tag["io_thread_count"] = options["io_thread_count"]
+        if options.get("memory_pool") is not None:
+            cpu_tag["memory_pool"] = options["memory_pool"].lower()
         if source:
             return {**source.tags, **cpu_tag}
         else:
@@ -265,6 +373,7 @@ class Benchmark(conbenchlegacy.runner.Benchmark):
         info: Dict[str, Any],
         context: Dict[str, Any],
         r_command: Optional[str] = None,
+        stack_trace: Optional[str] = None,
     ) -> Tuple[Dict[str, Any], None]:
         output = None
         tags["name"] = name
@@ -278,7 +387,12 @@ class Benchmark(conbenchlegacy.runner.Benchmark):
             "tags": tags,
             "info": info,
             "context": context,
-            "error": {"error": str(e), "stack_trace": traceback.format_exc()},
+            "error": {
+                "error": str(e),
+                "stack_trace": (
+                    traceback.format_exc() if stack_trace is None else stack_trace
+                ),
+            },
             "optional_benchmark_info": {},
             "machine_info": self.conbench.machine_info,
             "github": self.github_info,
@@ -300,6 +414,8 @@ class BenchmarkR(Benchmark):
         "iterations": {"type": int, "default": 1},
         "drop_caches": {"type": bool, "default": "false"},
         "cpu_count": {"type": int},
+        "io_thread_count": {"type": int},
+        "memory_pool": {"type": str},
     }
 
     def r_benchmark(
@@ -309,28 +425,18 @@ class BenchmarkR(Benchmark):
         options: Dict[str, Any],
         case: Optional[tuple] = None,
     ):
+        self._set_r_environment(options)
         tags, info, context = self._get_tags_info_context(case, extra_tags)
         self._add_r_tags_info_context(tags, info, context)
-        data = []
-        case_version = None
+        results = []
         iterations = options.get("iterations", 1)
-        error = None
 
         for _ in range(iterations):
             if options.get("drop_caches", False):
                 self.conbench.sync_and_drop_caches()
             try:
                 result, output = self._get_benchmark_result(command)
-                if "stats" in result:
-                    data += result["stats"]["data"]
-
-                if not case_version and "case_version" in result["tags"]:
-                    case_version = result["tags"]["case_version"]
-
-                # Note: If multiple iterations error, this will only return the error from the last one
-                if "error" in result and result["error"] is not None:
-                    error = result["error"]
-
+                results.append(result)
             except Exception as e:
                 return self._handle_error(
                     e=e,
@@ -342,6 +448,115 @@ class BenchmarkR(Benchmark):
                     r_command=command,
                 )
 
+        return self._record_r(results, output, tags, info, context, options, case)
+
+    def r_benchmarks(
+        self,
+        cases: List[Tuple[Dict[str, Any], Dict[str, Any], Optional[tuple]]],
+        options: Dict[str, Any],
+    ):
+        """Run cases of the arrowbench benchmark `r_name` in one arrowbench
+        call, yielding (result, output) for each case as it finishes
+        (output is None, since arrowbench is still running).
+
+        `cases` are (params, extra_tags, case) triples, where params are the
+        case's arguments to the arrowbench benchmark. Cases run one by one
+        with r_benchmark() when BENCHMARKS_R_BATCH=false. Caches are dropped
+        by arrowbench, before each iteration.
+        """
+        if len(cases) < 2 or not _r.batch:
+            for params, extra_tags, case in cases:
+                command = _r.run_one(self.r_name, params)
+                yield self.r_benchmark(command, extra_tags, options, case)
+            return
+
+        self._set_r_environment(options)
+        # Tags, info & context need R too, so they can't wait for the batch
+        pending = []
+        for params, extra_tags, case in cases:
+            tags, info, context = self._get_tags_info_context(case, extra_tags)
+            self._add_r_tags_info_context(tags, info, context)
+            pending.append((params, tags, info, context, case))
+
+        command = _r.run_benchmark(
+            self.r_name,
+            [p[0] for p in pending],
+            n_iter=options.get("iterations", 1),
+            drop_caches=options.get("drop_caches", False),
+        )
+        shutil.rmtree("results", ignore_errors=True)
+        seen = set()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self.conbench.execute_r_command, command, False)
+            while pending:
+                finished = future.done()
+                for result in self._get_new_results(seen):
+                    for i, (params, tags, info, context, case) in enumerate(pending):
+                        if _r.matches(result, params):
+                            del pending[i]
+                            yield self._record_r(
+                                [result], None, tags, info, context, options, case
+                            )
+                            break
+                if finished:
+                    break
+                time.sleep(R_RESULTS_POLL_SECONDS)
+
+            # Cases arrowbench didn't write results for. The stack trace is
+            # R's stderr, or the R error's traceback, taken while handling it.
+            try:
+                stack_trace = future.result()[1]
+                error = Exception(stack_trace or "arrowbench wrote no result")
+            except Exception as e:
+                error, stack_trace = e, traceback.format_exc()
+            for params, tags, info, context, case in pending:
+                yield self._handle_error(
+                    e=error,
+                    name=self.name,
+                    options=options,
+                    tags=tags,
+                    info=info,
+                    context=context,
+                    r_command=command,
+                    stack_trace=stack_trace,
+                )
+
+    def _set_r_environment(self, options: Dict[str, Any]) -> None:
+        memory_pool = options.get("memory_pool", None)
+        if memory_pool is not None:
+            _memory.use_pool(memory_pool)
+        # R's cpu count is passed to each R command, the IO thread count is
+        # read by Arrow C++ at startup.
+        io_thread_count = options.get("io_thread_count", None)
+        if io_thread_count is not None:
+            os.environ["ARROW_IO_THREADS"] = str(io_thread_count)
+
+    def _record_r(
+        self,
+        results: List[Dict[str, Any]],
+        output: Optional[str],
+        tags: Dict[str, Any],
+        info: Dict[str, Any],
+        context: Dict[str, Any],
+        options: Dict[str, Any],
+        case: Optional[tuple],
+    ):
+        data = []
+        case_version = None
+        error = None
+
+        for result in results:
+            if "stats" in result:
+                data += result["stats"]["data"]
+
+            if not case_version and "case_version" in result["tags"]:
+                case_version = result["tags"]["case_version"]
+
+            # Note: If multiple iterations error, this will only return the error from the last one
+            if "error" in result and result["error"] is not None:
+                error = result["error"]
+
         if case_version:
             tags["case_version"] = case_version
 
@@ -354,7 +569,7 @@ class BenchmarkR(Benchmark):
             error=error,
             case=case,
             output=output,
-            optional_benchmark_info=result.get("optional_benchmark_info") or {},
+            optional_benchmark_info=results[-1].get("optional_benchmark_info") or {},
         )
 
     def r_cpu_count(self, options: Dict[str, Any]):
@@ -373,6 +588,23 @@ class BenchmarkR(Benchmark):
 
         return data, output
 
+    def _get_new_results(self, seen: set) -> List[Dict[str, Any]]:
+        """Results arrowbench has finished writing since the last call, in
+        the order it wrote them."""
+        results = []
+        for path in [Path("results", self.r_name), Path("results", self.name)]:
+            files = path.resolve().glob("*.json")
+            for file in sorted(files, key=lambda f: (f.stat().st_mtime, f)):
+                if file in seen:
+                    continue
+                try:
+                    with open(file) as json_file:
+                        results.append(json.load(json_file))
+                except ValueError:
+                    continue  # Still being written
+                seen.add(file)
+        return results
+
     def _get_results_path(self) -> str:
         # R benchmark name can match object name (`r_name`) or Python name (`.name`)
         for path in [Path("results", self.r_name), Path("results", self.name)]:
@@ -400,6 +632,9 @@ class BenchmarkPythonR(BenchmarkR):
     options = {
         "language": {"type": str, "choices": ["Python", "R"]},
         "cpu_count": {"type": int},
+        "io_thread_count": {"type": int},
+        "memory_pool": {"type": str},
+        "profile": {"type": bool},
     }
 
 
@@ -409,7 +644,11 @@ class BenchmarkList(conbenchlegacy.runner.BenchmarkList):
         """List of benchmarks to run for all cases & all sources."""
 
         def add(
-            benchmarks, parts: List[str], flags: Dict[str, Any], exclude: List[str]
+            benchmarks,
+            parts: List[str],
+            flags: Dict[str, Any],
+            exclude: List[str],
+            memory_pools: List[str],
         ) -> None:
             if (
                 flags["language"] != "C++"
@@ -419,8 +658,22 @@ class BenchmarkList(conbenchlegacy.runner.BenchmarkList):
             ):
                 parts.append("--drop-caches=true")
             command = " ".join(parts)
-            if command not in exclude:
+            if command in exclude:
+                return
+            if not memory_pools:
                 benchmarks.append({"command": command, "flags": flags})
+            for pool in memory_pools:
+                benchmarks.append(
+                    {
+                        "command": f"{command} --memory-pool={pool}",
+                        "flags": {**flags, "memory_pool": pool},
+                    }
+                )
+
+        # e.g. BENCHMARKS_MEMORY_POOLS=jemalloc,mimalloc,system runs every
+        # benchmark that has a --memory-pool option once per pool.
+        pools = os.getenv("BENCHMARKS_MEMORY_POOLS", "")
+        pools = [pool.strip().lower() for pool in pools.split(",") if pool.strip()]
 
         benchmarks = []
         for name, benchmark in classes.items():
@@ -428,6 +681,9 @@ class BenchmarkList(conbenchlegacy.runner.BenchmarkList):
                 continue
 
             instance, parts = benchmark(), [name]
+            memory_pools = (
+                pools if "memory_pool" in getattr(instance, "options", {}) else []
+            )
 
             exclude = getattr(benchmark, "exclude", [])
             if "source" in getattr(benchmark, "arguments", []):
@@ -444,16 +700,16 @@ class BenchmarkList(conbenchlegacy.runner.BenchmarkList):
 
             if getattr(instance, "r_only", False):
                 flags["language"] = "R"
-                add(benchmarks, parts, flags, exclude)
+                add(benchmarks, parts, flags, exclude, memory_pools)
             else:
                 if "language" not in flags:
                     flags["language"] = "Python"
-                add(benchmarks, parts, flags, exclude)
+                add(benchmarks, parts, flags, exclude, memory_pools)
 
                 if hasattr(instance, "r_name"):
                     flags_ = flags.copy()
                     flags_["language"] = "R"
                     parts.append("--language=R")
-                    add(benchmarks, parts, flags_, exclude)
+                    add(benchmarks, parts, flags_, exclude, memory_pools)
 
         return sorted(benchmarks, key=lambda k: k["command"])
@@ -0,0 +1,208 @@
+"""Content-addressed cache for files derived from the canonical sources.
+
+Each derived file lives at "<root>/<key>/<filename>", where the key is a hash
+of everything that determines its contents (see `key()`). Changing any of
+those, e.g. upgrading pyarrow or passing different writer options, yields a
+new key and so a fresh file, instead of silently reusing one written by an
+old writer.
+
+"<root>/index.json" records each entry's size and last use, and counts cache
+hits and misses. When a byte budget is set, the least recently used entries
+are evicted once the cache grows past it. To see what's in the cache, run:
+
+    python -m benchmarks._cache
+
+Several benchmark processes may share the cache. Entries are created while
+holding a per-key file lock ("<root>/locks/<key>.lock"), so each file is
+written once per host while other processes wait for it and then reuse it.
+"""
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import shutil
+import sys
+import time
+
+from benchmarks import _locking
+
+# Bump to invalidate every cached file, e.g. when a writer changes behaviour
+# in a way that isn't captured by its arguments.
+VERSION = 1
+
+log = logging.getLogger(__name__)
+
+
+def key(**parts):
+    """A stable hash of the keyword arguments."""
+    blob = json.dumps({"version": VERSION, **parts}, sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()[:32]
+
+
+def parse_bytes(value):
+    """Parse a byte count like "500000", "200M" or "1.5G"."""
+    if value is None or value == "":
+        return None
+    units = {"K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+    value = str(value).strip().upper().rstrip("B")
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def _size(path):
+    """Size of a file, or of all files in a directory."""
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return path.stat().st_size
+
+
+class DerivedCache:
+    def __init__(self, root, budget=None):
+        self.root = pathlib.Path(root)
+        self.budget = budget
+
+    @property
+    def index_path(self):
+        return self.root / "index.json"
+
+    def _read_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"hits": 0, "misses": 0, "entries": {}}
+
+    def _write_index(self, index):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_path.with_name(f"index.json.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.index_path)
+
+    def _lock_path(self, name):
+        return self.root / "locks" / f"{name}.lock"
+
+    def lock(self, key, blocking=True):
+        """Lock an entry for creation, see `_locking.file_lock()`."""
+        return _locking.file_lock(self._lock_path(key), blocking=blocking)
+
+    def _update_index(self, update):
+        with _locking.file_lock(self._lock_path("index")):
+            index = self._read_index()
+            result = update(index)
+            self._write_index(index)
+        return result
+
+    def path(self, key, filename):
+        return self.root / key / filename
+
+    def lookup(self, key, filename):
+        """The cached file's path, or None (a miss) if it doesn't exist yet."""
+        path = self.path(key, filename)
+
+        def update(index):
+            if path.exists():
+                index["hits"] += 1
+                entry = index["entries"].setdefault(key, {"filename": filename})
+                entry["last_used"] = time.time()
+                # Sized once in put(), not on every hit while holding the lock
+                # (a directory entry may hold thousands of files)
+                if "size" not in entry:
+                    entry["size"] = _size(path)
+                log.info("derived cache hit: %s", path)
+                return path
+            index["misses"] += 1
+            index["entries"].pop(key, None)
+            log.info("derived cache miss: %s", path)
+            return None
+
+        return self._update_index(update)
+
+    def put(self, key, filename, write):
+        """Create a cache entry by calling `write(path)`.
+
+        `write` gets a temporary path in the entry's directory, which is only
+        renamed to the final name once it returns, so readers never see a
+        partially written file. It may also create a directory there.
+
+        Hold `lock(key)` around `lookup()` and `put()` so that concurrent
+        processes don't create the same entry twice.
+        """
+        path = self.path(key, filename)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{filename}.{os.getpid()}.tmp")
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        finally:
+            if tmp.is_dir():
+                shutil.rmtree(tmp)
+            elif tmp.exists():
+                tmp.unlink()
+
+        def update(index):
+            now = time.time()
+            index["entries"][key] = {
+                "filename": filename,
+                "size": _size(path),
+                "created": now,
+                "last_used": now,
+            }
+
+        self._update_index(update)
+        self.evict(keep=key)
+        return path
+
+    def get_or_create(self, key, filename, write):
+        with self.lock(key):
+            path = self.lookup(key, filename)
+            if path is None:
+                path = self.put(key, filename, write)
+        return path
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until within the budget.
+
+        Entries that another process is creating right now are skipped.
+        """
+        if self.budget is None:
+            return
+
+        def update(index):
+            entries = index["entries"]
+            total = sum(e.get("size", 0) for e in entries.values())
+            by_age = sorted(entries, key=lambda k: entries[k].get("last_used", 0))
+            for k in by_age:
+                if total <= self.budget:
+                    break
+                if k == keep:
+                    continue
+                with self.lock(k, blocking=False) as acquired:
+                    if not acquired:
+                        continue
+                    path = self.path(k, entries[k]["filename"])
+                    log.info("derived cache evict: %s", path)
+                    shutil.rmtree(self.root / k, ignore_errors=True)
+                    total -= entries.pop(k).get("size", 0)
+
+        self._update_index(update)
+
+    def summary(self):
+        index = self._read_index()
+        entries = index["entries"]
+        return {
+            "hits": index["hits"],
+            "misses": index["misses"],
+            "entries": len(entries),
+            "bytes": sum(e.get("size", 0) for e in entries.values()),
+            "budget": self.budget,
+        }
+
+
+if __name__ == "__main__":
+    from benchmarks import _sources
+
+    json.dump(_sources.derived_cache.summary(), sys.stdout, indent=2)
+    print()
@@ -0,0 +1,262 @@
+"""Where the cloud benchmarks read their S3 data from.
+
+By default, the cloud benchmarks (dataset-read, dataset-select and
+recursive-get-file-info) read the public "ursa-labs-*" and "ursa-qa" buckets
+on S3, so their timings include whatever the internet was doing at the time.
+For repeatable numbers, set:
+
+    BENCHMARKS_CLOUD=local
+
+to read a local mirror of the buckets instead, at
+"$BENCHMARKS_DATA_DIR/s3/<bucket>/<key>". Files missing from the mirror are
+copied from S3 the first time they're needed, or all at once with:
+
+    python -m benchmarks._cloud [source or dataset uri ...]
+
+Alternatively, set BENCHMARKS_CLOUD_ENDPOINT to the URL of an S3-compatible
+server (e.g. MinIO serving the mirror directory) to go through a real S3
+client, without the internet.
+
+Either way, BENCHMARKS_CLOUD_LATENCY (seconds per request, e.g. 0.02) and
+BENCHMARKS_CLOUD_BANDWIDTH (bytes per second, e.g. 100M) add simulated
+network costs to every file listing, open and read, which is what makes
+settings like pre_buffer matter. These settings are added to the results'
+tags, so they don't share a history with runs against S3.
+
+Note that the simulated costs are added in Python: throttled files are
+Python file objects, so every read holds the GIL, and Arrow's IO threads
+read one at a time. That's fine for the cost of requests (e.g. fewer reads
+with pre_buffer), but comparisons of read concurrency (e.g. IO thread
+counts) measure GIL contention rather than latency or bandwidth. For those,
+leave both unset and use BENCHMARKS_CLOUD_ENDPOINT with a proxy adding the
+latency and bandwidth limits outside Python (e.g. toxiproxy in front of
+MinIO).
+"""
+import io
+import logging
+import os
+import sys
+import time
+import urllib.parse
+
+import pyarrow.fs
+
+from benchmarks import _cache, _sources
+
+log = logging.getLogger(__name__)
+
+mode = os.getenv("BENCHMARKS_CLOUD", "s3").lower()
+endpoint = os.getenv("BENCHMARKS_CLOUD_ENDPOINT")
+latency = float(os.getenv("BENCHMARKS_CLOUD_LATENCY") or 0)
+bandwidth = _cache.parse_bytes(os.getenv("BENCHMARKS_CLOUD_BANDWIDTH"))
+mirror_dir = os.path.join(_sources.data_dir, "s3")
+
+DEFAULT_REGION = "us-east-2"
+
+
+def is_remote():
+    return mode != "local" and not endpoint
+
+
+def tags():
+    """Tags identifying the stand-in, if results don't come from S3."""
+    if is_remote():
+        return {}
+    result = {"cloud": "endpoint" if endpoint else "local"}
+    if latency:
+        result["cloud_latency"] = latency
+    if bandwidth:
+        result["cloud_bandwidth"] = bandwidth
+    return result
+
+
+def _s3(region):
+    return pyarrow.fs.S3FileSystem(region=region, anonymous=True)
+
+
+def mirror(paths, region=DEFAULT_REGION):
+    """Copy "<bucket>/<key>" files or directories from S3 to the mirror."""
+    s3, local = None, pyarrow.fs.LocalFileSystem()
+    for path in paths:
+        destination = os.path.join(mirror_dir, path)
+        if os.path.exists(destination):
+            continue
+        s3 = s3 or _s3(region)
+        log.info("mirroring s3://%s to %s", path, destination)
+        tmp = f"{destination}.{os.getpid()}.tmp"
+        if s3.get_file_info(path).type == pyarrow.fs.FileType.Directory:
+            os.makedirs(tmp, exist_ok=True)
+        else:
+            os.makedirs(os.path.dirname(tmp), exist_ok=True)
+        pyarrow.fs.copy_files(
+            path,
+            tmp,
+            source_filesystem=s3,
+            destination_filesystem=local,
+            use_threads=True,
+        )
+        os.replace(tmp, destination)
+
+
+def filesystem(region=DEFAULT_REGION, paths=()):
+    """A filesystem to read "<bucket>/<key>" paths from.
+
+    In local mode, `paths` are mirrored first if they're missing.
+    """
+    if is_remote():
+        return _s3(region)
+    if endpoint:
+        parsed = urllib.parse.urlparse(endpoint)
+        base = pyarrow.fs.S3FileSystem(
+            endpoint_override=parsed.netloc,
+            scheme=parsed.scheme or "http",
+            region=region,
+            anonymous=True,
+        )
+    else:
+        mirror(paths, region)
+        os.makedirs(mirror_dir, exist_ok=True)
+        base = pyarrow.fs.SubTreeFileSystem(mirror_dir, pyarrow.fs.LocalFileSystem())
+    if not latency and not bandwidth:
+        return base
+    return pyarrow.fs.PyFileSystem(ThrottledHandler(base, latency, bandwidth))
+
+
+def _path(uri):
+    """The "<bucket>/<key>" path of an "s3://<bucket>/<key>" uri."""
+    parsed = urllib.parse.urlparse(uri)
+    return parsed.netloc + parsed.path if parsed.scheme else uri
+
+
+def resolve(uri):
+    """A (filesystem, path) pair to read an "s3://<bucket>/<key>" uri from.
+
+    Against S3 this is (None, uri), leaving pyarrow to infer the filesystem
+    (and look up the bucket's region) from the uri.
+    """
+    if is_remote():
+        return None, uri
+    path = _path(uri)
+    return filesystem(paths=[path]), path
+
+
+class _ThrottledFile(io.RawIOBase):
+    """A file whose reads each cost a request's latency, plus transfer time."""
+
+    def __init__(self, f, handler):
+        self.f, self.handler = f, handler
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self.f.seekable()
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self.f.seek(offset, whence)
+
+    def tell(self):
+        return self.f.tell()
+
+    def read(self, nbytes=-1):
+        data = self.f.read() if nbytes is None or nbytes < 0 else self.f.read(nbytes)
+        self.handler.wait(len(data))
+        return data
+
+    def readinto(self, b):
+        data = self.read(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+    def close(self):
+        self.f.close()
+        super().close()
+
+
+class ThrottledHandler(pyarrow.fs.FileSystemHandler):
+    """Delegates to another filesystem, adding network-like costs.
+
+    Every listing, open and read waits `latency` seconds, and reads also
+    wait for the bytes to go through at `bandwidth` bytes per second. Note
+    that reads of the same file are serialized, and since the files are
+    Python file objects, reads of different files hold the GIL too, so
+    Arrow's IO threads don't read concurrently (see the module docstring).
+    """
+
+    def __init__(self, base, latency=0, bandwidth=None):
+        self.base, self.latency, self.bandwidth = base, latency, bandwidth
+
+    def wait(self, nbytes=0):
+        seconds = self.latency
+        if self.bandwidth:
+            seconds += nbytes / self.bandwidth
+        if seconds:
+            time.sleep(seconds)
+
+    def get_type_name(self):
+        return f"throttled+{self.base.type_name}"
+
+    def normalize_path(self, path):
+        return self.base.normalize_path(path)
+
+    def get_file_info(self, paths):
+        self.wait()
+        return self.base.get_file_info(paths)
+
+    def get_file_info_selector(self, selector):
+        self.wait()
+        return self.base.get_file_info(selector)
+
+    def create_dir(self, path, recursive):
+        self.base.create_dir(path, recursive=recursive)
+
+    def delete_dir(self, path):
+        self.base.delete_dir(path)
+
+    def delete_dir_contents(self, path, missing_dir_ok=False):
+        self.base.delete_dir_contents(path, missing_dir_ok=missing_dir_ok)
+
+    def delete_root_dir_contents(self):
+        self.base.delete_dir_contents("", accept_root_dir=True)
+
+    def delete_file(self, path):
+        self.base.delete_file(path)
+
+    def move(self, src, dest):
+        self.base.move(src, dest)
+
+    def copy_file(self, src, dest):
+        self.base.copy_file(src, dest)
+
+    def _open(self, f):
+        self.wait()
+        return pyarrow.PythonFile(_ThrottledFile(f, self), mode="r")
+
+    def open_input_stream(self, path):
+        return self._open(self.base.open_input_stream(path))
+
+    def open_input_file(self, path):
+        return self._open(self.base.open_input_file(path))
+
+    def open_output_stream(self, path, metadata):
+        return self.base.open_output_stream(path, metadata=metadata)
+
+    def open_append_stream(self, path, metadata):
+        return self.base.open_append_stream(path, metadata=metadata)
+
+
+def _paths(name):
+    if name.startswith("s3://"):
+        return [_path(name)], DEFAULT_REGION
+    source = _sources.Source(name)
+    return source.paths, source.region or DEFAULT_REGION
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    names = sys.argv[1:] or [
+        name for name, source in _sources.STORE.items() if "region" in source
+    ]
+    for name in names:
+        paths, region = _paths(name)
+        mirror(paths, region)
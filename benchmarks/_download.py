@@ -0,0 +1,148 @@
+import concurrent.futures
+import logging
+import os
+import pathlib
+import threading
+import time
+
+import requests
+import urllib3
+
+from benchmarks import _locking
+
+log = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+MAX_WORKERS = int(os.getenv("BENCHMARKS_DOWNLOAD_WORKERS", "16"))
+RETRIES = 5
+BACKOFF = 1.0
+TIMEOUT = 60
+
+_thread_local = threading.local()
+
+
+def _session():
+    """One requests session (and connection pool) per download thread."""
+    session = getattr(_thread_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        _thread_local.session = session
+    return session
+
+
+def _partial_path(path):
+    return path.with_name(path.name + ".part")
+
+
+def _is_retryable(e):
+    if isinstance(e, requests.HTTPError):
+        status = e.response.status_code if e.response is not None else None
+        return status is None or status == 429 or status >= 500
+    if isinstance(e, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(e, requests.RequestException):
+        return False
+    # Raw stream reads raise urllib3 errors, not wrapped requests ones.
+    return isinstance(e, (urllib3.exceptions.HTTPError, OSError))
+
+
+def _fetch(session, url, partial, chunk_size, timeout):
+    offset = partial.stat().st_size if partial.exists() else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as r:
+        if offset and r.status_code == 416:
+            # Either the previous attempt got everything and only the rename
+            # is missing, or the partial file is bogus: start over.
+            total = r.headers.get("Content-Range", "").rpartition("/")[2]
+            if total.isdigit() and int(total) == offset:
+                return
+            partial.unlink()
+            raise requests.ConnectionError(f"invalid partial download of {url}")
+        r.raise_for_status()
+
+        if offset and r.status_code != 206:
+            log.info("server ignored range request, restarting %s", url)
+            offset = 0
+
+        length = r.headers.get("Content-Length")
+        expected = offset + int(length) if length is not None else None
+
+        with open(partial, "ab" if offset else "wb") as f:
+            # Write the bytes as stored: decoding a Content-Encoding here would
+            # break both resuming and the size check below.
+            for chunk in r.raw.stream(chunk_size, decode_content=False):
+                f.write(chunk)
+
+    if expected is not None and partial.stat().st_size != expected:
+        raise requests.ConnectionError(
+            f"incomplete download of {url}: "
+            f"{partial.stat().st_size} of {expected} bytes"
+        )
+
+
+def download(
+    url,
+    path,
+    session=None,
+    chunk_size=CHUNK_SIZE,
+    retries=RETRIES,
+    backoff=BACKOFF,
+    timeout=TIMEOUT,
+):
+    """Stream a URL to disk in chunks.
+
+    The response is written to "<path>.part" and only renamed to `path` once
+    it is complete, so `path` never exists as a truncated file. Failed
+    attempts are retried with exponential backoff, resuming from the end of
+    the partial file with an HTTP Range request.
+
+    A lock file next to `path` keeps concurrent benchmark processes from
+    downloading the same file twice: the others wait, then find it on disk.
+    """
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = _partial_path(path)
+    lock_path = path.with_name(path.name + ".lock")
+    session = session or _session()
+
+    with _locking.file_lock(lock_path):
+        if path.exists():
+            return path
+
+        for attempt in range(retries + 1):
+            try:
+                log.info("HTTP GET %s", url)
+                _fetch(session, url, partial, chunk_size, timeout)
+                break
+            except Exception as e:
+                if attempt == retries or not _is_retryable(e):
+                    raise
+                delay = backoff * 2**attempt
+                log.warning("download of %s failed (%s), retry in %.1fs", url, e, delay)
+                time.sleep(delay)
+
+        os.replace(partial, path)
+        # Safe to remove while held: anyone waiting on it will find `path`.
+        lock_path.unlink()
+    return path
+
+
+def download_many(jobs, max_workers=MAX_WORKERS, **kwargs):
+    """Download (url, path) pairs concurrently on a bounded thread pool.
+
+    Keyword arguments are passed through to `download()`. Raises the first
+    error encountered, after the remaining downloads have finished.
+    """
+    jobs = list(jobs)
+    if not jobs:
+        return []
+    if len(jobs) == 1:
+        return [download(*jobs[0], **kwargs)]
+
+    workers = max(1, min(max_workers, len(jobs)))
+    log.info("downloading %d files with %d workers", len(jobs), workers)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(download, url, path, **kwargs) for url, path in jobs]
+        concurrent.futures.wait(futures)
+    return [future.result() for future in futures]
@@ -0,0 +1,156 @@
+"""Deterministic synthetic data, for sources that aren't backed by a file.
+
+A generated source is described by a STORE entry with a "generator" spec
+(see `_sources.STORE`), e.g.:
+
+    {
+        "rows": 10_000_000,
+        "seed": 42,
+        "null_fraction": 0.1,
+        "string_length": 8,
+        "cardinality": 1000,
+        "columns": {"vendor_id": {"values": ["CMT", "DDS", "VTS"]}},
+    }
+
+and its schema. Every column is filled according to its type, with
+`null_fraction`, `string_length` and `cardinality` (the number of distinct
+strings, or None for unique strings) overridable per column, along with
+"min"/"max" for numbers and timestamps and "values" for strings.
+Timestamps are whole microseconds whatever their unit, so that they can be
+written to parquet files with coerce_timestamps="us", as real sources are.
+
+Data is generated one record batch at a time with NumPy, each batch from
+its own random generator seeded with (seed, batch index), so the same spec
+always yields the same data, and arbitrarily many rows can be streamed to a
+file without holding them all in memory.
+"""
+import datetime
+
+import numpy
+import pyarrow
+import pyarrow.compute
+
+BATCH_SIZE = 2**16
+
+ALPHABET = numpy.frombuffer(b"abcdefghijklmnopqrstuvwxyz", dtype=numpy.uint8)
+
+DEFAULTS = {
+    "seed": 0,
+    "batch_size": BATCH_SIZE,
+    "null_fraction": 0.0,
+    "string_length": 8,
+    "cardinality": None,
+}
+
+EPOCH = datetime.datetime(1970, 1, 1)
+TIMESTAMP_RANGE = (datetime.datetime(2009, 1, 1), datetime.datetime(2020, 1, 1))
+UNITS = {"s": 1, "ms": 10**3, "us": 10**6, "ns": 10**9}
+
+# Bumped when the same spec generates different data, to regenerate files
+VERSION = 2
+
+
+def spec(generator):
+    """The generator spec with defaults filled in."""
+    return {**DEFAULTS, **generator}
+
+
+def _random_strings(rng, count, length):
+    data = ALPHABET[rng.integers(0, len(ALPHABET), size=count * length)]
+    offsets = numpy.arange(0, (count + 1) * length, length, dtype=numpy.int32)
+    return pyarrow.StringArray.from_buffers(
+        count, pyarrow.py_buffer(offsets), pyarrow.py_buffer(data.tobytes())
+    )
+
+
+def _dictionary(schema, name, params, seed):
+    """Distinct values of a string column, shared by all batches."""
+    if "values" in params:
+        return pyarrow.array(params["values"], pyarrow.string())
+    if params["cardinality"] is None:
+        return None
+    index = schema.get_field_index(name)
+    rng = numpy.random.default_rng([seed, index, 2**32 - 1])
+    return _random_strings(rng, params["cardinality"], params["string_length"])
+
+
+def _timestamp_bounds(type, params):
+    per_second = UNITS[type.unit]
+    lo, hi = params.get("min", TIMESTAMP_RANGE[0]), params.get(
+        "max", TIMESTAMP_RANGE[1]
+    )
+    return (
+        int((lo - EPOCH).total_seconds()) * per_second,
+        int((hi - EPOCH).total_seconds()) * per_second,
+    )
+
+
+def _column(rng, field, params, dictionary, rows):
+    type = field.type
+    mask = None
+    if params["null_fraction"]:
+        mask = rng.random(rows) < params["null_fraction"]
+
+    if pyarrow.types.is_integer(type):
+        info = numpy.iinfo(type.to_pandas_dtype())
+        lo = params.get("min", max(info.min, -(10**6)))
+        hi = params.get("max", min(info.max, 10**6))
+        values = rng.integers(lo, hi, size=rows, endpoint=True)
+        return pyarrow.array(values, type=type, mask=mask)
+    if pyarrow.types.is_floating(type):
+        values = rng.uniform(params.get("min", -1e6), params.get("max", 1e6), rows)
+        return pyarrow.array(values, type=type, mask=mask)
+    if pyarrow.types.is_boolean(type):
+        return pyarrow.array(rng.random(rows) < 0.5, type=type, mask=mask)
+    if pyarrow.types.is_timestamp(type):
+        lo, hi = _timestamp_bounds(type, params)
+        step = max(UNITS[type.unit] // UNITS["us"], 1)
+        values = rng.integers(lo // step, hi // step, size=rows) * step
+        return pyarrow.array(values, type=pyarrow.int64(), mask=mask).cast(type)
+    if pyarrow.types.is_string(type) or pyarrow.types.is_dictionary(type):
+        if dictionary is None:
+            array = _random_strings(rng, rows, params["string_length"])
+            if mask is not None:
+                array = pyarrow.compute.if_else(
+                    pyarrow.array(mask), pyarrow.scalar(None, pyarrow.string()), array
+                )
+            if pyarrow.types.is_dictionary(type):
+                array = array.dictionary_encode().cast(type)
+            return array
+        indices = pyarrow.array(
+            rng.integers(0, len(dictionary), size=rows), pyarrow.int32(), mask=mask
+        )
+        if pyarrow.types.is_dictionary(type):
+            return pyarrow.DictionaryArray.from_arrays(indices, dictionary).cast(type)
+        return dictionary.take(indices)
+    raise ValueError(f"Can't generate values for {field.name}: {type}")
+
+
+def batches(schema, generator):
+    """Yield the record batches described by the generator spec."""
+    generator = spec(generator)
+    columns = generator.get("columns", {})
+    params = {
+        field.name: {**generator, **columns.get(field.name, {})} for field in schema
+    }
+    dictionaries = {
+        field.name: _dictionary(
+            schema, field.name, params[field.name], generator["seed"]
+        )
+        for field in schema
+    }
+
+    batch_size = generator["batch_size"]
+    for index, start in enumerate(range(0, generator["rows"], batch_size)):
+        rows = min(batch_size, generator["rows"] - start)
+        rng = numpy.random.default_rng([generator["seed"], index])
+        arrays = [
+            _column(rng, field, params[field.name], dictionaries[field.name], rows)
+            for field in schema
+        ]
+        yield pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def reader(schema, generator):
+    """A RecordBatchReader over the generated batches."""
+    return pyarrow.RecordBatchReader.from_batches(schema, batches(schema, generator))
@@ -0,0 +1,248 @@
+"""Reuse the results of micro benchmark suites that haven't changed.
+
+The micro benchmark runners (C++, Java, JavaScript) run whole suites, most
+of which aren't affected by any one commit. Given a baseline commit with
+`--baseline=<commit>`, they only run the suites that may have changed since
+it, and republish the baseline's results for the others.
+
+Each run stores its results per suite in
+"$BENCHMARKS_DATA_DIR/micro-results/<language>/<commit>/<suite>.json",
+along with the suite's fingerprint (for C++, a hash of the benchmark binary
+and the shared libraries it links against), so that the next run can use
+it as its baseline. Reused results are stored too, so reuse carries over
+from commit to commit.
+
+The Java and JavaScript runners don't have binaries per suite, so they
+work out which suites the files changed between the baseline and the
+target commit (`git diff`) may affect instead: a Java benchmark file
+affects its suite, Java sources of other modules the suites of their
+package (e.g. org.apache.arrow.algorithm), and anything else in the memory
+and vector modules, Java build files or the shared format/ directory
+affects every suite. JavaScript suites all exercise the same library, so
+any change to it affects them all. The Java suites' fingerprint is a hash
+of the options that change their numbers (e.g. --iterations), so results
+taken with other options aren't reused. The JavaScript runner has no such
+options. Either runner only stores and reuses results when given the Arrow
+source directory (--src or ARROW_SRC), whose commits they are stored under.
+
+Reused results are marked with "reused": true and "reused_from":
+<baseline commit> in their optional_benchmark_info, rather than with a
+tag, since tags identify the benchmark's history in Conbench.
+"""
+import copy
+import datetime
+import functools
+import hashlib
+import json
+import logging
+import os
+import re
+import subprocess
+
+from benchmarks import _sources
+
+log = logging.getLogger(__name__)
+
+results_dir = os.path.join(_sources.data_dir, "micro-results")
+
+# e.g. "	libarrow.so.1200 => /arrow/build/release/libarrow.so.1200 (0x...)"
+LDD_LIBRARY = re.compile(r"=>\s+(/\S+)")
+
+
+@functools.lru_cache(maxsize=None)
+def _file_hash(path, size, mtime):
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def file_hash(path):
+    """The sha256 of a file, computed once per version of the file (many
+    suites link against the same libraries)."""
+    stat = os.stat(path)
+    return _file_hash(os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def linked_libraries(binary):
+    """The shared libraries a binary links against, as found by ldd."""
+    try:
+        output = subprocess.run(
+            ["ldd", binary], capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        log.warning("can't list the libraries %s links against", binary)
+        return []
+    return sorted(set(LDD_LIBRARY.findall(output)))
+
+
+def options_fingerprint(options):
+    """A hash of the options a suite runs with."""
+    return hashlib.sha256(json.dumps(options, sort_keys=True).encode()).hexdigest()
+
+
+def binary_fingerprint(binary, options=None):
+    """A hash of a benchmark binary, the libraries it links against, and the
+    options it runs with."""
+    sha = hashlib.sha256(json.dumps(options or {}, sort_keys=True).encode())
+    for path in [binary, *linked_libraries(binary)]:
+        sha.update(f"{os.path.basename(path)} {file_hash(path)}\n".encode())
+    return sha.hexdigest()
+
+
+def git_revision(src, rev):
+    """The full hash of a git revision, or None if git can't resolve it."""
+    try:
+        return subprocess.run(
+            ["git", "-C", src, "rev-parse", "--verify", f"{rev}^{{commit}}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        log.warning("can't resolve %s in %s", rev, src)
+        return None
+
+
+def changed_files(src, baseline, commit):
+    """Paths changed between two commits, or None if git can't tell."""
+    try:
+        output = subprocess.run(
+            ["git", "-C", src, "diff", "--name-only", baseline, commit],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as e:
+        log.warning("can't diff %s and %s: %s", baseline, commit, e)
+        return None
+    return [line for line in output.splitlines() if line]
+
+
+# Changes here affect the micro benchmarks of every language
+SHARED_PATHS = ("format/",)
+
+JAVA_SOURCE = re.compile(
+    r"^java/(?P<module>.+?)/src/(?P<kind>main|test)/java/"
+    r"org/apache/(?P<package>.+)/(?P<name>\w+)\.java$"
+)
+# Modules every Java suite builds on
+JAVA_BASE_MODULES = ("memory", "vector", "format")
+DOCS = (".md", ".rst", ".txt")
+
+
+def java_affected(paths):
+    """The prefixes of the Java suites (e.g. "arrow.algorithm") that changes
+    to these paths may affect, or None for all of them."""
+    prefixes = set()
+    for path in paths:
+        if path.startswith(SHARED_PATHS):
+            return None
+        if not path.startswith("java/") or path.endswith(DOCS):
+            continue
+        match = JAVA_SOURCE.match(path)
+        if match is None:
+            return None  # Build files, resources...
+        package = match.group("package").replace("/", ".")
+        if match.group("module") == "performance":
+            prefixes.add(f"{package}.{match.group('name')}")
+        elif match.group("kind") == "test":
+            continue
+        elif match.group("module").split("/")[0] in JAVA_BASE_MODULES:
+            return None
+        else:
+            prefixes.add(".".join(package.split(".")[:2]))
+    return prefixes
+
+
+def js_affected(paths):
+    """None (all JavaScript suites) if changes to these paths may affect the
+    JavaScript benchmarks, else no suites."""
+    for path in paths:
+        if path.startswith(SHARED_PATHS):
+            return None
+        if path.startswith("js/") and not path.startswith("js/test/"):
+            if not path.endswith(DOCS):
+                return None
+    return set()
+
+
+def is_affected(suite, affected):
+    return affected is None or any(
+        suite == prefix or suite.startswith(f"{prefix}.") for prefix in affected
+    )
+
+
+def suite_filter(suites):
+    """A regex matching exactly these suite names."""
+    return "^(" + "|".join(re.escape(suite) for suite in sorted(suites)) + ")$"
+
+
+def mark_reused(result, baseline, **fields):
+    """A copy of a stored result, republished for this run: `fields` (e.g.
+    run_id, github) replace the stored ones."""
+    result = copy.deepcopy(result)
+    result.update(fields)
+    result["timestamp"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    info = result.get("optional_benchmark_info") or {}
+    info.update(reused=True, reused_from=baseline)
+    result["optional_benchmark_info"] = info
+    return result
+
+
+class Store:
+    """Results per (commit, suite) for one language."""
+
+    def __init__(self, language, root=results_dir):
+        self.path = os.path.join(root, language)
+
+    def _suite_path(self, commit, suite):
+        return os.path.join(self.path, commit, f"{suite}.json")
+
+    def suites(self, commit):
+        """The suites stored for a commit."""
+        try:
+            names = os.listdir(os.path.join(self.path, commit))
+        except FileNotFoundError:
+            return []
+        return sorted(name[: -len(".json")] for name in names if name.endswith(".json"))
+
+    def load(self, commit, suite):
+        """The stored {"fingerprint", "reused_from", "results"} of a suite at
+        a commit, or None."""
+        try:
+            with open(self._suite_path(commit, suite)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def reusable(self, baseline, commit, affected, fingerprint=None):
+        """The stored records of the baseline's suites that aren't affected
+        (and have this fingerprint, if given), by suite; also stored for
+        `commit` (if known), so that it can be a baseline too."""
+        reused = {}
+        for suite in self.suites(baseline):
+            if is_affected(suite, affected):
+                continue
+            record = self.load(baseline, suite)
+            if fingerprint is not None and record["fingerprint"] != fingerprint:
+                continue
+            record["reused_from"] = record["reused_from"] or baseline
+            if commit:
+                self.save(commit, suite, **record)
+            reused[suite] = record
+        return reused
+
+    def save(self, commit, suite, results, fingerprint=None, reused_from=None):
+        path = self._suite_path(commit, suite)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        record = {
+            "fingerprint": fingerprint,
+            "reused_from": reused_from,
+            "results": results,
+        }
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(record, f)
+        os.replace(tmp, path)
@@ -0,0 +1,195 @@
+"""Run each benchmark case in a fresh worker process.
+
+By default every case runs in the one `conbench` process, so memory pool
+growth, heap fragmentation and caches warmed by earlier cases carry over
+into later ones. Set:
+
+    BENCHMARKS_ISOLATION=forkserver   (or spawn)
+
+to run each (source, case) pair in its own worker process instead, started
+with that multiprocessing start method. Results are sent back to the parent
+over a pipe and yielded from `run()` as usual (the benchmarked function's
+output stays in the worker, so it is None).
+
+Workers can be pinned to cores with sched_setaffinity:
+
+    BENCHMARKS_ISOLATION_CORES=0-7          every worker runs on cores 0-7
+    BENCHMARKS_ISOLATION_CORES=0-7:8-15     two workers at a time, one on
+                                            cores 0-7 and one on 8-15
+
+and bound to a NUMA node (its cores, unless cores are given, and its
+memory) with BENCHMARKS_ISOLATION_NUMA_NODE=<node>. The start method, cores
+and NUMA node are recorded in each result's optional_benchmark_info.
+"""
+import ctypes
+import importlib
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import platform
+
+import pyarrow
+
+from benchmarks import _publish
+
+log = logging.getLogger(__name__)
+
+mode = os.getenv("BENCHMARKS_ISOLATION", "").lower()
+cores = os.getenv("BENCHMARKS_ISOLATION_CORES", "")
+numa_node = os.getenv("BENCHMARKS_ISOLATION_NUMA_NODE", "")
+
+START_METHODS = ["forkserver", "spawn"]
+
+# Set in workers, so that their own run() calls don't isolate again
+WORKER_ENV = "BENCHMARKS_ISOLATION_WORKER"
+
+# set_mempolicy(2) isn't wrapped by libc, and its number varies by platform
+SYS_SET_MEMPOLICY = {"x86_64": 238, "aarch64": 237}
+MPOL_BIND = 2
+
+
+def enabled():
+    if not mode or os.getenv(WORKER_ENV):
+        return False
+    if mode not in START_METHODS:
+        raise ValueError(f"BENCHMARKS_ISOLATION can only be one of {START_METHODS}.")
+    return True
+
+
+def parse_cpulist(cpulist):
+    """Cores in a Linux cpulist, e.g. "0-3,8" -> [0, 1, 2, 3, 8]."""
+    result = []
+    for part in cpulist.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        result.extend(range(int(first), int(last or first) + 1))
+    return result
+
+
+def numa_cpus(node):
+    with open(f"/sys/devices/system/node/node{node}/cpulist") as f:
+        return parse_cpulist(f.read())
+
+
+def core_groups(cores=cores, numa_node=numa_node):
+    """One core set per concurrent worker ([None] for no pinning)."""
+    groups = [parse_cpulist(group) for group in cores.split(":") if group.strip()]
+    if numa_node != "":
+        node_cpus = numa_cpus(numa_node)
+        groups = [[c for c in g if c in node_cpus] for g in groups] or [node_cpus]
+        groups = [group for group in groups if group]
+    return groups or [None]
+
+
+def _bind_memory(node):
+    number = SYS_SET_MEMPOLICY.get(platform.machine())
+    if number is None:
+        log.warning("can't bind memory to NUMA nodes on %s", platform.machine())
+        return
+    mask = ctypes.c_ulong(1 << int(node))
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.syscall(number, MPOL_BIND, ctypes.byref(mask), 64) != 0:
+        log.warning("set_mempolicy: %s", os.strerror(ctypes.get_errno()))
+
+
+def pin(cores, numa_node=numa_node):
+    """Pin this process to the cores, and its memory to the NUMA node."""
+    if cores:
+        os.sched_setaffinity(0, cores)
+    if numa_node != "":
+        _bind_memory(numa_node)
+
+
+def _worker(connection, benchmark, kwargs, cores, ids):
+    os.environ[WORKER_ENV] = "1"
+    try:
+        pin(cores)
+        if cores and kwargs.get("cpu_count") is None:
+            # Arrow sizes its thread pool by the machine's cores, not ours
+            pyarrow.set_cpu_count(len(cores))
+        module, _, name = benchmark.rpartition(".")
+        instance = getattr(importlib.import_module(module), name)()
+        # Results of all workers belong to the parent's run and batch
+        instance.conbench._run_id, instance.conbench._batch_id = ids
+        instance.isolation = {
+            "start_method": mode,
+            "cores": cores,
+            "numa_node": numa_node or None,
+        }
+        for result, _ in instance.run(**kwargs):
+            connection.send(result)
+    finally:
+        # Workers leave with os._exit(), skipping atexit
+        _publish.close()
+        connection.send(None)
+        connection.close()
+
+
+def _units(instance, kwargs):
+    """The run() arguments of each (source, case) pair to run separately."""
+    sources = [None]
+    if "source" in kwargs:
+        sources = [source.name for source in instance.get_sources(kwargs["source"])]
+    cases = [None]
+    if instance.cases:
+        cases = instance.get_cases(kwargs.get("case"), kwargs)
+    for source in sources:
+        for case in cases:
+            unit = {**kwargs}
+            if source is not None:
+                unit["source"] = source
+            if case is not None:
+                unit["case"] = tuple(case)
+                unit["all"] = False
+            yield unit
+
+
+def run(instance, kwargs):
+    """Yield (result, None) for each unit of work, each run in a worker,
+    with as many workers at a time as there are core groups.
+
+    Raises RuntimeError once all units have run if any worker failed.
+    """
+    context = multiprocessing.get_context(mode)
+    benchmark = f"{type(instance).__module__}.{type(instance).__qualname__}"
+    ids = (instance.conbench.get_run_id(kwargs), instance.conbench._batch_id)
+    pending, free, running = list(_units(instance, kwargs)), core_groups(), {}
+    failed = []
+
+    while pending or running:
+        while pending and free:
+            group = free.pop(0)
+            receiver, sender = context.Pipe(duplex=False)
+            unit = pending.pop(0)
+            process = context.Process(
+                target=_worker, args=(sender, benchmark, unit, group, ids)
+            )
+            process.start()
+            sender.close()
+            running[receiver] = (process, group, unit)
+
+        for receiver in multiprocessing.connection.wait(list(running)):
+            process, group, unit = running[receiver]
+            try:
+                result = receiver.recv()
+            except EOFError:
+                result = None
+            if result is not None:
+                yield result, None
+                continue
+            process.join()
+            if process.exitcode:
+                log.error("isolated worker failed with exit code %s", process.exitcode)
+                failed.append((unit, process.exitcode))
+            receiver.close()
+            del running[receiver]
+            free.append(group)
+
+    if failed:
+        raise RuntimeError(
+            f"{len(failed)} isolated worker(s) failed: "
+            + ", ".join(f"{unit} (exit code {code})" for unit, code in failed)
+        )
@@ -0,0 +1,62 @@
+import collections
+import contextlib
+import fcntl
+import logging
+import os
+import threading
+
+log = logging.getLogger(__name__)
+
+# Locks held by this process, so that a thread can re-acquire a lock it
+# already holds (flock() would otherwise deadlock against itself, because
+# each open() of the lock file is a separate lock).
+_held = collections.Counter()
+_held_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def file_lock(path, blocking=True):
+    """Hold an exclusive advisory lock on `path`, across processes.
+
+    The lock file is created if needed. Yields True once the lock is held,
+    or False if `blocking` is False and another process holds it.
+    """
+    path = os.path.abspath(path)
+    me = (path, threading.get_ident())
+    with _held_lock:
+        reentrant = _held[me] > 0
+        if reentrant:
+            _held[me] += 1
+    if reentrant:
+        try:
+            yield True
+        finally:
+            with _held_lock:
+                _held[me] -= 1
+        return
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            acquired = True
+        except BlockingIOError:
+            acquired = False
+
+        if not acquired:
+            if not blocking:
+                yield False
+                return
+            log.info("waiting for another process to release %s", path)
+            fcntl.flock(f, fcntl.LOCK_EX)
+
+        with _held_lock:
+            _held[me] += 1
+        try:
+            yield True
+        finally:
+            with _held_lock:
+                _held[me] -= 1
+                if not _held[me]:
+                    del _held[me]
+            fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,157 @@
+"""Expected size, SHA-256 and row count of the files behind `_sources.STORE`.
+
+The manifest lives in benchmarks/manifest.json, keyed by source name and then
+by the file's path relative to its data folder. To add or refresh entries on
+a machine that has the source files, run:
+
+    python -m benchmarks._manifest fanniemae_2016Q4 nyctaxi_2010-01
+
+Hashing a multi-GB file is slow, so the digest of every file we have hashed
+is cached in "data/.checksums.json", keyed on the file's mtime and size.
+"""
+import functools
+import hashlib
+import json
+import logging
+import os
+import sys
+
+from benchmarks import _locking
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(this_dir, "manifest.json")
+CHUNK_SIZE = 4 * 1024 * 1024
+
+log = logging.getLogger(__name__)
+
+
+class IntegrityError(Exception):
+    pass
+
+
+@functools.lru_cache(maxsize=None)
+def load(path=MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def entries(name):
+    return load().get(name, {})
+
+
+def sha256sum(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(cache_path, cache):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp, cache_path)
+
+
+def checksum(path, cache_path):
+    """SHA-256 of a file, only re-hashed when its mtime or size changes."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    cache = _read_cache(cache_path)
+    cached = cache.get(path)
+    if (
+        cached
+        and cached["mtime_ns"] == stat.st_mtime_ns
+        and cached["size"] == stat.st_size
+    ):
+        return cached["sha256"]
+
+    log.info("hashing %s", path)
+    sha256 = sha256sum(path)
+    with _locking.file_lock(f"{cache_path}.lock"):
+        cache = _read_cache(cache_path)
+        cache[path] = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": sha256,
+        }
+        _write_cache(cache_path, cache)
+    return sha256
+
+
+def verify(path, expected, cache_path):
+    """Raise IntegrityError if the file at `path` doesn't match `expected`.
+
+    The size is compared first, so truncated files are caught without
+    hashing them.
+    """
+    size = os.path.getsize(path)
+    if "size" in expected and size != expected["size"]:
+        raise IntegrityError(
+            f"{path} is {size} bytes, expected {expected['size']}. "
+            "It may be a partial download: delete it to download it again."
+        )
+    if "sha256" in expected:
+        sha256 = checksum(path, cache_path)
+        if sha256 != expected["sha256"]:
+            raise IntegrityError(
+                f"{path} has SHA-256 {sha256}, expected {expected['sha256']}. "
+                "Delete it to download it again."
+            )
+
+
+def describe(path, cache_path, rows=None):
+    entry = {"size": os.path.getsize(path), "sha256": checksum(path, cache_path)}
+    if rows is not None:
+        entry["rows"] = rows
+    return entry
+
+
+def _count_rows(source, path):
+    import pyarrow.feather as feather
+    import pyarrow.parquet as parquet
+
+    if source.format_str == "parquet":
+        return parquet.ParquetFile(path).metadata.num_rows
+    if source.format_str == "feather":
+        return feather.read_table(path, memory_map=True).num_rows
+    if source.source_paths == [path]:
+        return source.table.num_rows
+    return None
+
+
+def main(names):
+    from benchmarks import _sources
+
+    manifest = dict(load())
+    for name in names:
+        source = _sources.Source(name, verify=False)
+        source.download_source_if_not_exists()
+        manifest[name] = {
+            source.relative_path(p): describe(
+                p, _sources.checksums_path, rows=_count_rows(source, p)
+            )
+            for p in source.source_paths
+        }
+        log.info("updated manifest entry for %s", name)
+
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    logging.getLogger().setLevel(logging.INFO)
+    main(sys.argv[1:])
@@ -0,0 +1,106 @@
+"""Memory use of benchmark iterations.
+
+`MemoryProbe` is started before and stopped after each timed iteration
+(outside the timed region, see `_timing.Timer`), and records per iteration:
+
+* peak_rss: the process's peak resident set size during the iteration, in
+  bytes. On Linux the peak is reset before each iteration (through
+  /proc/self/clear_refs), elsewhere it is the peak since the process started.
+* allocated_bytes: the change in `pyarrow.total_allocated_bytes()`, i.e. what
+  the iteration left allocated in Arrow's default memory pool.
+* max_memory: `pyarrow.default_memory_pool().max_memory()`, the pool's high
+  water mark so far.
+
+along with the pool's backend name (jemalloc, mimalloc or system). These
+go in each result's optional_benchmark_info["memory"]. Results of external
+suites (C++, Java, JavaScript, R) don't get them, as this process's numbers
+would describe the harness rather than the benchmark.
+
+`use_pool()` switches the memory pool, for the --memory-pool option.
+"""
+import os
+import resource
+import sys
+
+import pyarrow
+
+STATUS = "/proc/self/status"
+CLEAR_REFS = "/proc/self/clear_refs"
+
+POOLS = ["jemalloc", "mimalloc", "system"]
+
+
+def _status_bytes(field):
+    try:
+        with open(STATUS) as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _maxrss():
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def reset_peak_rss():
+    """Reset the peak RSS to the current RSS, where the OS allows it."""
+    try:
+        with open(CLEAR_REFS, "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss():
+    """The peak RSS in bytes, since the last reset if there was one."""
+    peak = _status_bytes("VmHWM")
+    return _maxrss() if peak is None else peak
+
+
+def use_pool(name):
+    """Make the named pool Arrow's default memory pool, in this process and
+    (through ARROW_DEFAULT_MEMORY_POOL) in child processes such as R."""
+    name = name.lower()
+    if name not in POOLS:
+        raise ValueError(f"Memory pool can only be one of {POOLS}, not {name!r}.")
+    try:
+        pool = getattr(pyarrow, f"{name}_memory_pool")()
+    except NotImplementedError:
+        raise ValueError(f"This pyarrow was built without the {name} memory pool.")
+    pyarrow.set_memory_pool(pool)
+    os.environ["ARROW_DEFAULT_MEMORY_POOL"] = name
+    return name
+
+
+class MemoryProbe:
+    def __init__(self):
+        self.pool = pyarrow.default_memory_pool()
+        self.peak_rss, self.allocated_bytes, self.max_memory = [], [], []
+        self._allocated = None
+
+    def start(self):
+        # The pool may have changed since this probe was created
+        self.pool = pyarrow.default_memory_pool()
+        reset_peak_rss()
+        self._allocated = pyarrow.total_allocated_bytes()
+
+    def stop(self):
+        self.peak_rss.append(peak_rss())
+        self.allocated_bytes.append(pyarrow.total_allocated_bytes() - self._allocated)
+        self.max_memory.append(self.pool.max_memory())
+
+    def info(self):
+        return {
+            "memory": {
+                "backend": self.pool.backend_name,
+                "peak_rss": self.peak_rss,
+                "allocated_bytes": self.allocated_bytes,
+                "max_memory": self.max_memory,
+            }
+        }
@@ -0,0 +1,74 @@
+"""Run C++ micro benchmark suites concurrently, on disjoint cores.
+
+Most of the Arrow C++ benchmark suites are single-threaded, so running them
+one after another leaves most cores of a big host idle. Set e.g.:
+
+    BENCHMARKS_CPP_CORES=0:1:2:3        four suites at a time, one core each
+    BENCHMARKS_CPP_CORES=0-1:2-3        two at a time, two cores each
+
+(the core groups syntax of _isolation.py) to run `cpp-micro`'s suites that
+many at a time, each pinned to a core group with taskset. Suites that use
+Arrow's thread pools, those matching the BENCHMARKS_CPP_MULTI_THREADED regex,
+still run one at a time on all cores, before the others.
+
+Each result records the cores its suite ran on, and whether it had the host
+to itself, in optional_benchmark_info["isolation"], so that only numbers
+measured the same way get compared.
+"""
+import concurrent.futures
+import os
+import queue
+import re
+
+from benchmarks import _isolation
+
+cores = os.getenv("BENCHMARKS_CPP_CORES", "")
+multi_threaded = os.getenv(
+    "BENCHMARKS_CPP_MULTI_THREADED",
+    r"^(arrow-acero-|arrow-dataset-|arrow-thread-pool-|arrow-async-"
+    r"|arrow-io-|arrow-ipc-|parquet-arrow-)",
+)
+
+
+def enabled():
+    return bool(cores.strip())
+
+
+def split(suites, pattern=multi_threaded):
+    """The suites that must run alone, and the others."""
+    exclusive = [suite for suite in suites if re.search(pattern, suite)]
+    shared = [suite for suite in suites if suite not in exclusive]
+    return exclusive, shared
+
+
+def mark(results, cores):
+    """Record the cores (None for all of them) results were measured on."""
+    isolation = {
+        "cores": cores or sorted(os.sched_getaffinity(0)),
+        "exclusive": not cores,
+    }
+    for result in results:
+        info = result.optional_benchmark_info or {}
+        info["isolation"] = isolation
+        result.optional_benchmark_info = info
+    return results
+
+
+def run(suites, run_suite, groups=None):
+    """Yield what `run_suite(suite, cores)` returns for each suite, as they
+    finish, with as many suites at a time as there are core groups."""
+    free = queue.Queue()
+    for group in groups or _isolation.core_groups(cores, ""):
+        free.put(group)
+
+    def task(suite):
+        group = free.get()
+        try:
+            return run_suite(suite, group)
+        finally:
+            free.put(group)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=free.qsize()) as pool:
+        futures = [pool.submit(task, suite) for suite in suites]
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
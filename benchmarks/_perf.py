@@ -0,0 +1,202 @@
+"""Hardware and software counters of benchmark iterations, from perf_event.
+
+Set BENCHMARKS_PERF=true to count, around each timed iteration (see
+`_timing.Timer`), across all of the process's threads:
+
+* cycles, instructions, cache_misses (last level cache misses on most
+  CPUs) and branch_misses, from the CPU's performance counters
+* context_switches and page_faults, from the kernel
+
+These go in each result's optional_benchmark_info["perf"], one number per
+iteration like the times. Counts are scaled up if the kernel had to
+multiplex the counters.
+
+Counting needs perf_event_open(2), which /proc/sys/kernel/perf_event_paranoid
+may restrict: above 1, only user space is counted (the counters are then
+listed in "user_only"), and above 2 nothing is. Counters the kernel or the
+CPU refuse (e.g. hardware counters in most VMs) are left out and listed in
+"unavailable", with the reason, rather than failing the benchmark.
+
+Counters are opened on each of the process's threads when the first
+iteration starts, and inherited by the threads these start afterwards (such
+as the thread pools Arrow starts lazily), so that every thread is counted
+once, including during the iteration it starts in.
+"""
+import ctypes
+import errno
+import fcntl
+import logging
+import os
+import platform
+import struct
+import weakref
+
+log = logging.getLogger(__name__)
+
+enabled = os.getenv("BENCHMARKS_PERF", "").lower() in ("1", "true")
+
+SYS_PERF_EVENT_OPEN = {"x86_64": 298, "aarch64": 241}
+
+PERF_TYPE_HARDWARE, PERF_TYPE_SOFTWARE = 0, 1
+# name: (type, config)
+COUNTERS = {
+    "cycles": (PERF_TYPE_HARDWARE, 0),
+    "instructions": (PERF_TYPE_HARDWARE, 1),
+    "cache_misses": (PERF_TYPE_HARDWARE, 3),
+    "branch_misses": (PERF_TYPE_HARDWARE, 5),
+    "context_switches": (PERF_TYPE_SOFTWARE, 3),
+    "page_faults": (PERF_TYPE_SOFTWARE, 2),
+}
+
+# perf_event_attr.flags bits
+DISABLED, INHERIT, EXCLUDE_KERNEL, EXCLUDE_HV = 1 << 0, 1 << 1, 1 << 5, 1 << 6
+# read() returns value, time enabled, time running, including those of the
+# counters inherited by child threads, live or exited
+READ_FORMAT = 1 | 2  # PERF_FORMAT_TOTAL_TIME_ENABLED | ..._RUNNING
+IOC_ENABLE, IOC_DISABLE = 0x2400, 0x2401
+
+
+class EventAttr(ctypes.Structure):
+    """struct perf_event_attr, as of PERF_ATTR_SIZE_VER1."""
+
+    _fields_ = [
+        ("type", ctypes.c_uint32),
+        ("size", ctypes.c_uint32),
+        ("config", ctypes.c_uint64),
+        ("sample_period", ctypes.c_uint64),
+        ("sample_type", ctypes.c_uint64),
+        ("read_format", ctypes.c_uint64),
+        ("flags", ctypes.c_uint64),
+        ("wakeup_events", ctypes.c_uint32),
+        ("bp_type", ctypes.c_uint32),
+        ("config1", ctypes.c_uint64),
+        ("config2", ctypes.c_uint64),
+    ]
+
+
+_libc = None
+# Counters already reported unavailable, to say so once per process
+_warned = set()
+
+
+def open_counter(name, tid, user_only=False):
+    """A disabled counter of a thread (and the threads it starts), or
+    OSError."""
+    global _libc
+    number = SYS_PERF_EVENT_OPEN.get(platform.machine())
+    if number is None:
+        raise OSError(errno.ENOSYS, f"perf_event_open on {platform.machine()}")
+    if _libc is None:
+        _libc = ctypes.CDLL(None, use_errno=True)
+    attr = EventAttr()
+    attr.type, attr.config = COUNTERS[name]
+    attr.size = ctypes.sizeof(EventAttr)
+    attr.read_format = READ_FORMAT
+    attr.flags = DISABLED | INHERIT
+    if user_only:
+        attr.flags |= EXCLUDE_KERNEL | EXCLUDE_HV
+    fd = _libc.syscall(number, ctypes.byref(attr), tid, -1, -1, 0)
+    if fd < 0:
+        code = ctypes.get_errno()
+        raise OSError(code, os.strerror(code))
+    return fd
+
+
+def read_counter(fd):
+    """The count, time enabled and time running so far."""
+    return struct.unpack("QQQ", os.read(fd, 24))
+
+
+def scaled(before, after):
+    """The count between two reads, scaled up for the time the counter
+    wasn't running."""
+    value, enabled, running = (b - a for a, b in zip(before, after))
+    if running == 0:
+        return 0
+    return round(value * enabled / running) if running < enabled else value
+
+
+def _close(fds):
+    for fd in fds:
+        os.close(fd)
+    fds.clear()
+
+
+class PerfProbe:
+    def __init__(self, names=tuple(COUNTERS)):
+        self.names = list(names)
+        self.counts = {name: [] for name in self.names}
+        self.user_only, self.unavailable = [], {}
+        self._fds = {name: {} for name in self.names}  # name: {tid: fd}
+        self._all_fds = []
+        self._opened = False
+        weakref.finalize(self, _close, self._all_fds)
+
+    def _open(self, name, tid):
+        try:
+            fd = open_counter(name, tid, name in self.user_only)
+        except OSError as e:
+            if e.errno not in (errno.EACCES, errno.EPERM) or name in self.user_only:
+                raise
+            fd = open_counter(name, tid, user_only=True)
+            self.user_only.append(name)
+        self._fds[name][tid] = fd
+        self._all_fds.append(fd)
+
+    def _open_all(self):
+        # Threads started after this inherit the counters of the thread that
+        # starts them, so opening theirs as well would count them twice
+        try:
+            tids = [int(tid) for tid in os.listdir("/proc/self/task")]
+        except OSError:
+            tids = [0]
+        for name in list(self.names):
+            for tid in tids:
+                try:
+                    self._open(name, tid)
+                except OSError as e:
+                    if e.errno == errno.ESRCH:
+                        continue  # The thread has exited
+                    if name not in _warned:
+                        log.warning("can't count %s: %s", name, e.strerror)
+                        _warned.add(name)
+                    self.unavailable[name] = e.strerror
+                    self.names.remove(name)
+                    self.counts.pop(name)
+                    break
+
+    def start(self):
+        if not self._opened:
+            self._open_all()
+            self._opened = True
+        # Read rather than reset, which wouldn't clear what exited threads
+        # counted
+        self._before = {
+            name: [read_counter(fd) for fd in self._fds[name].values()]
+            for name in self.names
+        }
+        for name in self.names:
+            for fd in self._fds[name].values():
+                fcntl.ioctl(fd, IOC_ENABLE, 0)
+
+    def stop(self):
+        for name in self.names:
+            fds = list(self._fds[name].values())
+            for fd in fds:
+                fcntl.ioctl(fd, IOC_DISABLE, 0)
+            after = [read_counter(fd) for fd in fds]
+            self.counts[name].append(sum(map(scaled, self._before[name], after)))
+
+    def info(self):
+        return {
+            "perf": {
+                **self.counts,
+                "user_only": self.user_only,
+                "unavailable": self.unavailable,
+            }
+        }
+
+
+def probes():
+    """The probes to pass to `_timing.Timer`: a PerfProbe if enabled."""
+    return [PerfProbe()] if enabled else []
@@ -0,0 +1,116 @@
+"""Profile one extra, untimed iteration of a benchmark (`--profile=true`).
+
+The profile is taken with py-spy where it is installed and allowed to
+attach to this process (which takes root or CAP_SYS_PTRACE on most
+systems), sampling native frames as well as Python ones, and saved as
+speedscope JSON (https://www.speedscope.app). Otherwise, a thread samples
+the Python stack of the benchmark every BENCHMARKS_PROFILE_INTERVAL
+seconds (default 0.005), and the profile is saved as collapsed stacks, the
+input of flamegraph.pl and friends.
+
+Profiles are written to "$BENCHMARKS_DATA_DIR/profiles/", and their path is
+added to the result's info as "profile".
+"""
+import collections
+import datetime
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+from benchmarks import _sources
+
+log = logging.getLogger(__name__)
+
+profiles_dir = os.path.join(_sources.data_dir, "profiles")
+interval = float(os.getenv("BENCHMARKS_PROFILE_INTERVAL") or 0.005)
+
+# How long py-spy gets to attach before the iteration starts
+ATTACH_SECONDS = 1.0
+
+
+class Sampler:
+    """Samples a thread's Python stack from another thread."""
+
+    def __init__(self, thread_id=None, interval=interval):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                filename = os.path.basename(code.co_filename)
+                stack.append(f"{code.co_name} ({filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        """The samples as collapsed stacks, one "frame;frame;... count" per
+        line."""
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+
+def _py_spy(path):
+    """A py-spy attached to this process, or None if it can't be."""
+    py_spy = shutil.which("py-spy")
+    if py_spy is None:
+        return None
+    rate = str(round(1 / interval))
+    command = [py_spy, "record", "--pid", str(os.getpid()), "--native"]
+    command += ["--rate", rate, "--format", "speedscope", "--output", path]
+    process = subprocess.Popen(
+        command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    time.sleep(ATTACH_SECONDS)
+    if process.poll() is not None:
+        log.warning("py-spy can't profile: %s", process.stderr.read().strip())
+        return None
+    return process
+
+
+def profile(f, name, directory=None):
+    """Run f() once under a profiler, returning the path of the profile."""
+    directory = directory or profiles_dir
+    os.makedirs(directory, exist_ok=True)
+    now = datetime.datetime.now().strftime("%Y%m%dT%H%M%S")
+    stem = os.path.join(directory, f"{name}-{now}-{uuid.uuid4().hex[:8]}")
+
+    path = f"{stem}.speedscope.json"
+    process = _py_spy(path)
+    if process is not None:
+        try:
+            f()
+        finally:
+            # py-spy writes its profile when interrupted
+            process.send_signal(signal.SIGINT)
+            process.wait()
+        if os.path.exists(path):
+            return path
+        log.warning("py-spy didn't write a profile, sampling again")
+
+    path = f"{stem}.collapsed.txt"
+    with Sampler() as sampler:
+        f()
+    with open(path, "w") as out:
+        out.write(sampler.collapsed())
+    return path
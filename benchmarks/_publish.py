@@ -0,0 +1,227 @@
+"""Publish results to Conbench in the background.
+
+Benchmarks hand their results to `publish()`, which appends them to a spool
+file and queues them for a background thread, so a slow or unreachable
+Conbench server doesn't hold up the next case. The thread drains the queue
+in batches of up to BENCHMARKS_PUBLISH_BATCH results (default 20), posting
+each batch back to back over one connection, and then drops the posted
+results from the spool. Conbench's API takes one result per POST, so a
+batch is a burst of POSTs rather than a single request.
+
+The queue holds at most BENCHMARKS_PUBLISH_QUEUE results (default 100);
+past that, `publish()` waits for the thread to catch up. At exit, the
+thread gets up to BENCHMARKS_PUBLISH_TIMEOUT seconds (default 300) to
+finish.
+
+Each process spools to its own JSONL file in
+"$BENCHMARKS_DATA_DIR/results-spool/", locked for as long as the process
+runs. Results that couldn't be posted (the server was down, or the process
+was killed) stay there, and the next run posts the spools of processes that
+are gone before its own results. While the server is down, the thread
+retries with exponential backoff, up to MAX_RETRY_DELAY seconds apart.
+
+Results the server rejects (a 4xx response, which posting again won't
+change) are moved to "results-spool/rejected/" instead, to be looked at by
+hand, so that they don't hold up the results after them.
+"""
+import atexit
+import glob
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+
+from benchmarks import _locking, _sources
+
+log = logging.getLogger(__name__)
+
+spool_dir = os.path.join(_sources.data_dir, "results-spool")
+batch_size = int(os.getenv("BENCHMARKS_PUBLISH_BATCH") or 20)
+queue_size = int(os.getenv("BENCHMARKS_PUBLISH_QUEUE") or 100)
+timeout = float(os.getenv("BENCHMARKS_PUBLISH_TIMEOUT") or 300)
+
+MAX_RETRY_DELAY = 60.0
+
+
+def rejection(error):
+    """The HTTP status of an error posting a result if the server rejected
+    it, or None if posting it again might work."""
+    response = getattr(error, "error_response", None)
+    status = getattr(response, "status_code", None)
+    if status is not None and 400 <= status < 500 and status not in (401, 408, 429):
+        return status
+    return None
+
+
+class Spool:
+    """A JSONL file of {"id", "path", "body"} records still to be posted."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def read(self):
+        try:
+            with open(self.path) as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def append(self, record):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._lock, open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def remove(self, ids):
+        with self._lock:
+            remaining = [r for r in self.read() if r["id"] not in ids]
+            if not remaining:
+                os.remove(self.path)
+                return
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                f.writelines(json.dumps(r) + "\n" for r in remaining)
+            os.replace(tmp, self.path)
+
+
+class Publisher:
+    """Posts results from a background thread, see the module docstring.
+
+    `post(path, body)` does the posting, e.g. `ConbenchClient().post`.
+    """
+
+    def __init__(self, post, spool_dir=spool_dir, batch_size=batch_size):
+        self.post, self.spool_dir, self.batch_size = post, spool_dir, batch_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.posted, self.rejected, self.failed = 0, 0, False
+        os.makedirs(spool_dir, exist_ok=True)
+        name = f"{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl"
+        self.spool = Spool(os.path.join(spool_dir, name))
+        self.rejects = Spool(os.path.join(spool_dir, "rejected", name))
+        # Held until this process exits, so that no other run replays our spool
+        self._owner = _locking.file_lock(f"{self.spool.path}.lock")
+        self._owner.__enter__()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def publish(self, path, body):
+        record = {"id": uuid.uuid4().hex, "path": path, "body": body}
+        self.spool.append(record)
+        self.queue.put(record)
+
+    def close(self, timeout=timeout):
+        """Wait for queued results to be posted, for up to `timeout` seconds."""
+        self.queue.put(None)
+        self.thread.join(timeout)
+        if self.thread.is_alive() or self.failed:
+            log.warning("results left to publish next run in %s", self.spool.path)
+        self._owner.__exit__(None, None, None)
+        if not os.path.exists(self.spool.path):
+            os.remove(f"{self.spool.path}.lock")
+
+    def _run(self):
+        self._replay()
+        pending, done = [], False
+        delay, retry_at = 0.0, 0.0
+        while not done:
+            # Wait for results, or until it's time to retry those left
+            wait = max(retry_at - time.monotonic(), 0) if pending else None
+            try:
+                records = [self.queue.get(timeout=wait)]
+            except queue.Empty:
+                records = []
+            while len(records) < self.batch_size and None not in records:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in records:
+                records.remove(None)
+                done = True
+            pending += records
+            if time.monotonic() < retry_at and not done:
+                continue
+            pending = self._post(self.spool, pending)
+            delay = min(max(2 * delay, 1.0), MAX_RETRY_DELAY) if pending else 0.0
+            retry_at = time.monotonic() + delay
+        self.failed = bool(pending)
+
+    def _post(self, spool, records):
+        """Post records in order, until one fails other than by being
+        rejected, and return the ones left to post."""
+        handled, left = set(), []
+        for i, record in enumerate(records):
+            try:
+                self.post(record["path"], record["body"])
+                self.posted += 1
+            except Exception as e:
+                status = rejection(e)
+                if status is None:
+                    log.exception(
+                        "failed to publish results, spooled in %s", spool.path
+                    )
+                    left = records[i:]
+                    break
+                log.error(
+                    "Conbench rejected a result (HTTP %s), moved to %s: %s",
+                    status,
+                    self.rejects.path,
+                    e,
+                )
+                self.rejects.append(record)
+                self.rejected += 1
+            handled.add(record["id"])
+        if handled:
+            spool.remove(handled)
+        return left
+
+    def _replay(self):
+        """Post what earlier runs left behind in their spools, unless the
+        server is down."""
+        for path in sorted(glob.glob(os.path.join(self.spool_dir, "*.jsonl"))):
+            if path == self.spool.path:
+                continue
+            with _locking.file_lock(f"{path}.lock", blocking=False) as acquired:
+                if not acquired:
+                    continue  # Its process is still running
+                spool = Spool(path)
+                records = spool.read()
+                log.info("publishing %d spooled results from %s", len(records), path)
+                for start in range(0, len(records), self.batch_size):
+                    batch = records[start:][: self.batch_size]
+                    if self._post(spool, batch):
+                        return  # Leave the rest for the next run
+            if not os.path.exists(path):
+                os.remove(f"{path}.lock")
+
+
+_publisher = None
+_publisher_lock = threading.Lock()
+
+
+def publish(path, body, post):
+    """Queue a result for posting with `post(path, body)`."""
+    global _publisher
+    with _publisher_lock:
+        if _publisher is None:
+            _publisher = Publisher(post)
+    _publisher.publish(path, body)
+
+
+@atexit.register
+def close():
+    """Wait for the results queued by `publish()` to be posted.
+
+    Runs at exit, but processes that leave with os._exit() (such as
+    multiprocessing workers) have to call it themselves.
+    """
+    global _publisher
+    with _publisher_lock:
+        publisher, _publisher = _publisher, None
+    if publisher is not None:
+        publisher.close()
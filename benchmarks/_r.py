@@ -0,0 +1,227 @@
+"""A long-lived R process for the R benchmarks.
+
+Starting R and loading arrowbench takes seconds, and the R benchmarks used
+to pay that for every iteration of every case, plus a few more times to
+look up R and arrow versions. Instead, `session()` starts one R process per
+benchmark process, and `RSession.execute()` sends it commands over its
+stdin and reads their output back from stdout and stderr, much like
+`R -e <command>` would print them.
+
+Each command is written to a file and evaluated in R's global environment
+inside tryCatch(), so an error fails the command without ending the
+session. If R itself dies (e.g. a crash in a benchmark), the command fails
+and the next one starts a new session.
+
+Set BENCHMARKS_R_SESSION=false to go back to one R process per command.
+
+Benchmarks with many cases can also send all of them to arrowbench at once,
+with `run_benchmark()` rather than one `run_one()` per case and iteration
+(see `BenchmarkR.r_benchmarks()`). Set BENCHMARKS_R_BATCH=false to run the
+cases one by one instead.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import uuid
+
+log = logging.getLogger(__name__)
+
+enabled = os.getenv("BENCHMARKS_R_SESSION", "true").lower() not in ("0", "false")
+batch = os.getenv("BENCHMARKS_R_BATCH", "true").lower() not in ("0", "false")
+
+# Environment variables that R only reads at startup: a session started
+# with other values is replaced.
+STARTUP_ENV = ("ARROW_DEFAULT_MEMORY_POOL", "ARROW_IO_THREADS")
+
+# What `R -e` prints first, so that outputs look the same either way
+BANNER = (
+    'cat(R.version.string, " -- \\"", R.version$nickname, "\\"\\n",'
+    ' "Copyright (C) ", R.version$year,'
+    ' " The R Foundation for Statistical Computing\\n",'
+    ' "Platform: ", R.version$platform, "\\n", sep = "")'
+)
+
+EVALUATE = """local({{
+  status <- tryCatch({{
+    for (e in parse(file = "{path}")) {{
+      r <- withVisible(eval(e, envir = globalenv()))
+      if (r$visible) print(r$value)
+    }}
+    "ok"
+  }}, error = function(e) {{
+    message("Error: ", conditionMessage(e))
+    "error"
+  }})
+  cat("\\n{token} ", status, "\\n", sep = "")
+  message("{token}")
+  flush(stdout())
+  flush(stderr())
+}})
+"""
+
+
+def r_value(value):
+    """A Python value as an R literal."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return json.dumps(str(value))
+
+
+def run_one(bm, params):
+    """The arrowbench command that runs one case of benchmark `bm` (an R
+    expression, e.g. "tpc_h"), with the case's parameters."""
+    arguments = "".join(f", {key}={r_value(value)}" for key, value in params.items())
+    return f"library(arrowbench); run_one({bm}{arguments})"
+
+
+def run_benchmark(bm, grid, n_iter=1, drop_caches=False):
+    """The arrowbench command that runs every case in `grid` (a list of
+    parameter dicts with the same keys), `n_iter` times each, dropping
+    caches before each iteration if `drop_caches`.
+
+    Parameters that are None in every case are left out, which is how
+    arrowbench takes NULL (e.g. cpu_count=NULL for all the cores).
+    """
+    keys = [key for key in grid[0] if any(p[key] is not None for p in grid)]
+    columns = []
+    for key in keys:
+        values = [p[key] for p in grid]
+        if None in values:
+            raise ValueError(f"{key} can't be NULL in some cases only")
+        columns.append(f"{key} = c({', '.join(r_value(v) for v in values)})")
+    params = f"data.frame({', '.join(columns)}, stringsAsFactors = FALSE)"
+    arguments = f"params = {params}, n_iter = {n_iter}"
+    if drop_caches:
+        arguments += ', drop_caches = "iteration"'
+    return f"library(arrowbench); run_benchmark({bm}, {arguments})"
+
+
+def _normalized(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).lower()
+
+
+def matches(result, params):
+    """Whether an arrowbench result is for the case with these parameters.
+
+    Results that record none of the parameters match any case, so that they
+    are taken in the order of the cases, which is the order arrowbench runs
+    them in.
+    """
+    recorded = {**(result.get("params") or {}), **(result.get("tags") or {})}
+    compared = [k for k, v in params.items() if v is not None and k in recorded]
+    return all(
+        _normalized(params[key]) == _normalized(recorded[key]) for key in compared
+    )
+
+
+class RSessionError(Exception):
+    pass
+
+
+class RSession:
+    def __init__(self, command=("R", "--no-save", "--no-restore", "--no-echo")):
+        self.env = {key: os.environ.get(key) for key in STARTUP_ENV}
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+        )
+        # stderr is read by a thread, so that neither pipe can fill up and
+        # block R while we wait on the other one
+        self._stderr = queue.Queue()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+        self._lock = threading.Lock()
+        self.commands = 0
+        self.banner, _ = self.execute(BANNER)
+
+    @property
+    def alive(self):
+        return self.process.poll() is None
+
+    def _read_stderr(self):
+        for line in self.process.stderr:
+            self._stderr.put(line)
+        self._stderr.put(None)
+
+    def execute(self, command, quiet=True):
+        """Run an R command, returning its (stdout, stderr) like
+        conbench's execute_r_command(); `quiet=False` adds the R banner and
+        the echoed command to stdout, as `R -e` does."""
+        with tempfile.NamedTemporaryFile("w", suffix=".R", delete=False) as f:
+            f.write(command)
+        try:
+            with self._lock:
+                stdout, stderr, status = self._evaluate(f.name)
+        finally:
+            os.remove(f.name)
+        self.commands += 1
+        if status != "ok":
+            raise RSessionError(stderr)
+        if not quiet:
+            stdout = f"{self.banner}\n> {command}\n{stdout}"
+        return stdout, stderr
+
+    def _evaluate(self, path):
+        token = f"BENCHMARKS-{uuid.uuid4().hex}"
+        try:
+            self.process.stdin.write(EVALUATE.format(path=path, token=token))
+            self.process.stdin.flush()
+        except BrokenPipeError:
+            pass
+
+        lines, status = [], "died"
+        for line in self.process.stdout:
+            if line.startswith(f"{token} "):
+                status = line.split()[1]
+                break
+            lines.append(line)
+        stdout = "".join(lines).strip()
+
+        errors = []
+        while True:
+            line = self._stderr.get()
+            if line is None or line.strip() == token:
+                break
+            errors.append(line)
+        stderr = "".join(errors).strip()
+        if status == "died":
+            stderr = f"R exited with code {self.process.wait()}\n{stderr}"
+        return stdout, stderr, status
+
+    def close(self):
+        if self.alive:
+            self.process.stdin.write('quit(save = "no")\n')
+            self.process.stdin.close()
+            self.process.wait()
+
+
+_session = None
+
+
+def session():
+    """The R session of this process, started on first use."""
+    global _session
+    if _session is not None:
+        env = {key: os.environ.get(key) for key in STARTUP_ENV}
+        if not _session.alive or _session.env != env:
+            _session.close()
+            _session = None
+    if _session is None:
+        log.info("starting an R session")
+        _session = RSession()
+        atexit.register(_session.close)
+    return _session
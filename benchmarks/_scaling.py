@@ -0,0 +1,177 @@
+"""Thread-scaling sweeps.
+
+Runs a benchmark over a grid of CPU and IO thread counts (1, 2, 4, ... up to
+the number of cores by default), each grid point in its own `conbench`
+process, and reports how each case scales:
+
+    python -m benchmarks._scaling csv-read ALL --all=true --iterations=3
+    python -m benchmarks._scaling file-read nyctaxi_sample --io-thread-counts=8
+
+Options before the benchmark name select the grid:
+
+    --cpu-counts=1,2,4     CPU thread counts (default: powers of two up to
+                           the number of cores, and the number of cores)
+    --io-thread-counts=8   IO thread counts (default: the same as the CPU
+                           thread counts)
+    --output=scaling.json  also write the report to this file
+
+Everything else is passed on to `conbench`, e.g. `--iterations=3`. The grid
+point results are published like any other (unless DRY_RUN is set), tagged
+with their cpu_count and io_thread_count.
+
+For each case, the report lists every grid point's median time, its speedup
+over the point with the fewest threads, and its parallel efficiency, i.e.
+speedup divided by how many times more CPU threads it has than that point.
+
+A grid point whose `conbench` command fails doesn't stop the sweep: the
+results it printed before failing are kept, and the point is listed under
+"failed" in the report, with the end of its stderr. The sweep then exits
+with an error.
+"""
+import json
+import logging
+import os
+import subprocess
+import sys
+
+log = logging.getLogger(__name__)
+
+THREAD_TAGS = ("cpu_count", "io_thread_count")
+# Lines of a failed grid point's stderr kept in the report
+STDERR_TAIL = 20
+
+
+def thread_counts(maximum=None):
+    """1, 2, 4, ... up to `maximum` (by default the number of cores), always
+    including `maximum` itself."""
+    maximum = maximum or os.cpu_count() or 1
+    counts, count = [], 1
+    while count < maximum:
+        counts.append(count)
+        count *= 2
+    return counts + [maximum]
+
+
+def parse_results(stdout):
+    """The JSON results that `conbench <benchmark>` printed."""
+    decoder, results, index = json.JSONDecoder(), [], 0
+    while True:
+        index = stdout.find("{", index)
+        if index < 0:
+            return results
+        try:
+            result, index = decoder.raw_decode(stdout, index)
+        except json.JSONDecodeError:
+            index += 1
+            continue
+        if isinstance(result, dict) and "tags" in result:
+            results.append(result)
+
+
+def _case(result):
+    tags = {k: v for k, v in result["tags"].items() if k not in THREAD_TAGS}
+    return json.dumps(tags, sort_keys=True)
+
+
+def curves(results):
+    """Speedup and efficiency of each case across the grid.
+
+    Returns a list of {"tags": ..., "points": [...]} entries, one per case,
+    with one point per grid point, ordered by thread counts.
+    """
+    cases = {}
+    for result in results:
+        if "stats" not in result:
+            continue
+        cases.setdefault(_case(result), []).append(result)
+
+    report = []
+    for case, grid in cases.items():
+        grid.sort(key=lambda r: tuple(r["tags"].get(t) or 0 for t in THREAD_TAGS))
+        baseline = float(grid[0]["stats"]["median"])
+        baseline_cpu_count = grid[0]["tags"].get("cpu_count") or 1
+        points = []
+        for result in grid:
+            median = float(result["stats"]["median"])
+            # How many times the baseline's CPU threads this point has
+            threads = (result["tags"].get("cpu_count") or 1) / baseline_cpu_count
+            speedup = baseline / median if median else None
+            points.append(
+                {
+                    "cpu_count": result["tags"].get("cpu_count"),
+                    "io_thread_count": result["tags"].get("io_thread_count"),
+                    "median": median,
+                    "speedup": speedup,
+                    "efficiency": speedup / threads if speedup else None,
+                }
+            )
+        report.append({"tags": json.loads(case), "points": points})
+    return report
+
+
+def sweep(args, cpu_counts, io_thread_counts):
+    """Run `conbench <args>` at every grid point, returning all results, and
+    the grid points whose command failed."""
+    results, failed = [], []
+    for cpu_count in cpu_counts:
+        for io_thread_count in io_thread_counts:
+            command = [
+                "conbench",
+                *args,
+                f"--cpu-count={cpu_count}",
+                f"--io-thread-count={io_thread_count}",
+                "--show-result=true",
+                "--show-output=false",
+            ]
+            log.info("scaling sweep: %s", " ".join(command))
+            result = subprocess.run(command, capture_output=True)
+            results.extend(parse_results(result.stdout.decode()))
+            if result.returncode:
+                stderr = result.stderr.decode(errors="replace").splitlines()
+                log.error("failed with exit code %s", result.returncode)
+                failed.append(
+                    {
+                        "cpu_count": cpu_count,
+                        "io_thread_count": io_thread_count,
+                        "returncode": result.returncode,
+                        "stderr": "\n".join(stderr[-STDERR_TAIL:]),
+                    }
+                )
+    return results, failed
+
+
+def _counts(value):
+    return [int(count) for count in value.split(",") if count]
+
+
+def main(argv):
+    cpu_counts = io_thread_counts = None
+    output = None
+    while argv and argv[0].startswith("--"):
+        option, _, value = argv.pop(0).partition("=")
+        if option == "--cpu-counts":
+            cpu_counts = _counts(value)
+        elif option == "--io-thread-counts":
+            io_thread_counts = _counts(value)
+        elif option == "--output":
+            output = value
+        else:
+            raise SystemExit(f"Unknown option {option}, see {__file__}")
+    if not argv:
+        raise SystemExit(__doc__)
+
+    cpu_counts = cpu_counts or thread_counts()
+    io_thread_counts = io_thread_counts or cpu_counts
+    results, failed = sweep(argv, cpu_counts, io_thread_counts)
+    text = json.dumps({"cases": curves(results), "failed": failed}, indent=2)
+    print(text)
+    if output:
+        with open(output, "w") as f:
+            f.write(text)
+    if failed:
+        raise SystemExit(f"{len(failed)} grid point(s) failed")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main(sys.argv[1:])
@@ -0,0 +1,229 @@
+"""Run the commands in benchmarks.json in parallel, across hosts and cores.
+
+Each command's cost is estimated from how long it took in past runs
+(recorded in "$BENCHMARKS_DATA_DIR/durations.json"), and commands are packed
+onto hosts longest first, each onto the host with the least work so far
+(longest processing time first). Within a host, commands run concurrently on
+core groups, except where they would interfere with each other:
+
+* exclusive commands run alone: those that drop the page cache
+  (--drop-caches=true), which would cool every other command's caches, and
+  those flagged "exclusive".
+* "cloud" commands share the network, so they run one after another, in the
+  same lane.
+* R commands share arrowbench's "results" directory, so they too run one
+  after another.
+
+Note that `conbench list` adds --drop-caches=true to every command but the
+C++, Java and JavaScript micro benchmarks, so as benchmarks.json stands,
+only those three share a host's core groups: the Python and R commands are
+all exclusive, and what shortens their part of a run is spreading them
+over more hosts.
+
+To plan for 4 hosts with two core groups each:
+
+    python -m benchmarks._schedule plan --hosts=4 --cores=0-15:16-31 > plan.json
+
+and to run the share of host 0 (of 4) of that plan:
+
+    python -m benchmarks._schedule run --plan=plan.json --host=0 --cores=0-15:16-31
+
+The plan is made once and handed to every host, because each host only
+records the durations of the commands it ran: plans made from the hosts'
+own durations would differ, and their shares would overlap or leave
+commands out. So `run` only makes its own plan for a single host.
+
+Arguments after "--" are appended to every command, e.g. "-- --run-id=...".
+"""
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks import _isolation, _locking, _sources
+
+log = logging.getLogger(__name__)
+
+this_dir = os.path.dirname(os.path.abspath(__file__))
+benchmarks_file = os.path.join(this_dir, "..", "benchmarks.json")
+durations_path = os.path.join(_sources.data_dir, "durations.json")
+
+# Cost of a command that has never run, if no command has
+DEFAULT_SECONDS = 600
+# Weight of the latest duration in a command's running estimate
+SMOOTHING = 0.5
+
+SERIAL_GROUPS = ("cloud", "R")
+
+
+def load_durations(path=durations_path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def record_duration(command, seconds, path=durations_path):
+    """Fold a command's latest duration into its estimate."""
+    with _locking.file_lock(f"{path}.lock"):
+        durations = load_durations(path)
+        previous = durations.get(command)
+        if previous is not None:
+            seconds = SMOOTHING * seconds + (1 - SMOOTHING) * previous
+        durations[command] = seconds
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(durations, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+
+
+def estimate(benchmarks, durations):
+    """Estimated seconds per command; unknown commands cost the median of
+    the known ones."""
+    known = [durations[b["command"]] for b in benchmarks if b["command"] in durations]
+    default = statistics.median(known) if known else DEFAULT_SECONDS
+    return {b["command"]: durations.get(b["command"], default) for b in benchmarks}
+
+
+def interference(benchmark):
+    """Whether a benchmark must run alone ("exclusive"), in a serial group
+    ("cloud" or "R"), or anywhere (None)."""
+    flags = benchmark.get("flags", {})
+    if flags.get("exclusive") or "--drop-caches=true" in benchmark["command"]:
+        return "exclusive"
+    if flags.get("cloud"):
+        return "cloud"
+    if flags.get("language") == "R":
+        return "R"
+    return None
+
+
+def _lpt(items, bins):
+    """Pack (cost, item) pairs onto `bins` bins, longest first."""
+    loads, packed = [0.0] * bins, [[] for _ in range(bins)]
+    for cost, item in sorted(items, key=lambda pair: -pair[0]):
+        least = loads.index(min(loads))
+        loads[least] += cost
+        packed[least].append(item)
+    return packed, loads
+
+
+def plan(benchmarks, hosts=1, lanes=1, durations=None):
+    """Assign commands to hosts, and each host's commands to either its
+    exclusive phase or one of its lanes (core groups).
+
+    Returns one {"exclusive": [...], "lanes": [[...], ...],
+    "estimated_seconds": ...} entry per host.
+    """
+    costs = estimate(benchmarks, durations or {})
+    by_host, _ = _lpt([(costs[b["command"]], b) for b in benchmarks], hosts)
+
+    result = []
+    for host_benchmarks in by_host:
+        exclusive, serial, free = [], {}, []
+        for b in host_benchmarks:
+            kind = interference(b)
+            if kind == "exclusive":
+                exclusive.append(b["command"])
+            elif kind in SERIAL_GROUPS:
+                serial.setdefault(kind, []).append(b["command"])
+            else:
+                free.append(b["command"])
+
+        # Serial groups are packed as a whole, so they stay in one lane
+        units = [(costs[c], [c]) for c in free]
+        units += [(sum(costs[c] for c in group), group) for group in serial.values()]
+        packed, loads = _lpt(units, lanes)
+        result.append(
+            {
+                "exclusive": exclusive,
+                "lanes": [[c for unit in lane for c in unit] for lane in packed],
+                "estimated_seconds": sum(costs[c] for c in exclusive) + max(loads),
+            }
+        )
+    return result
+
+
+def _run_command(command, extra_args, cores=None):
+    """Run one `conbench` command, pinned to the cores, and record how long
+    it took. Returns whether it succeeded."""
+    args = ["conbench", *command.split(), *extra_args]
+    if cores:
+        # Not preexec_fn, which isn't safe with the lanes' threads
+        args = ["taskset", "--cpu-list", ",".join(map(str, cores)), *args]
+    log.info("running: %s", " ".join(args))
+    started = time.monotonic()
+    completed = subprocess.run(args)
+    if completed.returncode == 0:
+        record_duration(command, time.monotonic() - started)
+    else:
+        log.error("failed with exit code %s: %s", completed.returncode, command)
+    return completed.returncode == 0
+
+
+def run(host_plan, core_groups, extra_args=()):
+    """Run a host's share of a plan: the exclusive commands one at a time,
+    then each lane on its own core group, concurrently."""
+    if len(host_plan["lanes"]) != len(core_groups):
+        raise ValueError(
+            f"the plan has {len(host_plan['lanes'])} lanes per host, "
+            f"but there are {len(core_groups)} core groups"
+        )
+    ok = [_run_command(command, extra_args) for command in host_plan["exclusive"]]
+
+    # Each lane's thread only appends to its own list
+    lanes_ok = [[] for _ in core_groups]
+
+    def lane(commands, cores, lane_ok):
+        for command in commands:
+            lane_ok.append(_run_command(command, extra_args, cores))
+
+    threads = [
+        threading.Thread(target=lane, args=args)
+        for args in zip(host_plan["lanes"], core_groups, lanes_ok)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return all(ok + sum(lanes_ok, []))
+
+
+def main(argv):
+    action, options, extra_args = argv[0] if argv else None, {}, []
+    if "--" in argv:
+        separator = argv.index("--")
+        argv, extra_args = argv[:separator], argv[separator:][1:]
+    for arg in argv[1:]:
+        key, _, value = arg.lstrip("-").partition("=")
+        options[key] = value
+    if action not in ("plan", "run"):
+        raise SystemExit(__doc__)
+
+    core_groups = _isolation.core_groups(options.get("cores", ""), "")
+    hosts = int(options.get("hosts", 1))
+    if action == "run" and "plan" in options:
+        with open(options["plan"]) as f:
+            schedule = json.load(f)
+    elif action == "run" and hosts > 1:
+        raise SystemExit("running on several hosts needs a --plan shared by all")
+    else:
+        with open(options.get("benchmarks", benchmarks_file)) as f:
+            benchmarks = json.load(f)
+        schedule = plan(benchmarks, hosts, len(core_groups), load_durations())
+
+    if action == "plan":
+        print(json.dumps(schedule, indent=2))
+        return
+    if not run(schedule[int(options.get("host", 0))], core_groups, extra_args):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main(sys.argv[1:])
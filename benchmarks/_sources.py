@@ -1,19 +1,33 @@
+import atexit
+import collections
 import functools
 import logging
 import os
 import pathlib
+import time
 from enum import Enum
 
+import numpy
 import pyarrow
 import pyarrow.csv
+import pyarrow.dataset
 import pyarrow.feather as feather
+import pyarrow.ipc
 import pyarrow.parquet as parquet
-import requests
+
+from benchmarks import _cache, _download, _generate, _manifest, _tpch
 
 this_dir = os.path.dirname(os.path.abspath(__file__))
 local_data_dir = os.path.join(this_dir, "data")
 data_dir = os.getenv("BENCHMARKS_DATA_DIR", local_data_dir)
 temp_dir = os.path.join(data_dir, "temp")
+checksums_path = os.path.join(data_dir, ".checksums.json")
+# "parquet" or "ipc", see Source.table
+canonical_format = os.getenv("BENCHMARKS_CANONICAL_FORMAT", "parquet").lower()
+derived_cache = _cache.DerivedCache(
+    os.path.join(temp_dir, "cache"),
+    budget=_cache.parse_bytes(os.getenv("BENCHMARKS_TEMP_BUDGET")),
+)
 
 
 log = logging.getLogger(__name__)
@@ -46,6 +60,7 @@ class SourceFormat(Enum):
     CSV = "csv"
     PARQUET = "parquet"
     FEATHER = "feather"
+    GENERATED = "generated"
 
 
 # This is a reconstructed schema; it may not be completely accurate, but should
@@ -128,6 +143,108 @@ def nyctaxi_schema():
     )
 
 
+def generated_schema():
+    return pyarrow.schema(
+        [
+            pyarrow.field("id", pyarrow.int64()),
+            pyarrow.field("count", pyarrow.int32()),
+            pyarrow.field("amount", pyarrow.float64()),
+            pyarrow.field("flag", pyarrow.bool_()),
+            pyarrow.field("timestamp", pyarrow.timestamp("us")),
+            pyarrow.field("name", pyarrow.string()),
+            pyarrow.field("category", pyarrow.string()),
+            pyarrow.field(
+                "category_dict", pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+            ),
+        ]
+    )
+
+
+def _generated(rows, schema=generated_schema, **generator):
+    """Sources generated on the fly, see _generate.py."""
+    return {
+        "download": False,
+        "generator": {"rows": rows, **generator},
+        "schema": schema,
+        "format": SourceFormat.GENERATED,
+    }
+
+
+@functools.lru_cache()
+def _nyctaxi_repartitioned_paths():
+    return [
+        f"ursa-labs-taxi-data-repartitioned-10k/{path}"
+        for path in partition_paths(range(2009, 2020), 12, 101)
+        if not path.startswith("2019/") or path[5:7] <= "06"  # Data ends in 2019/06
+        if not path.startswith("2010/03/")  # Data is missing in 2010/03
+    ]
+
+
+def partition_paths(years, months, parts, flavor="directory"):
+    """Relative paths of the files of a year/month/part partitioned dataset.
+
+    For example, "2009/01/0000/data.parquet", or with the "hive" flavor,
+    "year=2009/month=1/part=0/data.parquet".
+    """
+    template = {
+        "directory": "{year}/{month:02}/{part:04}/data.parquet",
+        "hive": "year={year}/month={month}/part={part}/data.parquet",
+    }[flavor]
+    return [
+        template.format(year=year, month=month, part=part)
+        for year in years
+        for month in range(1, months + 1)
+        for part in range(parts)
+    ]
+
+
+def _repartitioned(
+    source, schema, years, months, parts, rows_per_file=None, file_size=None, **kwargs
+):
+    """Sources partitioned locally from another source, see
+    `Source.create_partitioned()`."""
+    return {
+        "download": False,
+        "repartition": {
+            "source": source,
+            "years": years,
+            "months": months,
+            "parts": parts,
+            "rows_per_file": rows_per_file,
+            "file_size": file_size,
+            "flavor": kwargs.get("flavor", "directory"),
+        },
+        "schema": schema,
+        "format": SourceFormat.PARQUET,
+    }
+
+
+# The mixed-type sources have 10% nulls, unique "name" strings and 1000
+# distinct "category" strings.
+GENERATED_MIXED = {
+    "seed": 42,
+    "null_fraction": 0.1,
+    "string_length": 16,
+    "columns": {
+        "category": {"cardinality": 1000, "string_length": 8},
+        "category_dict": {"cardinality": 1000, "string_length": 8},
+    },
+}
+
+# Mimics the columns of the nyctaxi sources that the dataset filter uses.
+GENERATED_NYCTAXI = {
+    "seed": 42,
+    "null_fraction": 0.01,
+    "columns": {
+        "vendor_id": {"values": ["CMT", "DDS", "VTS"], "null_fraction": 0},
+        "passenger_count": {"min": 0, "max": 6, "null_fraction": 0},
+        "store_and_fwd_flag": {"values": ["0", "1", "2"]},
+        "payment_type": {"values": ["CASH", "CREDIT", "DISPUTE", "NO CHARGE"]},
+        "rate_code": {"min": 1, "max": 6},
+        "trip_distance": {"min": 0, "max": 50},
+    },
+}
+
 STORE = {
     "fanniemae_sample": {
         "path": _local("fanniemae_sample.csv"),
@@ -244,18 +361,45 @@ STORE = {
     },
     "nyctaxi_multi_parquet_s3_repartitioned": {
         "download": False,
-        "paths": [
-            f"ursa-labs-taxi-data-repartitioned-10k/{year}/{month:02}/{part:04}/data.parquet"
-            for year in range(2009, 2020)
-            for month in range(1, 13)
-            for part in range(101)
-            if not (year == 2019 and month > 6)  # Data ends in 2019/06
-            and not (year == 2010 and month == 3)  # Data is missing in 2010/03
-        ],
+        "paths": _nyctaxi_repartitioned_paths,
         "region": "us-east-2",
         "schema": nyctaxi_schema,
         "format": SourceFormat.PARQUET,
     },
+    "nyctaxi_repartitioned_sample": _repartitioned(
+        "nyctaxi_sample", nyctaxi_schema, years=3, months=12, parts=4, rows_per_file=100
+    ),
+    "nyctaxi_repartitioned_sample_hive": _repartitioned(
+        "nyctaxi_sample",
+        nyctaxi_schema,
+        years=3,
+        months=12,
+        parts=4,
+        rows_per_file=100,
+        flavor="hive",
+    ),
+    # The same layout as nyctaxi_multi_parquet_s3_repartitioned, on local disk.
+    "nyctaxi_repartitioned_10k": _repartitioned(
+        "nyctaxi_2010-01",
+        nyctaxi_schema,
+        years=11,
+        months=12,
+        parts=101,
+        rows_per_file=10_000,
+    ),
+    "generated_sample": _generated(10_000, **GENERATED_MIXED),
+    "generated_1M": _generated(10**6, **GENERATED_MIXED),
+    "generated_10M": _generated(10**7, **GENERATED_MIXED),
+    "generated_100M": _generated(10**8, **GENERATED_MIXED),
+    "nyctaxi_generated_sample": _generated(
+        10_000, schema=nyctaxi_schema, **GENERATED_NYCTAXI
+    ),
+    "nyctaxi_generated_10M": _generated(
+        10**7, schema=nyctaxi_schema, **GENERATED_NYCTAXI
+    ),
+    "nyctaxi_generated_100M": _generated(
+        10**8, schema=nyctaxi_schema, **GENERATED_NYCTAXI
+    ),
 }
 
 
@@ -283,8 +427,12 @@ class Source:
     ├── nyctaxi_2010-01.csv.gz
     ├── nyctaxi_sample.csv
     └── temp
-        ├── fanniemae_sample.zstd.feather
-        ├── nyctaxi_2010-01.snappy.parquet
+        ├── cache
+        │   ├── 0b6f4f0e2c1d...
+        │   │   └── nyctaxi_sample.snappy.parquet
+        │   ├── 5d1c9a7e33b2...
+        │   │   └── fanniemae_sample.zstd.feather
+        │   └── index.json
         └── nyctaxi_sample.snappy.parquet
     └── ursa-labs-taxi-data-sample
         └── 2009
@@ -301,16 +449,30 @@ class Source:
 
     Files in the "data/temp/" folder are the result of running
     benchmarks, and are derived from the canonical source files.
+    Derived files that benchmarks read are kept in "data/temp/cache/",
+    keyed by a hash of the source files and of how they were written
+    (see _cache.py), so they are regenerated whenever either changes.
 
     If a source file isn't initially found in the data folder on disk,
     it will be downloaded from the source location (like S3) and
     placed in the data folder for subsequent benchmark runs.
+
+    Sources with a "generator" entry have no source file at all: their
+    data is generated from a seeded spec (see _generate.py), both for
+    `table` and for the files written by `create_if_not_exists`.
+
+    Source files are checked against their entry in benchmarks/manifest.json
+    (see _manifest.py), and an IntegrityError is raised for a file that
+    doesn't match, rather than benchmarking a truncated or stale file.
     """
 
-    def __init__(self, name):
+    def __init__(self, name, verify=True):
         self.name = name
         self.store = STORE[self.name]
+        self.verify_integrity = verify
+        self.setup_seconds = {}
         self._table = None
+        self._dataframe_nbytes = None
 
         schema = self.store.get("schema")
         self.schema = schema() if schema else None
@@ -322,9 +484,19 @@ class Source:
     def tags(self):
         return {"dataset": self.name}
 
+    @property
+    def generator(self):
+        return self.store.get("generator")
+
     @property
     def paths(self):
-        return self.store.get("paths", [])
+        paths = self.store.get("paths", [])
+        # Long path lists are computed on first use, to keep imports fast.
+        return paths() if callable(paths) else paths
+
+    @property
+    def repartition(self):
+        return self.store.get("repartition")
 
     @property
     def region(self):
@@ -375,6 +547,43 @@ class Source:
         else:
             return []
 
+    def relative_path(self, path):
+        """A source path relative to its data folder, as used in the manifest.
+
+        For example:
+            nyctaxi_2010-01.csv.gz
+        """
+        base = local_data_dir if path.startswith(local_data_dir) else data_dir
+        return os.path.relpath(path, base)
+
+    @property
+    def manifest(self):
+        return _manifest.entries(self.name)
+
+    def verify(self):
+        """Check the source files on disk against the manifest."""
+        manifest = self.manifest
+        unpinned = []
+        for p in self.source_paths:
+            if not os.path.exists(p):
+                continue
+            expected = manifest.get(self.relative_path(p))
+            if expected:
+                _manifest.verify(p, expected, checksums_path)
+            else:
+                unpinned.append(p)
+        if unpinned:
+            # Once per source, some have thousands of files
+            log.warning(
+                "%d file(s) of %s (e.g. %s) aren't in manifest.json, so they "
+                "can't be verified; run `python -m benchmarks._manifest %s` to "
+                "add them",
+                len(unpinned),
+                self.name,
+                unpinned[0],
+                self.name,
+            )
+
     @property
     def format_str(self):
         return self.store.get("format").value
@@ -390,6 +599,22 @@ class Source:
         pathlib.Path(temp_dir).mkdir(exist_ok=True)
         return pathlib.Path(_temp(f"{self.name}.{compression}.{file_type}"))
 
+    def derived_key(self, file_type, compression, **writer_kwargs):
+        """Cache key for a file derived from this source."""
+        parts = {}
+        if self.generator:
+            parts["generator"] = _generate.spec(self.generator)
+            parts["generator_version"] = _generate.VERSION
+        return _cache.key(
+            **parts,
+            sources=[_manifest.checksum(p, checksums_path) for p in self.source_paths],
+            schema=str(self.schema),
+            file_type=file_type,
+            compression=compression,
+            writer_kwargs=writer_kwargs,
+            pyarrow=pyarrow.__version__,
+        )
+
     def create_if_not_exists(self, file_type, compression):
         """Used to create files for benchmarking based on the canonical
         source files found in the benchmarks data folder.
@@ -399,49 +624,226 @@ class Source:
             source.create_if_not_exists("parquet", "snappy")
 
         Will create the following file:
-            data/temp/nyctaxi_sample.snappy.parquet
+            data/temp/cache/<key>/nyctaxi_sample.snappy.parquet
 
         Using the following source file:
             data/nyctaxi_sample.csv
         """
-        path = self.temp_path(file_type, compression)
-        if not path.exists():
-            if file_type == "feather":
-                self._feather_write(self.table, path, compression)
-            elif file_type == "parquet":
-                self._parquet_write(self.table, path, compression)
-            elif file_type == "csv":
-                self._csv_write(self.table, path, compression)
-        return path
+        writers = {
+            "feather": self._feather_write,
+            "parquet": self._parquet_write,
+            "csv": self._csv_write,
+        }
+        write = writers[file_type]
+        writer_kwargs = {}
+        if (file_type, compression) == ("parquet", "snappy"):
+            # This used to be the same file that `table` is cached in, which is
+            # written with microsecond timestamps. Keep it that way so results
+            # stay comparable.
+            writer_kwargs["coerce_timestamps"] = "us"
+
+        def create(path):
+            if self.generator:
+                self._write_generated(file_type, path, compression, **writer_kwargs)
+            else:
+                write(self.table, path, compression, **writer_kwargs)
+
+        return derived_cache.get_or_create(
+            self.derived_key(file_type, compression, **writer_kwargs),
+            f"{self.name}.{compression}.{file_type}",
+            create,
+        )
+
+    def create_partitioned(self):
+        """Used to create a year/month/part partitioned dataset from another
+        source, per the "repartition" entry of this source.
+
+        For example:
+            source = _source.Source("nyctaxi_repartitioned_sample")
+            source.create_partitioned()
+
+        Will create:
+            data/temp/cache/<key>/nyctaxi_repartitioned_sample/2009/01/0000/data.parquet
+            ...
+            data/temp/cache/<key>/nyctaxi_repartitioned_sample/2011/12/0003/data.parquet
+
+        Each file holds `rows_per_file` rows (or about `file_size` bytes) of
+        the other source, repeating it as often as needed to fill the files.
+        """
+        spec = self.repartition
+        base = registry.get(spec["source"])
+        return derived_cache.get_or_create(
+            base.derived_key("partitioned", "snappy", **spec),
+            self.name,
+            lambda path: self._write_partitioned(base, path),
+        )
+
+    def partitioning(self):
+        if self.repartition["flavor"] == "hive":
+            return pyarrow.dataset.HivePartitioning.discover(infer_dictionary=True)
+        return pyarrow.dataset.DirectoryPartitioning.discover(
+            field_names=["year", "month", "part"], infer_dictionary=True
+        )
+
+    def _write_partitioned(self, base, path):
+        spec = self.repartition
+        table = base.table
+        rows = spec["rows_per_file"]
+        if rows is None:
+            parquet_path = base.create_if_not_exists("parquet", "snappy")
+            bytes_per_row = os.path.getsize(parquet_path) / table.num_rows
+            rows = max(1, int(spec["file_size"] / bytes_per_row))
+
+        paths = partition_paths(
+            range(2009, 2009 + spec["years"]),
+            spec["months"],
+            spec["parts"],
+            spec["flavor"],
+        )
+        for i, relative in enumerate(paths):
+            indices = numpy.arange(i * rows, (i + 1) * rows) % table.num_rows
+            file_path = pathlib.Path(path) / relative
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            parquet.write_table(table.take(indices), file_path, compression="snappy")
+
+    def _write_generated(self, file_type, path, compression, **kwargs):
+        # Stream the generated batches instead of building the whole table,
+        # so that files much larger than memory can be generated.
+        reader = _generate.reader(self.schema, self.generator)
+        if file_type == "parquet":
+            compression = munge_compression(compression, "parquet")
+            with parquet.ParquetWriter(
+                path, self.schema, compression=compression, **kwargs
+            ) as writer:
+                # Buffer batches into row groups of write_table()'s default size.
+                chunk, rows = [], 0
+                for batch in reader:
+                    chunk.append(batch)
+                    rows += batch.num_rows
+                    if rows >= 1024**2:
+                        writer.write_table(pyarrow.Table.from_batches(chunk))
+                        chunk, rows = [], 0
+                if chunk:
+                    writer.write_table(pyarrow.Table.from_batches(chunk))
+        elif file_type == "feather":
+            compression = munge_compression(compression, "feather")
+            options = pyarrow.ipc.IpcWriteOptions(
+                compression=None if compression == "uncompressed" else compression
+            )
+            with pyarrow.ipc.new_file(str(path), self.schema, options=options) as w:
+                for batch in reader:
+                    w.write_batch(batch)
+        elif file_type == "csv":
+            compression = munge_compression(compression, "csv")
+            out_stream = pyarrow.output_stream(path, compression=compression)
+            with pyarrow.csv.CSVWriter(out_stream, self.schema, **kwargs) as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
 
     @functools.cached_property
     def dataframe(self):
         # this takes ~ 7 seconds for fanniemae_2016Q4
-        return self.table.to_pandas()
+        table = self.table
+        start = time.monotonic()
+        dataframe = table.to_pandas()
+        self.setup_seconds["dataframe"] = time.monotonic() - start
+        return dataframe
 
     @functools.cached_property
     def table(self):
-        path = self.temp_path("parquet", "snappy")
-        if path.exists():
-            self._table = parquet.read_table(path, schema=self.schema)
+        """The source as an arrow table, for benchmark setup.
+
+        The first call converts the canonical source file and caches the
+        result as snappy parquet, which later calls (and processes) decode.
+
+        With BENCHMARKS_CANONICAL_FORMAT=ipc the table is instead cached as
+        an uncompressed Arrow IPC file and memory mapped, which makes this
+        nearly free and lets concurrent benchmark processes share one copy
+        in the OS page cache. Note that the table is then paged in lazily,
+        so dropping caches between iterations means reading it from disk
+        inside the timed function.
+        """
+        start = time.monotonic()
+        if self.generator:
+            self._table = _generate.reader(self.schema, self.generator).read_all()
+            self.setup_seconds["table"] = time.monotonic() - start
+            return self._table
+
+        if canonical_format == "ipc":
+            self._table = self._ipc_table()
         else:
-            self._table = pyarrow.csv.read_csv(
+            self._table = self._parquet_table()
+        self.setup_seconds["table"] = time.monotonic() - start
+
+        expected = self.manifest.get(self.relative_path(self.store["path"]), {})
+        if "rows" in expected and self._table.num_rows != expected["rows"]:
+            raise _manifest.IntegrityError(
+                f"{self.name} has {self._table.num_rows} rows, "
+                f"expected {expected['rows']}"
+            )
+
+        return self._table
+
+    def _parquet_table(self):
+        key = self.derived_key("parquet", "snappy", coerce_timestamps="us")
+        filename = f"{self.name}.snappy.parquet"
+        # Other benchmark processes wait here while one of them converts the
+        # CSV, and then read the parquet file it wrote.
+        with derived_cache.lock(key):
+            path = derived_cache.lookup(key, filename)
+            if path is not None:
+                return parquet.read_table(path, schema=self.schema)
+
+            table = pyarrow.csv.read_csv(
                 self.store["path"],
                 read_options=self.csv_read_options,
                 parse_options=self.csv_parse_options,
                 convert_options=self.csv_convert_options,
             )
-
-            self._parquet_write(
-                self._table, path, compression="snappy", coerce_timestamps="us"
+            derived_cache.put(
+                key,
+                filename,
+                lambda path: self._parquet_write(
+                    table, path, compression="snappy", coerce_timestamps="us"
+                ),
             )
+            return table
 
-        return self._table
+    def _ipc_table(self):
+        path = derived_cache.get_or_create(
+            self.derived_key("arrow", "uncompressed"),
+            f"{self.name}.uncompressed.arrow",
+            lambda path: self._ipc_write(self._parquet_table(), path),
+        )
+        return pyarrow.ipc.open_file(pyarrow.memory_map(str(path))).read_all()
+
+    @property
+    def cached(self):
+        """Names of the in-memory representations currently cached."""
+        return [attr for attr in ("table", "dataframe") if attr in self.__dict__]
+
+    def cached_nbytes(self):
+        nbytes = 0
+        if "table" in self.__dict__:
+            nbytes += self.table.nbytes
+        if "dataframe" in self.__dict__:
+            if self._dataframe_nbytes is None:
+                usage = self.dataframe.memory_usage(index=True, deep=True)
+                self._dataframe_nbytes = int(usage.sum())
+            nbytes += self._dataframe_nbytes
+        return nbytes
+
+    def drop_cached(self):
+        """Forget the cached `table` and `dataframe`, they are rebuilt on use."""
+        self.__dict__.pop("table", None)
+        self.__dict__.pop("dataframe", None)
+        self._table = None
+        self._dataframe_nbytes = None
 
     def _get_object_url(self, idx=0):
         if self.paths:
             s3_url = pathlib.Path(self.paths[idx])
-            log.info("s3_url: %s", s3_url)
+            log.debug("s3_url: %s", s3_url)
             return (
                 "https://"
                 + s3_url.parts[0]
@@ -454,32 +856,133 @@ class Source:
         return self.store.get("source")
 
     def download_source_if_not_exists(self):
+        jobs = []
         for idx, p in enumerate(self.source_paths):
             path = pathlib.Path(p)
             if not path.exists():
                 log.info("path does not exist: %s", path)
-                path.parent.mkdir(parents=True, exist_ok=True)
-
                 url = self.store.get("source")
                 if not url:
                     url = self._get_object_url(idx)
+                jobs.append((url, path))
 
-                log.info("HTTP GET %s", url)
-                r = requests.get(url)
-                log.info("write response to disk")
-                open(path, "wb").write(r.content)
+        _download.download_many(jobs)
+        if self.verify_integrity:
+            self.verify()
 
-    def _csv_write(self, table, path, compression):
+    def _csv_write(self, table, path, compression, **kwargs):
         # Note: this will write a comma separated csv with a header, even if
         # the original source file lacked a header and was pipe delimited.
         compression = munge_compression(compression, "csv")
         out_stream = pyarrow.output_stream(path, compression=compression)
-        pyarrow.csv.write_csv(table, out_stream)
+        pyarrow.csv.write_csv(table, out_stream, **kwargs)
 
-    def _feather_write(self, table, path, compression):
+    def _feather_write(self, table, path, compression, **kwargs):
         compression = munge_compression(compression, "feather")
-        feather.write_feather(table, path, compression=compression)
+        feather.write_feather(table, path, compression=compression, **kwargs)
+
+    def _ipc_write(self, table, path):
+        with pyarrow.ipc.new_file(str(path), table.schema) as writer:
+            writer.write_table(table)
 
     def _parquet_write(self, table, path, compression, **kwargs):
         compression = munge_compression(compression, "parquet")
         parquet.write_table(table, path, compression=compression, **kwargs)
+
+
+def tpch_dataset(scale_factor, file_type="parquet"):
+    """A generated TPC-H dataset (see _tpch.py), with a directory per table.
+
+    For example:
+        data/temp/cache/<key>/tpch_1.parquet/lineitem/part-0.parquet
+    """
+    return derived_cache.get_or_create(
+        _cache.key(
+            tpch=_tpch.VERSION,
+            scale_factor=scale_factor,
+            file_type=file_type,
+            pyarrow=pyarrow.__version__,
+        ),
+        f"tpch_{scale_factor:g}.{file_type}",
+        lambda path: _tpch.write(path, scale_factor, file_type),
+    )
+
+
+def _physical_memory():
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError):
+        return None
+
+
+class SourceRegistry:
+    """Hands out one Source per name, for the lifetime of the process.
+
+    Benchmarks that share a source then also share its cached `table` and
+    `dataframe`, instead of each loading their own. Once the cached tables
+    and data frames of all sources exceed `memory_budget` bytes, those of the
+    least recently requested sources are dropped.
+    """
+
+    def __init__(self, memory_budget=None):
+        self.memory_budget = memory_budget
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._sources = collections.OrderedDict()
+
+    def get(self, name):
+        source = self._sources.get(name)
+        if source is None:
+            self.misses += 1
+            log.info("source registry miss: %s", name)
+            source = Source(name)
+            self._sources[name] = source
+        else:
+            self.hits += 1
+            # Setup time of whatever is still cached, i.e. what it would have
+            # cost to load it again.
+            saved = sum(source.setup_seconds.get(attr, 0) for attr in source.cached)
+            self.saved_seconds += saved
+            log.info(
+                "source registry hit: %s (cached: %s, %.1fs of setup)",
+                name,
+                ", ".join(source.cached) or "nothing",
+                saved,
+            )
+            self._sources.move_to_end(name)
+
+        self.evict(keep=name)
+        return source
+
+    def evict(self, keep=None):
+        if self.memory_budget is None:
+            return
+        sizes = {name: s.cached_nbytes() for name, s in self._sources.items()}
+        total = sum(sizes.values())
+        for name, source in self._sources.items():
+            if total <= self.memory_budget:
+                break
+            if name == keep or not sizes[name]:
+                continue
+            log.info("source registry evict: %s (%s)", name, bytes_fmt(sizes[name]))
+            source.drop_cached()
+            total -= sizes[name]
+
+    def log_summary(self):
+        if self.hits or self.misses:
+            log.info(
+                "source registry: %d hits, %d misses, %.1fs of setup reused",
+                self.hits,
+                self.misses,
+                self.saved_seconds,
+            )
+
+
+_memory_budget = os.getenv("BENCHMARKS_SOURCE_MEMORY_BUDGET")
+registry = SourceRegistry(
+    memory_budget=_cache.parse_bytes(_memory_budget)
+    if _memory_budget
+    else (_physical_memory() or 0) // 2 or None
+)
+atexit.register(registry.log_summary)
@@ -0,0 +1,122 @@
+"""Run external benchmark suites and read their output as they write it.
+
+`stream_command()` yields each line a child process writes, from stdout or
+stderr, as soon as it is written, so that results can be parsed and
+published while the suite is still running. Only the last
+BENCHMARKS_COMMAND_LOG_TAIL lines (default 200) of each stream are kept,
+for the error raised if the command fails, rather than the whole log.
+
+`JSONArrayParser` parses a JSON array written bit by bit (e.g. `yarn perf
+--json` results) into its items, as each one is complete.
+"""
+import collections
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+
+log_tail = int(os.getenv("BENCHMARKS_COMMAND_LOG_TAIL") or 200)
+
+
+def _read(name, pipe, lines):
+    for line in pipe:
+        lines.put((name, line))
+    lines.put((name, None))
+
+
+def stream_command(command, tail=log_tail):
+    """Run a command, yielding ("stdout" or "stderr", line) pairs as it
+    writes them, and echoing them to ours.
+
+    Raises CalledProcessError, with the last `tail` lines of each stream,
+    if the command fails.
+    """
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=1,
+    )
+    # One thread per pipe, so that neither can fill up and block the child
+    lines = queue.Queue()
+    for name in ("stdout", "stderr"):
+        pipe = getattr(process, name)
+        threading.Thread(target=_read, args=(name, pipe, lines), daemon=True).start()
+
+    tails = {name: collections.deque(maxlen=tail) for name in ("stdout", "stderr")}
+    echo = {"stdout": sys.stdout, "stderr": sys.stderr}
+    try:
+        open_pipes = 2
+        while open_pipes:
+            name, line = lines.get()
+            if line is None:
+                open_pipes -= 1
+                continue
+            tails[name].append(line)
+            echo[name].write(line)
+            yield name, line
+    finally:
+        if process.poll() is None and open_pipes:
+            process.kill()  # The caller stopped reading
+        returncode = process.wait()
+
+    if returncode:
+        raise subprocess.CalledProcessError(
+            returncode,
+            command,
+            output="".join(tails["stdout"]),
+            stderr="".join(tails["stderr"]),
+        )
+
+
+class JSONArrayParser:
+    """Parses a JSON array fed in pieces, returning its items as they are
+    complete. Anything before the opening bracket is skipped."""
+
+    def __init__(self):
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.started = self.done = False
+
+    def feed(self, text):
+        self.buffer += text
+        items = []
+        while not self.done:
+            position = 0
+            if not self.started:
+                start = self.buffer.find("[")
+                if start == -1:
+                    self.buffer = ""
+                    break
+                self.started, position = True, start + 1
+            position = self._skip(self.buffer, position)
+            if position == len(self.buffer):
+                self.buffer = ""
+                break
+            if self.buffer[position] == "]":
+                self.done = True
+                self.buffer = self.buffer[position:][1:]
+                break
+            try:
+                item, end = self.decoder.raw_decode(self.buffer, position)
+            except json.JSONDecodeError:
+                self.buffer = self.buffer[position:]
+                break  # Incomplete, wait for more
+            if end == len(self.buffer) and not isinstance(item, (dict, list, str)):
+                # A number or literal might go on in the next piece
+                self.buffer = self.buffer[position:]
+                break
+            items.append(item)
+            self.buffer = self.buffer[end:]
+        return items
+
+    @staticmethod
+    def _skip(text, position=0):
+        """The position of the next character that isn't whitespace or a
+        comma between items."""
+        while position < len(text) and text[position] in " \t\r\n,":
+            position += 1
+        return position
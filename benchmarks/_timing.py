@@ -0,0 +1,202 @@
+"""How `Benchmark.benchmark` times a benchmark function.
+
+By default each case runs exactly `--iterations` times, as it always has.
+Set:
+
+    BENCHMARKS_TIMING=adaptive
+
+to run each case until its timings are stable instead: `--iterations` becomes
+the minimum number of iterations, and iterations continue until the
+confidence interval on the median time is within BENCHMARKS_TIMING_TARGET
+(a fraction of the median, default 0.02), once at least
+BENCHMARKS_TIMING_MIN_TIME seconds (default 1) have been spent, or until
+BENCHMARKS_TIMING_MAX_TIME seconds (default 300) or
+BENCHMARKS_TIMING_MAX_ITERATIONS (default 100) are reached.
+BENCHMARKS_TIMING_CONFIDENCE sets the confidence level (default 0.95).
+
+In adaptive mode, leading iterations that are much slower than the rest
+(cold caches, lazy initialization, JIT-like warm up in the allocator) are
+detected as warmup and left out of the reported times.
+
+Either way, each result's optional_benchmark_info records how many
+iterations ran, how many were warmup, and the confidence interval that was
+reached. Probes (see `_memory.py`) add per-iteration measurements, taken
+outside the timed region, covering warmup iterations too.
+"""
+import gc
+import math
+import os
+import statistics
+import time
+
+mode = os.getenv("BENCHMARKS_TIMING", "fixed").lower()
+target = float(os.getenv("BENCHMARKS_TIMING_TARGET") or 0.02)
+confidence = float(os.getenv("BENCHMARKS_TIMING_CONFIDENCE") or 0.95)
+min_time = float(os.getenv("BENCHMARKS_TIMING_MIN_TIME") or 1)
+max_time = float(os.getenv("BENCHMARKS_TIMING_MAX_TIME") or 300)
+max_iterations = int(os.getenv("BENCHMARKS_TIMING_MAX_ITERATIONS") or 100)
+
+# An iteration is warmup if it is slower than the median of the iterations
+# after it by this many (scaled) median absolute deviations...
+WARMUP_DEVIATIONS = 3
+# ...and by at least this fraction of that median, so that near-constant
+# timings don't turn noise into warmup.
+WARMUP_MIN_EXCESS = 0.05
+
+
+def median_ci(times, confidence=confidence):
+    """A distribution-free confidence interval on the median of the times.
+
+    Uses the order statistics whose ranks bound the median with the given
+    confidence under the binomial distribution, so it makes no assumption
+    about the shape of the timings. Returns None when there are too few
+    times for any interval to reach that confidence (fewer than 6 at 95%).
+    """
+    n = len(times)
+    alpha = 1 - confidence
+    # The largest k with P(B < k) <= alpha / 2, for B ~ Binomial(n, 1/2).
+    k, cumulative = 0, 0.0
+    while k < n:
+        p = math.comb(n, k) / 2**n
+        if cumulative + p > alpha / 2:
+            break
+        cumulative += p
+        k += 1
+    if k == 0:
+        return None
+    ordered = sorted(times)
+    return ordered[k - 1], ordered[n - k]
+
+
+def warmup_count(times):
+    """The number of leading times that look like warmup.
+
+    At most half of the times are ever treated as warmup.
+    """
+    count = 0
+    while count < len(times) // 2:
+        rest = times[count:][1:]
+        median = statistics.median(rest)
+        mad = 1.4826 * statistics.median(abs(t - median) for t in rest)
+        excess = times[count] - median
+        if excess <= WARMUP_DEVIATIONS * mad or excess <= WARMUP_MIN_EXCESS * median:
+            break
+        count += 1
+    return count
+
+
+def relative_half_width(times):
+    """Half the width of the median's confidence interval, as a fraction of
+    the median, or None if there is no interval yet."""
+    interval = median_ci(times)
+    median = statistics.median(times)
+    if interval is None or not median:
+        return None
+    return (interval[1] - interval[0]) / 2 / median
+
+
+class Timer:
+    """Runs a benchmark function the way conbench does (optionally dropping
+    caches, collecting garbage and disabling the garbage collector before
+    each iteration), either a fixed number of times or adaptively.
+    """
+
+    def __init__(
+        self, iterations=1, adaptive=None, drop_caches=None, probes=(), **options
+    ):
+        if iterations < 1:
+            raise ValueError(f"Invalid iterations: {iterations}")
+        self.iterations = iterations
+        self.adaptive = mode == "adaptive" if adaptive is None else adaptive
+        self.drop_caches = drop_caches
+        # Objects with start() and stop() methods, called around each
+        # iteration but outside the timed region, and an info() method.
+        self.probes = list(probes)
+        self.gc_collect = options.get("gc_collect", True)
+        self.gc_disable = options.get("gc_disable", True)
+        self.target = options.get("target", target)
+        self.min_time = options.get("min_time", min_time)
+        self.max_time = options.get("max_time", max_time)
+        self.max_iterations = max(
+            iterations, options.get("max_iterations", max_iterations)
+        )
+        self.times = []
+        self.warmup = 0
+
+    @classmethod
+    def from_options(cls, options, drop_caches=None, probes=()):
+        """A timer for a benchmark's CLI options. `drop_caches` is the
+        function that drops caches, called when --drop-caches is set."""
+        return cls(
+            iterations=options.get("iterations", 1),
+            drop_caches=drop_caches if options.get("drop_caches", False) else None,
+            gc_collect=options.get("gc_collect", True),
+            gc_disable=options.get("gc_disable", True),
+            probes=probes,
+        )
+
+    @property
+    def data(self):
+        """The times that count, i.e. without warmup."""
+        warmup = self.warmup
+        return self.times[warmup:]
+
+    def run(self, f):
+        """Time `f`, returning the times that count and f's last output."""
+        self.times, self.warmup, output = [], 0, None
+        started = time.monotonic()
+        while True:
+            output = None  # Don't hold two outputs in memory at once.
+            output = self._iteration(f)
+            if self._done(time.monotonic() - started):
+                break
+        return self.data, output
+
+    def _iteration(self, f):
+        if self.drop_caches:
+            self.drop_caches()
+        if self.gc_collect:
+            gc.collect()
+        if self.gc_disable:
+            gc.disable()
+        for probe in self.probes:
+            probe.start()
+        try:
+            start = time.monotonic()
+            output = f()
+            self.times.append(time.monotonic() - start)
+        finally:
+            gc.enable()
+        for probe in self.probes:
+            probe.stop()
+        return output
+
+    def _done(self, elapsed):
+        if not self.adaptive:
+            return len(self.times) >= self.iterations
+        self.warmup = warmup_count(self.times)
+        if len(self.times) >= self.max_iterations or elapsed >= self.max_time:
+            return True
+        if len(self.data) < self.iterations or elapsed < self.min_time:
+            return False
+        half_width = relative_half_width(self.data)
+        return half_width is not None and half_width <= self.target
+
+    def info(self):
+        """What to add to the result's optional_benchmark_info."""
+        data = self.data
+        interval = median_ci(data)
+        half_width = relative_half_width(data)
+        info = {
+            "timing": "adaptive" if self.adaptive else "fixed",
+            "iterations_run": len(self.times),
+            "warmup_iterations": self.warmup,
+            "warmup_times": self.times[: len(self.times) - len(data)],
+            "confidence": confidence,
+            "median_ci": list(interval) if interval else None,
+            "median_ci_relative": half_width,
+            "converged": half_width is not None and half_width <= self.target,
+        }
+        for probe in self.probes:
+            info.update(probe.info())
+        return info
@@ -0,0 +1,503 @@
+"""A vectorized TPC-H data generator.
+
+Generates the eight TPC-H tables with the cardinalities, keys, value
+ranges and word lists of the TPC-H specification (section 4.2), using
+NumPy instead of the reference dbgen. Free text (comments, addresses) is
+drawn from a random word pool rather than dbgen's grammar, so the data
+isn't byte for byte identical to dbgen's, but the 22 queries select rows
+with the same selectivities.
+
+Tables are generated in chunks, each from its own random generator seeded
+with (seed, table, chunk), and written as one file per chunk:
+
+    <root>/lineitem/part-0.parquet
+    <root>/lineitem/part-1.parquet
+    ...
+    <root>/region/part-0.parquet
+
+so any scale factor can be written without holding a table in memory.
+"""
+import datetime
+import os
+
+import numpy
+import pyarrow
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.parquet as parquet
+
+# Bump when the generated data changes, to regenerate cached datasets.
+VERSION = 1
+
+SEED = 19920101
+
+# Rows per chunk (file). Orders are chunked by order and written together
+# with their line items, which are about four times as many rows.
+CHUNK_ROWS = 1_000_000
+ORDERS_PER_CHUNK = 250_000
+
+TABLES = [
+    "region",
+    "nation",
+    "supplier",
+    "part",
+    "partsupp",
+    "customer",
+    "orders",
+    "lineitem",
+]
+
+STARTDATE = datetime.date(1992, 1, 1)
+CURRENTDATE = datetime.date(1995, 6, 17)
+ENDDATE = datetime.date(1998, 12, 31)
+
+REGIONS = ["AFRICA", "AMERICA", "ASIA", "EUROPE", "MIDDLE EAST"]
+
+NATIONS = [
+    ("ALGERIA", 0),
+    ("ARGENTINA", 1),
+    ("BRAZIL", 1),
+    ("CANADA", 1),
+    ("EGYPT", 4),
+    ("ETHIOPIA", 0),
+    ("FRANCE", 3),
+    ("GERMANY", 3),
+    ("INDIA", 2),
+    ("INDONESIA", 2),
+    ("IRAN", 4),
+    ("IRAQ", 4),
+    ("JAPAN", 2),
+    ("JORDAN", 4),
+    ("KENYA", 0),
+    ("MOROCCO", 0),
+    ("MOZAMBIQUE", 0),
+    ("PERU", 1),
+    ("CHINA", 2),
+    ("ROMANIA", 3),
+    ("SAUDI ARABIA", 4),
+    ("VIETNAM", 2),
+    ("RUSSIA", 3),
+    ("UNITED KINGDOM", 3),
+    ("UNITED STATES", 1),
+]
+
+COLORS = (
+    "almond antique aquamarine azure beige bisque black blanched blue blush "
+    "brown burlywood burnished chartreuse chiffon chocolate coral cornflower "
+    "cornsilk cream cyan dark deep dim dodger drab firebrick floral forest "
+    "frosted gainsboro ghost goldenrod green grey honeydew hot indian ivory "
+    "khaki lace lavender lawn lemon light lime linen magenta maroon medium "
+    "metallic midnight mint misty moccasin navajo navy olive orange orchid "
+    "pale papaya peach peru pink plum powder puff purple red rose rosy royal "
+    "saddle salmon sandy seashell sienna sky slate smoke snow spring steel tan "
+    "thistle tomato turquoise violet wheat white yellow"
+).split()
+
+TYPES = (
+    ["STANDARD", "SMALL", "MEDIUM", "LARGE", "ECONOMY", "PROMO"],
+    ["ANODIZED", "BURNISHED", "PLATED", "POLISHED", "BRUSHED"],
+    ["TIN", "NICKEL", "BRASS", "STEEL", "COPPER"],
+)
+CONTAINERS = (
+    ["SM", "LG", "MED", "JUMBO", "WRAP"],
+    ["CASE", "BOX", "BAG", "JAR", "PKG", "PACK", "CAN", "DRUM"],
+)
+SEGMENTS = ["AUTOMOBILE", "BUILDING", "FURNITURE", "MACHINERY", "HOUSEHOLD"]
+PRIORITIES = ["1-URGENT", "2-HIGH", "3-MEDIUM", "4-NOT SPECIFIED", "5-LOW"]
+INSTRUCTIONS = ["DELIVER IN PERSON", "COLLECT COD", "NONE", "TAKE BACK RETURN"]
+MODES = ["REG AIR", "AIR", "RAIL", "SHIP", "TRUCK", "MAIL", "FOB"]
+
+WORDS = (
+    "packages requests accounts deposits foxes ideas theodolites pinto beans "
+    "instructions dependencies excuses platelets asymptotes courts dolphins "
+    "multipliers sauternes warthogs frets dinos attainments somas Tiresias "
+    "patterns forges braids hockey players frays warhorses dugouts notornis "
+    "epitaphs pearls tithes waters orbits gifts sheaves depths sentiments "
+    "decoys realms pains grouches escapades sleep wake are cajole haggle nag "
+    "use boost affix detect integrate maintain nod was lose sublate solve "
+    "thrash promise engage hinder print x-ray breach eat grow impress mold "
+    "poach serve run dazzle snooze doze unwind kindle play hang believe doubt "
+    "furious sly careful blithe quick fluffy slow quiet ruthless thin close "
+    "dogged daring brave stealthy permanent enticing idle busy regular final "
+    "ironic even bold silent special pending unusual express sometimes always "
+    "never furiously slyly carefully blithely quickly fluffily slowly quietly "
+    "ruthlessly thinly closely doggedly daringly bravely stealthily "
+    "permanently enticingly idly busily regularly finally ironically evenly "
+    "boldly silently about above according to across after against along "
+    "among around at atop before behind beneath beside besides between beyond "
+    "by despite during except for from in inside instead into near of on "
+    "outside over past since through throughout toward under until up upon "
+    "without with within do may might shall will would can could should must"
+).split()
+
+ALPHANUMERIC = numpy.frombuffer(
+    b"0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ,",
+    dtype=numpy.uint8,
+)
+
+
+def _days(date):
+    return (date - datetime.date(1970, 1, 1)).days
+
+
+def _rng(table, chunk):
+    return numpy.random.default_rng([SEED, TABLES.index(table), chunk])
+
+
+def _strings(data, offsets):
+    return pyarrow.StringArray.from_buffers(
+        len(offsets) - 1,
+        pyarrow.py_buffer(offsets.astype(numpy.int32)),
+        pyarrow.py_buffer(data),
+    )
+
+
+def _text_pool():
+    rng = numpy.random.default_rng(SEED)
+    words = rng.choice(WORDS, size=2**19)
+    return numpy.frombuffer(" ".join(words).encode(), dtype=numpy.uint8)
+
+
+TEXT_POOL = None
+
+
+def _text(rng, n, lo, hi):
+    """Random substrings of the word pool, of `lo` to `hi` characters."""
+    global TEXT_POOL
+    if TEXT_POOL is None:
+        TEXT_POOL = _text_pool()
+    lengths = rng.integers(lo, hi, size=n, endpoint=True)
+    starts = rng.integers(0, len(TEXT_POOL) - hi, size=n)
+    offsets = numpy.zeros(n + 1, dtype=numpy.int64)
+    numpy.cumsum(lengths, out=offsets[1:])
+    index = numpy.arange(offsets[-1]) + numpy.repeat(starts - offsets[:-1], lengths)
+    return _strings(TEXT_POOL[index].tobytes(), offsets)
+
+
+def _vstring(rng, n, lo, hi):
+    """Random alphanumeric strings, of `lo` to `hi` characters."""
+    lengths = rng.integers(lo, hi, size=n, endpoint=True)
+    offsets = numpy.zeros(n + 1, dtype=numpy.int64)
+    numpy.cumsum(lengths, out=offsets[1:])
+    chars = rng.integers(0, len(ALPHANUMERIC), size=offsets[-1])
+    return _strings(ALPHANUMERIC[chars].tobytes(), offsets)
+
+
+def _choice(rng, values, n):
+    return pyarrow.array(values).take(rng.integers(0, len(values), size=n))
+
+
+def _join(*arrays, separator=""):
+    return pc.binary_join_element_wise(*arrays, separator)
+
+
+def _padded(numbers, width):
+    return pc.utf8_lpad(pc.cast(pyarrow.array(numbers), pyarrow.string()), width, "0")
+
+
+def _keyed(prefix, keys):
+    return _join(prefix, _padded(keys, 9))
+
+
+def _money(rng, lo, hi, n):
+    """Uniform amounts from `lo` to `hi`, in cents."""
+    return rng.integers(round(lo * 100), round(hi * 100), size=n, endpoint=True) / 100
+
+
+def _phone(rng, nationkeys):
+    n = len(nationkeys)
+    return _join(
+        pc.cast(pyarrow.array(nationkeys + 10), pyarrow.string()),
+        _padded(rng.integers(100, 999, size=n, endpoint=True), 3),
+        _padded(rng.integers(100, 999, size=n, endpoint=True), 3),
+        _padded(rng.integers(1000, 9999, size=n, endpoint=True), 4),
+        separator="-",
+    )
+
+
+def _dates(days):
+    return pyarrow.array(days.astype(numpy.int32), pyarrow.int32()).cast(
+        pyarrow.date32()
+    )
+
+
+def counts(scale_factor):
+    return {
+        "supplier": int(10_000 * scale_factor),
+        "part": int(200_000 * scale_factor),
+        "customer": int(150_000 * scale_factor),
+        "orders": int(1_500_000 * scale_factor),
+    }
+
+
+def retail_price(partkey):
+    return (90000 + ((partkey // 10) % 20001) + 100 * (partkey % 1000)) / 100
+
+
+def supplier_of(partkey, i, suppliers):
+    """The i-th (0-3) supplier of a part, as in partsupp."""
+    return (
+        partkey + i * ((suppliers // 4) + (partkey - 1) // suppliers)
+    ) % suppliers + 1
+
+
+def region(scale_factor):
+    rng = _rng("region", 0)
+    yield pyarrow.table(
+        {
+            "r_regionkey": pyarrow.array(range(5), pyarrow.int32()),
+            "r_name": REGIONS,
+            "r_comment": _text(rng, 5, 31, 115),
+        }
+    )
+
+
+def nation(scale_factor):
+    rng = _rng("nation", 0)
+    yield pyarrow.table(
+        {
+            "n_nationkey": pyarrow.array(range(25), pyarrow.int32()),
+            "n_name": [name for name, _ in NATIONS],
+            "n_regionkey": pyarrow.array([r for _, r in NATIONS], pyarrow.int32()),
+            "n_comment": _text(rng, 25, 31, 114),
+        }
+    )
+
+
+def _chunks(table, rows):
+    for chunk, start in enumerate(range(0, rows, CHUNK_ROWS)):
+        keys = numpy.arange(start + 1, min(start + CHUNK_ROWS, rows) + 1)
+        yield _rng(table, chunk), keys
+
+
+def supplier(scale_factor):
+    rows = counts(scale_factor)["supplier"]
+    for rng, keys in _chunks("supplier", rows):
+        n = len(keys)
+        nationkeys = rng.integers(0, 24, size=n, endpoint=True)
+        comments = _text(rng, n, 25, 100).to_numpy(zero_copy_only=False)
+        # 5 in 10,000 suppliers have complaints, and 5 recommendations (Q16).
+        for which in ["Complaints", "Recommends"]:
+            picked = rng.random(n) < 0.0005
+            comments[picked] = [
+                f"{c[:20]} Customer {c[20:40]} {which}" for c in comments[picked]
+            ]
+        yield pyarrow.table(
+            {
+                "s_suppkey": pyarrow.array(keys, pyarrow.int32()),
+                "s_name": _keyed("Supplier#", keys),
+                "s_address": _vstring(rng, n, 10, 40),
+                "s_nationkey": pyarrow.array(nationkeys, pyarrow.int32()),
+                "s_phone": _phone(rng, nationkeys),
+                "s_acctbal": _money(rng, -999.99, 9999.99, n),
+                "s_comment": pyarrow.array(comments, pyarrow.string()),
+            }
+        )
+
+
+def part(scale_factor):
+    rows = counts(scale_factor)["part"]
+    colors = pyarrow.array(COLORS)
+    for rng, keys in _chunks("part", rows):
+        n = len(keys)
+        names = [colors.take(rng.integers(0, len(COLORS), size=n)) for _ in range(5)]
+        m = rng.integers(1, 5, size=n, endpoint=True)
+        types = [_choice(rng, syllables, n) for syllables in TYPES]
+        containers = [_choice(rng, syllables, n) for syllables in CONTAINERS]
+        yield pyarrow.table(
+            {
+                "p_partkey": pyarrow.array(keys, pyarrow.int32()),
+                "p_name": _join(*names, separator=" "),
+                "p_mfgr": _join("Manufacturer#", pc.cast(pyarrow.array(m), "string")),
+                "p_brand": _join(
+                    "Brand#",
+                    pc.cast(pyarrow.array(m), "string"),
+                    pc.cast(
+                        pyarrow.array(rng.integers(1, 5, size=n, endpoint=True)),
+                        "string",
+                    ),
+                ),
+                "p_type": _join(*types, separator=" "),
+                "p_size": pyarrow.array(
+                    rng.integers(1, 50, size=n, endpoint=True), pyarrow.int32()
+                ),
+                "p_container": _join(*containers, separator=" "),
+                "p_retailprice": retail_price(keys),
+                "p_comment": _text(rng, n, 5, 22),
+            }
+        )
+
+
+def partsupp(scale_factor):
+    rows = counts(scale_factor)["part"]
+    suppliers = counts(scale_factor)["supplier"]
+    for rng, partkeys in _chunks("partsupp", rows):
+        partkeys = numpy.repeat(partkeys, 4)
+        i = numpy.tile(numpy.arange(4), len(partkeys) // 4)
+        n = len(partkeys)
+        yield pyarrow.table(
+            {
+                "ps_partkey": pyarrow.array(partkeys, pyarrow.int32()),
+                "ps_suppkey": pyarrow.array(
+                    supplier_of(partkeys, i, suppliers), pyarrow.int32()
+                ),
+                "ps_availqty": pyarrow.array(
+                    rng.integers(1, 9999, size=n, endpoint=True), pyarrow.int32()
+                ),
+                "ps_supplycost": _money(rng, 1.00, 1000.00, n),
+                "ps_comment": _text(rng, n, 49, 198),
+            }
+        )
+
+
+def customer(scale_factor):
+    rows = counts(scale_factor)["customer"]
+    for rng, keys in _chunks("customer", rows):
+        n = len(keys)
+        nationkeys = rng.integers(0, 24, size=n, endpoint=True)
+        yield pyarrow.table(
+            {
+                "c_custkey": pyarrow.array(keys, pyarrow.int32()),
+                "c_name": _keyed("Customer#", keys),
+                "c_address": _vstring(rng, n, 10, 40),
+                "c_nationkey": pyarrow.array(nationkeys, pyarrow.int32()),
+                "c_phone": _phone(rng, nationkeys),
+                "c_acctbal": _money(rng, -999.99, 9999.99, n),
+                "c_mktsegment": _choice(rng, SEGMENTS, n),
+                "c_comment": _text(rng, n, 29, 116),
+            }
+        )
+
+
+def orders_and_lineitem(scale_factor):
+    """Yield (orders, lineitem) chunks, which depend on each other."""
+    count = counts(scale_factor)
+    rows = count["orders"]
+    for chunk, start in enumerate(range(0, rows, ORDERS_PER_CHUNK)):
+        rng = _rng("orders", chunk)
+        index = numpy.arange(start, min(start + ORDERS_PER_CHUNK, rows))
+        n = len(index)
+        # Only the first 8 of every 32 order keys are used.
+        orderkeys = (index // 8) * 32 + index % 8 + 1
+        # A third of the customers have no orders.
+        custkeys = rng.integers(1, count["customer"], size=n, endpoint=True)
+        custkeys = numpy.where(custkeys % 3 == 0, custkeys - 1, custkeys)
+        custkeys = numpy.maximum(custkeys, 1)
+        orderdates = rng.integers(
+            _days(STARTDATE), _days(ENDDATE) - 151, size=n, endpoint=True
+        )
+
+        lines = rng.integers(1, 7, size=n, endpoint=True)
+        m = int(lines.sum())
+        order_of_line = numpy.repeat(numpy.arange(n), lines)
+        first_line = numpy.repeat(numpy.cumsum(lines) - lines, lines)
+        linenumbers = numpy.arange(m) - first_line + 1
+
+        partkeys = rng.integers(1, count["part"], size=m, endpoint=True)
+        suppkeys = supplier_of(
+            partkeys, rng.integers(0, 3, size=m, endpoint=True), count["supplier"]
+        )
+        quantity = rng.integers(1, 50, size=m, endpoint=True)
+        extendedprice = numpy.round(quantity * retail_price(partkeys), 2)
+        discount = rng.integers(0, 10, size=m, endpoint=True) / 100
+        tax = rng.integers(0, 8, size=m, endpoint=True) / 100
+        line_orderdates = orderdates[order_of_line]
+        shipdates = line_orderdates + rng.integers(1, 121, size=m, endpoint=True)
+        commitdates = line_orderdates + rng.integers(30, 90, size=m, endpoint=True)
+        receiptdates = shipdates + rng.integers(1, 30, size=m, endpoint=True)
+        returned = rng.random(m) < 0.5
+        returnflag = numpy.where(
+            receiptdates <= _days(CURRENTDATE),
+            numpy.where(returned, "R", "A"),
+            "N",
+        )
+        shipped = shipdates <= _days(CURRENTDATE)
+        linestatus = numpy.where(shipped, "F", "O")
+
+        charge = extendedprice * (1 + tax) * (1 - discount)
+        totalprice = numpy.round(numpy.bincount(order_of_line, charge, minlength=n), 2)
+        shipped_lines = numpy.bincount(order_of_line, shipped, minlength=n)
+        orderstatus = numpy.where(
+            shipped_lines == lines, "F", numpy.where(shipped_lines == 0, "O", "P")
+        )
+
+        orders = pyarrow.table(
+            {
+                "o_orderkey": pyarrow.array(orderkeys, pyarrow.int64()),
+                "o_custkey": pyarrow.array(custkeys, pyarrow.int32()),
+                "o_orderstatus": pyarrow.array(orderstatus, pyarrow.string()),
+                "o_totalprice": totalprice,
+                "o_orderdate": _dates(orderdates),
+                "o_orderpriority": _choice(rng, PRIORITIES, n),
+                "o_clerk": _keyed(
+                    "Clerk#",
+                    rng.integers(
+                        1, max(int(1000 * scale_factor), 1), size=n, endpoint=True
+                    ),
+                ),
+                "o_shippriority": pyarrow.array(numpy.zeros(n, dtype=numpy.int32)),
+                "o_comment": _text(rng, n, 19, 78),
+            }
+        )
+        lineitem = pyarrow.table(
+            {
+                "l_orderkey": pyarrow.array(orderkeys[order_of_line], pyarrow.int64()),
+                "l_partkey": pyarrow.array(partkeys, pyarrow.int32()),
+                "l_suppkey": pyarrow.array(suppkeys, pyarrow.int32()),
+                "l_linenumber": pyarrow.array(linenumbers, pyarrow.int32()),
+                "l_quantity": quantity.astype(numpy.float64),
+                "l_extendedprice": extendedprice,
+                "l_discount": discount,
+                "l_tax": tax,
+                "l_returnflag": pyarrow.array(returnflag, pyarrow.string()),
+                "l_linestatus": pyarrow.array(linestatus, pyarrow.string()),
+                "l_shipdate": _dates(shipdates),
+                "l_commitdate": _dates(commitdates),
+                "l_receiptdate": _dates(receiptdates),
+                "l_shipinstruct": _choice(rng, INSTRUCTIONS, m),
+                "l_shipmode": _choice(rng, MODES, m),
+                "l_comment": _text(rng, m, 10, 43),
+            }
+        )
+        yield orders, lineitem
+
+
+def generate(scale_factor):
+    """Yield (table name, chunk) pairs for the whole dataset."""
+    for name, chunks in [
+        ("region", region),
+        ("nation", nation),
+        ("supplier", supplier),
+        ("part", part),
+        ("partsupp", partsupp),
+        ("customer", customer),
+    ]:
+        for chunk in chunks(scale_factor):
+            yield name, chunk
+    for orders, lineitem in orders_and_lineitem(scale_factor):
+        yield "orders", orders
+        yield "lineitem", lineitem
+
+
+def write(root, scale_factor, file_type="parquet"):
+    """Write the dataset to `root`, one directory per table."""
+    parts = {name: 0 for name in TABLES}
+    for name, table in generate(scale_factor):
+        directory = os.path.join(root, name)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{parts[name]}.{file_type}")
+        if file_type == "parquet":
+            parquet.write_table(table, path)
+        elif file_type == "feather":
+            feather.write_feather(table, path, compression="uncompressed")
+        else:
+            raise ValueError(f"Unsupported TPC-H file type: {file_type}")
+        parts[name] += 1
+
+
+def bytes_per_scale_factor():
+    """In-memory size of the dataset per unit of scale factor, measured by
+    generating a small one."""
+    scale_factor = 0.01
+    nbytes = sum(table.nbytes for _, table in generate(scale_factor))
+    return nbytes / scale_factor
@@ -0,0 +1,691 @@
+"""The 22 TPC-H queries, as pyarrow compute and Acero (join, group by) plans.
+
+Each query takes `get(table, columns)`, which returns the named columns of
+a TPC-H table as an arrow table, and the scale factor, and returns the
+query's result. Queries use the validation substitution parameters of the
+TPC-H specification.
+
+Note that `Table.join()` keeps only the left key columns.
+"""
+import datetime
+
+import pyarrow
+import pyarrow.compute as pc
+
+field = pc.field
+
+
+def _date(value):
+    return pyarrow.scalar(datetime.date.fromisoformat(value), pyarrow.date32())
+
+
+def _join(left, right, left_keys, right_keys=None, join_type="inner"):
+    return left.join(right, left_keys, right_keys, join_type=join_type)
+
+
+def _revenue(table):
+    return pc.multiply(table["l_extendedprice"], pc.subtract(1, table["l_discount"]))
+
+
+def _sort(table, *keys, limit=None):
+    table = table.sort_by(
+        [(k[1:], "descending") if k[0] == "-" else (k, "ascending") for k in keys]
+    )
+    return table.slice(0, limit) if limit else table
+
+
+def _nations_in(get, region):
+    regions = get("region", ["r_regionkey", "r_name"]).filter(field("r_name") == region)
+    return _join(
+        get("nation", ["n_nationkey", "n_name", "n_regionkey"]),
+        regions.select(["r_regionkey"]),
+        "n_regionkey",
+        "r_regionkey",
+    )
+
+
+def _nation(get, name):
+    return get("nation", ["n_nationkey", "n_name"]).filter(field("n_name") == name)
+
+
+def q01(get, scale_factor):
+    lineitem = get(
+        "lineitem",
+        [
+            "l_returnflag",
+            "l_linestatus",
+            "l_quantity",
+            "l_extendedprice",
+            "l_discount",
+            "l_tax",
+            "l_shipdate",
+        ],
+    ).filter(field("l_shipdate") <= _date("1998-09-02"))
+    disc_price = _revenue(lineitem)
+    charge = pc.multiply(disc_price, pc.add(1, lineitem["l_tax"]))
+    lineitem = lineitem.append_column("disc_price", disc_price)
+    lineitem = lineitem.append_column("charge", charge)
+    result = lineitem.group_by(["l_returnflag", "l_linestatus"]).aggregate(
+        [
+            ("l_quantity", "sum"),
+            ("l_extendedprice", "sum"),
+            ("disc_price", "sum"),
+            ("charge", "sum"),
+            ("l_quantity", "mean"),
+            ("l_extendedprice", "mean"),
+            ("l_discount", "mean"),
+            ("l_quantity", "count"),
+        ]
+    )
+    return _sort(result, "l_returnflag", "l_linestatus")
+
+
+def q02(get, scale_factor):
+    suppliers = _join(
+        get(
+            "supplier",
+            [
+                "s_suppkey",
+                "s_name",
+                "s_address",
+                "s_nationkey",
+                "s_phone",
+                "s_acctbal",
+                "s_comment",
+            ],
+        ),
+        _nations_in(get, "EUROPE"),
+        "s_nationkey",
+        "n_nationkey",
+    )
+    partsupp = _join(
+        get("partsupp", ["ps_partkey", "ps_suppkey", "ps_supplycost"]),
+        suppliers,
+        "ps_suppkey",
+        "s_suppkey",
+    )
+    min_cost = partsupp.group_by("ps_partkey").aggregate([("ps_supplycost", "min")])
+    parts = get("part", ["p_partkey", "p_mfgr", "p_size", "p_type"]).filter(
+        (field("p_size") == 15) & pc.ends_with(field("p_type"), "BRASS")
+    )
+    result = _join(
+        _join(parts, partsupp, "p_partkey", "ps_partkey"),
+        min_cost,
+        ["p_partkey", "ps_supplycost"],
+        ["ps_partkey", "ps_supplycost_min"],
+    ).select(
+        [
+            "s_acctbal",
+            "s_name",
+            "n_name",
+            "p_partkey",
+            "p_mfgr",
+            "s_address",
+            "s_phone",
+            "s_comment",
+        ]
+    )
+    return _sort(result, "-s_acctbal", "n_name", "s_name", "p_partkey", limit=100)
+
+
+def q03(get, scale_factor):
+    date = _date("1995-03-15")
+    customer = get("customer", ["c_custkey", "c_mktsegment"]).filter(
+        field("c_mktsegment") == "BUILDING"
+    )
+    orders = get(
+        "orders", ["o_orderkey", "o_custkey", "o_orderdate", "o_shippriority"]
+    ).filter(field("o_orderdate") < date)
+    lineitem = get(
+        "lineitem", ["l_orderkey", "l_extendedprice", "l_discount", "l_shipdate"]
+    ).filter(field("l_shipdate") > date)
+    orders = _join(orders, customer.select(["c_custkey"]), "o_custkey", "c_custkey")
+    result = _join(lineitem, orders, "l_orderkey", "o_orderkey")
+    result = result.append_column("revenue", _revenue(result))
+    result = result.group_by(["l_orderkey", "o_orderdate", "o_shippriority"]).aggregate(
+        [("revenue", "sum")]
+    )
+    return _sort(result, "-revenue_sum", "o_orderdate", limit=10)
+
+
+def q04(get, scale_factor):
+    orders = get("orders", ["o_orderkey", "o_orderdate", "o_orderpriority"]).filter(
+        (field("o_orderdate") >= _date("1993-07-01"))
+        & (field("o_orderdate") < _date("1993-10-01"))
+    )
+    late = get("lineitem", ["l_orderkey", "l_commitdate", "l_receiptdate"]).filter(
+        field("l_commitdate") < field("l_receiptdate")
+    )
+    orders = _join(
+        orders,
+        late.select(["l_orderkey"]),
+        "o_orderkey",
+        "l_orderkey",
+        join_type="left semi",
+    )
+    result = orders.group_by("o_orderpriority").aggregate([("o_orderkey", "count")])
+    return _sort(result, "o_orderpriority")
+
+
+def q05(get, scale_factor):
+    customer = _join(
+        get("customer", ["c_custkey", "c_nationkey"]),
+        _nations_in(get, "ASIA"),
+        "c_nationkey",
+        "n_nationkey",
+    )
+    orders = get("orders", ["o_orderkey", "o_custkey", "o_orderdate"]).filter(
+        (field("o_orderdate") >= _date("1994-01-01"))
+        & (field("o_orderdate") < _date("1995-01-01"))
+    )
+    orders = _join(orders, customer, "o_custkey", "c_custkey")
+    lineitem = _join(
+        get("lineitem", ["l_orderkey", "l_suppkey", "l_extendedprice", "l_discount"]),
+        get("supplier", ["s_suppkey", "s_nationkey"]),
+        "l_suppkey",
+        "s_suppkey",
+    )
+    result = _join(
+        lineitem,
+        orders,
+        ["l_orderkey", "s_nationkey"],
+        ["o_orderkey", "c_nationkey"],
+    )
+    result = result.append_column("revenue", _revenue(result))
+    result = result.group_by("n_name").aggregate([("revenue", "sum")])
+    return _sort(result, "-revenue_sum")
+
+
+def q06(get, scale_factor):
+    lineitem = get(
+        "lineitem", ["l_shipdate", "l_discount", "l_quantity", "l_extendedprice"]
+    ).filter(
+        (field("l_shipdate") >= _date("1994-01-01"))
+        & (field("l_shipdate") < _date("1995-01-01"))
+        & (field("l_discount") >= 0.05)
+        & (field("l_discount") <= 0.07)
+        & (field("l_quantity") < 24)
+    )
+    revenue = pc.sum(pc.multiply(lineitem["l_extendedprice"], lineitem["l_discount"]))
+    return pyarrow.table({"revenue": [revenue.as_py()]})
+
+
+def q07(get, scale_factor):
+    nations = get("nation", ["n_nationkey", "n_name"]).filter(
+        pc.is_in(field("n_name"), pyarrow.array(["FRANCE", "GERMANY"]))
+    )
+    suppliers = _join(
+        get("supplier", ["s_suppkey", "s_nationkey"]),
+        nations.rename_columns(["n_nationkey", "supp_nation"]),
+        "s_nationkey",
+        "n_nationkey",
+    )
+    customers = _join(
+        get("customer", ["c_custkey", "c_nationkey"]),
+        nations.rename_columns(["n_nationkey", "cust_nation"]),
+        "c_nationkey",
+        "n_nationkey",
+    )
+    lineitem = get(
+        "lineitem",
+        ["l_orderkey", "l_suppkey", "l_shipdate", "l_extendedprice", "l_discount"],
+    ).filter(
+        (field("l_shipdate") >= _date("1995-01-01"))
+        & (field("l_shipdate") <= _date("1996-12-31"))
+    )
+    orders = _join(
+        get("orders", ["o_orderkey", "o_custkey"]), customers, "o_custkey", "c_custkey"
+    )
+    result = _join(
+        _join(lineitem, suppliers, "l_suppkey", "s_suppkey"),
+        orders,
+        "l_orderkey",
+        "o_orderkey",
+    ).filter(
+        ((field("supp_nation") == "FRANCE") & (field("cust_nation") == "GERMANY"))
+        | ((field("supp_nation") == "GERMANY") & (field("cust_nation") == "FRANCE"))
+    )
+    result = result.append_column("l_year", pc.year(result["l_shipdate"]))
+    result = result.append_column("volume", _revenue(result))
+    result = result.group_by(["supp_nation", "cust_nation", "l_year"]).aggregate(
+        [("volume", "sum")]
+    )
+    return _sort(result, "supp_nation", "cust_nation", "l_year")
+
+
+def q08(get, scale_factor):
+    parts = get("part", ["p_partkey", "p_type"]).filter(
+        field("p_type") == "ECONOMY ANODIZED STEEL"
+    )
+    customers = _join(
+        get("customer", ["c_custkey", "c_nationkey"]),
+        _nations_in(get, "AMERICA").select(["n_nationkey"]),
+        "c_nationkey",
+        "n_nationkey",
+    )
+    orders = get("orders", ["o_orderkey", "o_custkey", "o_orderdate"]).filter(
+        (field("o_orderdate") >= _date("1995-01-01"))
+        & (field("o_orderdate") <= _date("1996-12-31"))
+    )
+    orders = _join(orders, customers, "o_custkey", "c_custkey")
+    lineitem = get(
+        "lineitem",
+        ["l_orderkey", "l_partkey", "l_suppkey", "l_extendedprice", "l_discount"],
+    )
+    lineitem = _join(lineitem, parts.select(["p_partkey"]), "l_partkey", "p_partkey")
+    suppliers = _join(
+        get("supplier", ["s_suppkey", "s_nationkey"]),
+        get("nation", ["n_nationkey", "n_name"]),
+        "s_nationkey",
+        "n_nationkey",
+    )
+    result = _join(
+        _join(lineitem, orders, "l_orderkey", "o_orderkey"),
+        suppliers,
+        "l_suppkey",
+        "s_suppkey",
+    )
+    volume = _revenue(result)
+    result = result.append_column("o_year", pc.year(result["o_orderdate"]))
+    result = result.append_column("volume", volume)
+    result = result.append_column(
+        "brazil_volume", pc.if_else(pc.equal(result["n_name"], "BRAZIL"), volume, 0.0)
+    )
+    result = result.group_by("o_year").aggregate(
+        [("brazil_volume", "sum"), ("volume", "sum")]
+    )
+    share = pc.divide(result["brazil_volume_sum"], result["volume_sum"])
+    result = pyarrow.table({"o_year": result["o_year"], "mkt_share": share})
+    return _sort(result, "o_year")
+
+
+def q09(get, scale_factor):
+    parts = get("part", ["p_partkey", "p_name"]).filter(
+        pc.match_substring(field("p_name"), "green")
+    )
+    lineitem = get(
+        "lineitem",
+        [
+            "l_orderkey",
+            "l_partkey",
+            "l_suppkey",
+            "l_quantity",
+            "l_extendedprice",
+            "l_discount",
+        ],
+    )
+    lineitem = _join(lineitem, parts.select(["p_partkey"]), "l_partkey", "p_partkey")
+    lineitem = _join(
+        lineitem,
+        get("partsupp", ["ps_partkey", "ps_suppkey", "ps_supplycost"]),
+        ["l_suppkey", "l_partkey"],
+        ["ps_suppkey", "ps_partkey"],
+    )
+    suppliers = _join(
+        get("supplier", ["s_suppkey", "s_nationkey"]),
+        get("nation", ["n_nationkey", "n_name"]),
+        "s_nationkey",
+        "n_nationkey",
+    )
+    result = _join(lineitem, suppliers, "l_suppkey", "s_suppkey")
+    result = _join(
+        result, get("orders", ["o_orderkey", "o_orderdate"]), "l_orderkey", "o_orderkey"
+    )
+    amount = pc.subtract(
+        _revenue(result), pc.multiply(result["ps_supplycost"], result["l_quantity"])
+    )
+    result = result.append_column("o_year", pc.year(result["o_orderdate"]))
+    result = result.append_column("amount", amount)
+    result = result.group_by(["n_name", "o_year"]).aggregate([("amount", "sum")])
+    return _sort(result, "n_name", "-o_year")
+
+
+def q10(get, scale_factor):
+    orders = get("orders", ["o_orderkey", "o_custkey", "o_orderdate"]).filter(
+        (field("o_orderdate") >= _date("1993-10-01"))
+        & (field("o_orderdate") < _date("1994-01-01"))
+    )
+    lineitem = get(
+        "lineitem", ["l_orderkey", "l_returnflag", "l_extendedprice", "l_discount"]
+    ).filter(field("l_returnflag") == "R")
+    customers = _join(
+        get(
+            "customer",
+            [
+                "c_custkey",
+                "c_name",
+                "c_acctbal",
+                "c_phone",
+                "c_nationkey",
+                "c_address",
+                "c_comment",
+            ],
+        ),
+        get("nation", ["n_nationkey", "n_name"]),
+        "c_nationkey",
+        "n_nationkey",
+    )
+    result = _join(lineitem, orders, "l_orderkey", "o_orderkey")
+    result = result.append_column("revenue", _revenue(result))
+    result = result.group_by("o_custkey").aggregate([("revenue", "sum")])
+    result = _join(result, customers, "o_custkey", "c_custkey").select(
+        [
+            "o_custkey",
+            "c_name",
+            "revenue_sum",
+            "c_acctbal",
+            "n_name",
+            "c_address",
+            "c_phone",
+            "c_comment",
+        ]
+    )
+    return _sort(result, "-revenue_sum", limit=20)
+
+
+def q11(get, scale_factor):
+    suppliers = _join(
+        get("supplier", ["s_suppkey", "s_nationkey"]),
+        _nation(get, "GERMANY").select(["n_nationkey"]),
+        "s_nationkey",
+        "n_nationkey",
+    )
+    partsupp = _join(
+        get("partsupp", ["ps_partkey", "ps_suppkey", "ps_availqty", "ps_supplycost"]),
+        suppliers.select(["s_suppkey"]),
+        "ps_suppkey",
+        "s_suppkey",
+    )
+    value = pc.multiply(partsupp["ps_supplycost"], partsupp["ps_availqty"])
+    partsupp = partsupp.append_column("value", value)
+    threshold = pc.sum(value).as_py() * 0.0001 / scale_factor
+    result = partsupp.group_by("ps_partkey").aggregate([("value", "sum")])
+    result = result.filter(field("value_sum") > threshold)
+    return _sort(result, "-value_sum")
+
+
+def q12(get, scale_factor):
+    lineitem = get(
+        "lineitem",
+        ["l_orderkey", "l_shipmode", "l_shipdate", "l_commitdate", "l_receiptdate"],
+    ).filter(
+        pc.is_in(field("l_shipmode"), pyarrow.array(["MAIL", "SHIP"]))
+        & (field("l_commitdate") < field("l_receiptdate"))
+        & (field("l_shipdate") < field("l_commitdate"))
+        & (field("l_receiptdate") >= _date("1994-01-01"))
+        & (field("l_receiptdate") < _date("1995-01-01"))
+    )
+    result = _join(
+        lineitem,
+        get("orders", ["o_orderkey", "o_orderpriority"]),
+        "l_orderkey",
+        "o_orderkey",
+    )
+    high = pc.is_in(result["o_orderpriority"], pyarrow.array(["1-URGENT", "2-HIGH"]))
+    result = result.append_column("high_line", pc.cast(high, pyarrow.int64()))
+    result = result.append_column("low_line", pc.cast(pc.invert(high), pyarrow.int64()))
+    result = result.group_by("l_shipmode").aggregate(
+        [("high_line", "sum"), ("low_line", "sum")]
+    )
+    return _sort(result, "l_shipmode")
+
+
+def q13(get, scale_factor):
+    orders = get("orders", ["o_orderkey", "o_custkey", "o_comment"]).filter(
+        pc.invert(pc.match_like(field("o_comment"), "%special%requests%"))
+    )
+    customers = _join(
+        get("customer", ["c_custkey"]),
+        orders.select(["o_orderkey", "o_custkey"]),
+        "c_custkey",
+        "o_custkey",
+        join_type="left outer",
+    )
+    counts = customers.group_by("c_custkey").aggregate([("o_orderkey", "count")])
+    result = counts.group_by("o_orderkey_count").aggregate([("c_custkey", "count")])
+    return _sort(result, "-c_custkey_count", "-o_orderkey_count")
+
+
+def q14(get, scale_factor):
+    lineitem = get(
+        "lineitem", ["l_partkey", "l_shipdate", "l_extendedprice", "l_discount"]
+    ).filter(
+        (field("l_shipdate") >= _date("1995-09-01"))
+        & (field("l_shipdate") < _date("1995-10-01"))
+    )
+    result = _join(
+        lineitem, get("part", ["p_partkey", "p_type"]), "l_partkey", "p_partkey"
+    )
+    revenue = _revenue(result)
+    promo = pc.if_else(pc.starts_with(result["p_type"], "PROMO"), revenue, 0.0)
+    share = 100.0 * pc.sum(promo).as_py() / pc.sum(revenue).as_py()
+    return pyarrow.table({"promo_revenue": [share]})
+
+
+def q15(get, scale_factor):
+    lineitem = get(
+        "lineitem", ["l_suppkey", "l_shipdate", "l_extendedprice", "l_discount"]
+    ).filter(
+        (field("l_shipdate") >= _date("1996-01-01"))
+        & (field("l_shipdate") < _date("1996-04-01"))
+    )
+    lineitem = lineitem.append_column("revenue", _revenue(lineitem))
+    revenue = lineitem.group_by("l_suppkey").aggregate([("revenue", "sum")])
+    top = revenue.filter(field("revenue_sum") == pc.max(revenue["revenue_sum"]))
+    result = _join(
+        get("supplier", ["s_suppkey", "s_name", "s_address", "s_phone"]),
+        top,
+        "s_suppkey",
+        "l_suppkey",
+    )
+    return _sort(result, "s_suppkey")
+
+
+def q16(get, scale_factor):
+    parts = get("part", ["p_partkey", "p_brand", "p_type", "p_size"]).filter(
+        (field("p_brand") != "Brand#45")
+        & pc.invert(pc.starts_with(field("p_type"), "MEDIUM POLISHED"))
+        & pc.is_in(field("p_size"), pyarrow.array([49, 14, 23, 45, 19, 3, 36, 9]))
+    )
+    complaints = get("supplier", ["s_suppkey", "s_comment"]).filter(
+        pc.match_like(field("s_comment"), "%Customer%Complaints%")
+    )
+    partsupp = _join(
+        get("partsupp", ["ps_partkey", "ps_suppkey"]),
+        complaints.select(["s_suppkey"]),
+        "ps_suppkey",
+        "s_suppkey",
+        join_type="left anti",
+    )
+    result = _join(partsupp, parts, "ps_partkey", "p_partkey")
+    result = result.group_by(["p_brand", "p_type", "p_size"]).aggregate(
+        [("ps_suppkey", "count_distinct")]
+    )
+    return _sort(result, "-ps_suppkey_count_distinct", "p_brand", "p_type", "p_size")
+
+
+def q17(get, scale_factor):
+    parts = get("part", ["p_partkey", "p_brand", "p_container"]).filter(
+        (field("p_brand") == "Brand#23") & (field("p_container") == "MED BOX")
+    )
+    lineitem = _join(
+        get("lineitem", ["l_partkey", "l_quantity", "l_extendedprice"]),
+        parts.select(["p_partkey"]),
+        "l_partkey",
+        "p_partkey",
+    )
+    average = lineitem.group_by("l_partkey").aggregate([("l_quantity", "mean")])
+    lineitem = _join(lineitem, average, "l_partkey")
+    lineitem = lineitem.filter(
+        pc.less(lineitem["l_quantity"], pc.multiply(0.2, lineitem["l_quantity_mean"]))
+    )
+    avg_yearly = (pc.sum(lineitem["l_extendedprice"]).as_py() or 0.0) / 7.0
+    return pyarrow.table({"avg_yearly": [avg_yearly]})
+
+
+def q18(get, scale_factor):
+    lineitem = get("lineitem", ["l_orderkey", "l_quantity"])
+    quantities = lineitem.group_by("l_orderkey").aggregate([("l_quantity", "sum")])
+    large = quantities.filter(field("l_quantity_sum") > 300)
+    orders = _join(
+        get("orders", ["o_orderkey", "o_custkey", "o_orderdate", "o_totalprice"]),
+        large,
+        "o_orderkey",
+        "l_orderkey",
+    )
+    result = _join(
+        orders, get("customer", ["c_custkey", "c_name"]), "o_custkey", "c_custkey"
+    ).select(
+        [
+            "c_name",
+            "o_custkey",
+            "o_orderkey",
+            "o_orderdate",
+            "o_totalprice",
+            "l_quantity_sum",
+        ]
+    )
+    return _sort(result, "-o_totalprice", "o_orderdate", limit=100)
+
+
+def q19(get, scale_factor):
+    lineitem = get(
+        "lineitem",
+        [
+            "l_partkey",
+            "l_quantity",
+            "l_extendedprice",
+            "l_discount",
+            "l_shipmode",
+            "l_shipinstruct",
+        ],
+    ).filter(
+        pc.is_in(field("l_shipmode"), pyarrow.array(["AIR", "AIR REG"]))
+        & (field("l_shipinstruct") == "DELIVER IN PERSON")
+    )
+    result = _join(
+        lineitem,
+        get("part", ["p_partkey", "p_brand", "p_container", "p_size"]),
+        "l_partkey",
+        "p_partkey",
+    )
+
+    def condition(brand, containers, quantity, size):
+        return (
+            (field("p_brand") == brand)
+            & pc.is_in(field("p_container"), pyarrow.array(containers))
+            & (field("l_quantity") >= quantity)
+            & (field("l_quantity") <= quantity + 10)
+            & (field("p_size") >= 1)
+            & (field("p_size") <= size)
+        )
+
+    result = result.filter(
+        condition("Brand#12", ["SM CASE", "SM BOX", "SM PACK", "SM PKG"], 1, 5)
+        | condition("Brand#23", ["MED BAG", "MED BOX", "MED PKG", "MED PACK"], 10, 10)
+        | condition("Brand#34", ["LG CASE", "LG BOX", "LG PACK", "LG PKG"], 20, 15)
+    )
+    return pyarrow.table({"revenue": [pc.sum(_revenue(result)).as_py()]})
+
+
+def q20(get, scale_factor):
+    parts = get("part", ["p_partkey", "p_name"]).filter(
+        pc.starts_with(field("p_name"), "forest")
+    )
+    lineitem = get("lineitem", ["l_partkey", "l_suppkey", "l_quantity", "l_shipdate"])
+    lineitem = lineitem.filter(
+        (field("l_shipdate") >= _date("1994-01-01"))
+        & (field("l_shipdate") < _date("1995-01-01"))
+    )
+    quantities = lineitem.group_by(["l_partkey", "l_suppkey"]).aggregate(
+        [("l_quantity", "sum")]
+    )
+    partsupp = _join(
+        get("partsupp", ["ps_partkey", "ps_suppkey", "ps_availqty"]),
+        parts.select(["p_partkey"]),
+        "ps_partkey",
+        "p_partkey",
+        join_type="left semi",
+    )
+    partsupp = _join(
+        partsupp,
+        quantities,
+        ["ps_partkey", "ps_suppkey"],
+        ["l_partkey", "l_suppkey"],
+    )
+    partsupp = partsupp.filter(
+        pc.greater(
+            partsupp["ps_availqty"], pc.multiply(0.5, partsupp["l_quantity_sum"])
+        )
+    )
+    suppliers = _join(
+        get("supplier", ["s_suppkey", "s_name", "s_address", "s_nationkey"]),
+        _nation(get, "CANADA").select(["n_nationkey"]),
+        "s_nationkey",
+        "n_nationkey",
+    )
+    result = _join(
+        suppliers,
+        partsupp.select(["ps_suppkey"]),
+        "s_suppkey",
+        "ps_suppkey",
+        join_type="left semi",
+    ).select(["s_name", "s_address"])
+    return _sort(result, "s_name")
+
+
+def q21(get, scale_factor):
+    lineitem = get(
+        "lineitem", ["l_orderkey", "l_suppkey", "l_commitdate", "l_receiptdate"]
+    )
+    late = lineitem.filter(field("l_receiptdate") > field("l_commitdate"))
+    # Orders with more than one supplier, of which only one was late.
+    suppliers = lineitem.group_by("l_orderkey").aggregate(
+        [("l_suppkey", "count_distinct")]
+    )
+    late_suppliers = late.group_by("l_orderkey").aggregate(
+        [("l_suppkey", "count_distinct")]
+    )
+    waiting = _join(
+        suppliers.filter(field("l_suppkey_count_distinct") > 1).select(["l_orderkey"]),
+        late_suppliers.filter(field("l_suppkey_count_distinct") == 1),
+        "l_orderkey",
+    ).select(["l_orderkey"])
+    orders = get("orders", ["o_orderkey", "o_orderstatus"]).filter(
+        field("o_orderstatus") == "F"
+    )
+    suppliers = _join(
+        get("supplier", ["s_suppkey", "s_name", "s_nationkey"]),
+        _nation(get, "SAUDI ARABIA").select(["n_nationkey"]),
+        "s_nationkey",
+        "n_nationkey",
+    )
+    result = _join(late, waiting, "l_orderkey", join_type="left semi")
+    result = _join(result, orders.select(["o_orderkey"]), "l_orderkey", "o_orderkey")
+    result = _join(result, suppliers, "l_suppkey", "s_suppkey")
+    result = result.group_by("s_name").aggregate([("l_orderkey", "count")])
+    return _sort(result, "-l_orderkey_count", "s_name", limit=100)
+
+
+def q22(get, scale_factor):
+    codes = pyarrow.array(["13", "31", "23", "29", "30", "18", "17"])
+    customers = get("customer", ["c_custkey", "c_phone", "c_acctbal"])
+    customers = customers.append_column(
+        "cntrycode", pc.utf8_slice_codeunits(customers["c_phone"], 0, 2)
+    ).filter(pc.is_in(field("cntrycode"), codes))
+    average = pc.mean(customers.filter(field("c_acctbal") > 0.0)["c_acctbal"]).as_py()
+    customers = customers.filter(field("c_acctbal") > average)
+    customers = _join(
+        customers,
+        get("orders", ["o_custkey"]),
+        "c_custkey",
+        "o_custkey",
+        join_type="left anti",
+    )
+    result = customers.group_by("cntrycode").aggregate(
+        [("c_custkey", "count"), ("c_acctbal", "sum")]
+    )
+    return _sort(result, "cntrycode")
+
+
+QUERIES = {i: globals()[f"q{i:02d}"] for i in range(1, 23)}
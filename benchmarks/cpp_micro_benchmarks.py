@@ -1,13 +1,15 @@
 import copy
+import glob
 import logging
 import os
-from typing import List
+import re
+from typing import Dict, List, Optional
 
 import conbenchlegacy.runner
 from benchadapt.adapters import ArcheryAdapter
 from benchadapt.log import log
 
-from benchmarks import _benchmark
+from benchmarks import _benchmark, _incremental, _parallel
 
 log.setLevel(logging.DEBUG)
 
@@ -87,17 +89,45 @@ def _get_cli_options(options: dict) -> List[str]:
     return command_params
 
 
+def _get_build_dir(options: dict) -> Optional[str]:
+    """The already-built arrow C++ to benchmark, if there is one."""
+    path = options.get("rev_or_path", None)
+    if not path and os.getenv("ARROW_BUILD_DIR"):
+        path = f"{os.getenv('ARROW_BUILD_DIR')}/cpp"
+    return path if path and os.path.isdir(path) else None
+
+
+def _get_suite_binaries(build_dir: str, suite_filter: Optional[str]) -> Dict[str, str]:
+    """The benchmark binaries of a build (in e.g. "release/"), by suite."""
+    binaries = {}
+    for path in sorted(glob.glob(os.path.join(build_dir, "*", "*-benchmark"))):
+        suite = os.path.basename(path)
+        if os.access(path, os.X_OK) and re.search(suite_filter or "", suite):
+            binaries[suite] = path
+    return binaries
+
+
 @conbenchlegacy.runner.register_benchmark
 class RecordCppMicroBenchmarks(_benchmark.Benchmark):
     """Run the Arrow C++ micro benchmarks."""
 
     external = True
     name = "cpp-micro"
-    options = copy.deepcopy(OPTIONS)
+    options = {
+        **copy.deepcopy(OPTIONS),
+        "baseline": {
+            "default": None,
+            "type": str,
+            "help": "Commit whose results to reuse for suites whose binaries "
+            "haven't changed since (see _incremental.py).",
+        },
+    }
     description = "Run the Arrow C++ micro benchmarks."
     iterations = None  # the executable handles repetitions internally
     flags = {"language": "C++"}
     adapter = None
+    reused = None
+    store = _incremental.Store("cpp")
 
     def __init__(self):
         # first so `.conbench` attribute exists
@@ -113,13 +143,22 @@ class RecordCppMicroBenchmarks(_benchmark.Benchmark):
                 self.github_info["pr_number"]
             )
 
-        self.adapter = ArcheryAdapter(
+        self._result_fields_append = {"tags": tags, "info": info, "context": context}
+        self.adapter = self._get_adapter()
+
+    def _get_adapter(self, cores: Optional[List[int]] = None) -> ArcheryAdapter:
+        adapter = ArcheryAdapter(
             result_fields_override={
                 # this version grabs hostname from the `.conbench` file
                 "machine_info": self.conbench.machine_info,
             },
-            result_fields_append={"tags": tags, "info": info, "context": context},
+            result_fields_append=copy.deepcopy(self._result_fields_append),
         )
+        if cores:
+            # Not sched_setaffinity(), which would pin all of this process
+            cpu_list = ",".join(map(str, cores))
+            adapter.command = ["taskset", "--cpu-list", cpu_list, *adapter.command]
+        return adapter
 
     def run(self, **kwargs):
         run_reason = kwargs.get("run_reason")
@@ -132,14 +171,106 @@ class RecordCppMicroBenchmarks(_benchmark.Benchmark):
         command_params = _get_cli_options(kwargs)
 
         # don't rerun if generator called more than once
-        if not self.adapter.results:
-            self.adapter.run(command_params)
+        if not self.adapter.results and self.reused is None:
+            self.reused = []
+            fingerprints = self._get_fingerprints(kwargs)
+            baseline = kwargs.get("baseline", None)
+            if baseline and fingerprints is None:
+                log.warning("no arrow build to compare to %s, running all", baseline)
+            elif baseline:
+                self._reuse(baseline, fingerprints)
+                if not fingerprints:
+                    log.info("no suite changed since %s", baseline)
+                suite_filter = _incremental.suite_filter(fingerprints)
+                command_params = _get_cli_options(
+                    {**kwargs, "suite_filter": suite_filter}
+                )
+            if fingerprints is None and _parallel.enabled():
+                log.warning("no arrow build to list suites of, running serially")
+            if fingerprints is not None and _parallel.enabled():
+                self.adapter.results = self._run_parallel(kwargs, fingerprints)
+            elif fingerprints is None or fingerprints:
+                self.adapter.run(command_params)
+            if fingerprints is not None and self.github_info["commit"]:
+                self._store(fingerprints)
+
+        results = [res.to_publishable_dict() for res in self.adapter.results]
 
-        results = self.adapter.results
+        for res_json in results + self.reused:
+            # Rather than adapter.post_results(), which posts synchronously
+            if not os.environ.get("DRY_RUN"):
+                self.conbench.publish(res_json)
+            yield res_json, None
+
+    def _run_parallel(self, options, suites):
+        """Run multi-threaded suites one at a time on all cores, then the
+        others concurrently, each on one of the core groups."""
+        overrides = self.adapter.result_fields_override
+        exclusive, shared = _parallel.split(suites)
+        results = []
+        if exclusive:
+            adapter = self._get_adapter()
+            adapter.result_fields_override.update(overrides)
+            params = {**options, "suite_filter": _incremental.suite_filter(exclusive)}
+            results += _parallel.mark(adapter.run(_get_cli_options(params)), None)
+
+        def run_suite(suite, cores):
+            adapter = self._get_adapter(cores)
+            adapter.result_fields_override.update(overrides)
+            params = {**options, "suite_filter": _incremental.suite_filter([suite])}
+            return _parallel.mark(adapter.run(_get_cli_options(params)), cores)
 
-        if not os.environ.get("DRY_RUN"):
-            self.adapter.post_results()
+        for suite_results in _parallel.run(shared, run_suite):
+            results += suite_results
+        return results
 
-        for res in results:
+    def _get_fingerprints(self, options) -> Optional[Dict[str, str]]:
+        """A fingerprint per suite to run, or None without a build to look at."""
+        build_dir = _get_build_dir(options)
+        if build_dir is None:
+            return None
+        # Options that change the numbers change the fingerprint too
+        run_options = {
+            key: options.get(key, None)
+            for key in ("repetitions", "repetition_min_time", "benchmark_filter")
+        }
+        binaries = _get_suite_binaries(build_dir, options.get("suite_filter", None))
+        return {
+            suite: _incremental.binary_fingerprint(binary, run_options)
+            for suite, binary in binaries.items()
+        }
+
+    def _reuse(self, baseline: str, fingerprints: Dict[str, str]) -> None:
+        """Take the baseline's results for unchanged suites out of
+        `fingerprints`, into `self.reused`."""
+        fields = {
+            **self.adapter.result_fields_override,
+            "github": self.github_info,
+        }
+        fields.pop("machine_info", None)
+        for suite, fingerprint in list(fingerprints.items()):
+            stored = self.store.load(baseline, suite)
+            if stored is None or stored["fingerprint"] != fingerprint:
+                continue
+            measured = stored["reused_from"] or baseline
+            results = [
+                _incremental.mark_reused(result, measured, **fields)
+                for result in stored["results"]
+            ]
+            commit = self.github_info["commit"]
+            if commit:
+                self.store.save(commit, suite, stored["results"], fingerprint, measured)
+            self.reused.extend(results)
+            del fingerprints[suite]
+
+    def _store(self, fingerprints: Dict[str, str]) -> None:
+        """Store this run's results per suite, for later runs to reuse."""
+        by_suite = {}
+        for res in self.adapter.results:
             res_json = res.to_publishable_dict()
-            yield res_json, None
+            by_suite.setdefault(res_json["tags"].get("suite"), []).append(res_json)
+        for suite, fingerprint in fingerprints.items():
+            results = by_suite.get(suite, [])
+            # Failed suites run again next time
+            if results and not any(res.get("error") for res in results):
+                self.store.save(self.github_info["commit"], suite, results, fingerprint)
@@ -13,6 +13,12 @@ class CsvBenchmark(_benchmark.BenchmarkPythonR):
     arguments = ["source"]
     sources = ["fanniemae_2016Q4", "nyctaxi_2010-01"]
     sources_test = ["fanniemae_sample", "nyctaxi_sample"]
+    sources_generated = [
+        "generated_sample",
+        "generated_1M",
+        "generated_10M",
+        "generated_100M",
+    ]
 
     def run(self, source, case=None, **kwargs):
         cases = self.get_cases(case, kwargs)
@@ -21,42 +27,36 @@ class CsvBenchmark(_benchmark.BenchmarkPythonR):
         for source in self.get_sources(source):
             tags = self.get_tags(kwargs, source)
 
-            for case in cases:
-                if language == "python":
+            if language == "python":
+                for case in cases:
                     if case not in self.valid_python_cases:
                         continue
                     f = self._get_benchmark_function(source, *case)
                     yield self.benchmark(f, tags, kwargs, case)
-                elif language == "r":
-                    if case not in self.valid_r_cases:
-                        continue
-                    command = self._get_r_command(source, case, kwargs)
-                    yield self.r_benchmark(
-                        command=command, extra_tags=tags, options=kwargs, case=case
-                    )
-
-    def _get_r_command(self, source, case, options) -> str:
+            elif language == "r":
+                r_cases = [
+                    (self._get_r_params(source, case, kwargs), tags, case)
+                    for case in cases
+                    if case in self.valid_r_cases
+                ]
+                yield from self.r_benchmarks(r_cases, kwargs)
+
+    def _get_r_params(self, source, case, options) -> dict:
         params = self._case_to_param_dict(case=case)
+        r_params = {
+            "cpu_count": options.get("cpu_count"),
+            "source": source.name,
+            f"{self.r_name[:4]}er": "arrow",
+        }
 
         if self.name == "csv-read":
             # TODO: remove once compression available for writing
-            compression = f"compression=\"{params['compression']}\", "
-            io_type = "output_format"
+            r_params["compression"] = params["compression"]
+            r_params["output_format"] = params["output_format"]
         elif self.name == "csv-write":
-            compression = ""
-            io_type = "input"
-
-        r_command = f"""
-            library(arrowbench);
-            run_one({self.r_name},
-            cpu_count={self.r_cpu_count(options)},
-            source="{source.name}",
-            {self.r_name[:4]}er='arrow',
-            {compression}
-            {io_type}=\"{params[io_type]}\")
-        """
-
-        return r_command
+            r_params["input"] = params["input"]
+
+        return r_params
 
     def _case_to_param_dict(self, case: tuple) -> dict:
         params = {
@@ -12,6 +12,11 @@ class DatasetFilterBenchmark(_benchmark.Benchmark):
     arguments = ["source"]
     sources = ["nyctaxi_2010-01"]
     sources_test = ["nyctaxi_sample"]
+    sources_generated = [
+        "nyctaxi_generated_sample",
+        "nyctaxi_generated_10M",
+        "nyctaxi_generated_100M",
+    ]
 
     def run(self, source, **kwargs):
         for source in self.get_sources(source):
@@ -25,7 +30,7 @@ class DatasetFilterBenchmark(_benchmark.Benchmark):
 
     def _get_benchmark_function(self, dataset):
         # for this filter to work, source must be one of:
-        #    nyctaxi_sample  --or--  nyctaxi_2010-01
+        #    nyctaxi_sample  --or--  nyctaxi_2010-01  --or--  nyctaxi_generated_*
         vendor = pyarrow.dataset.field("vendor_id")
         count = pyarrow.dataset.field("passenger_count")
         return lambda: dataset.to_table(filter=(vendor == "DDS") & (count > 3))
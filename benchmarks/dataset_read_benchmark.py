@@ -1,9 +1,8 @@
 import conbenchlegacy.runner
 import pyarrow
 import pyarrow.dataset
-import pyarrow.fs
 
-from benchmarks import _benchmark
+from benchmarks import _benchmark, _cloud
 
 
 @conbenchlegacy.runner.register_benchmark
@@ -27,9 +26,10 @@ class DatasetReadBenchmark(_benchmark.Benchmark):
         for source in self.get_sources(source):
             tags = self.get_tags(kwargs, source)
             tags["async"] = True
+            tags.update(_cloud.tags())
             format_str = source.format_str
-            schema = self._get_schema(source)
-            s3 = pyarrow.fs.S3FileSystem(region=source.region, anonymous=True)
+            s3 = _cloud.filesystem(source.region, source.paths)
+            schema = self._get_schema(source, s3)
             for case in cases:
                 (pre_buffer,) = case
                 legacy, format_ = self._get_format(pre_buffer, format_str)
@@ -48,12 +48,13 @@ class DatasetReadBenchmark(_benchmark.Benchmark):
     def _get_benchmark_function(self, dataset):
         return lambda: dataset.to_table()
 
-    def _get_schema(self, source):
+    def _get_schema(self, source, filesystem):
         # TODO: FileSystemDataset.from_paths() can't currently discover
         # the schema, but pyarrow.dataset.dataset() can. Ideally, we
         # would just be able to omit the schema in FileSystemDataset.
-        path = "s3://" + source.paths[0]
-        return pyarrow.dataset.dataset(path, format=source.format_str).schema
+        return pyarrow.dataset.dataset(
+            source.paths[0], format=source.format_str, filesystem=filesystem
+        ).schema
 
     def _get_format(self, pre_buffer, format_str):
         # not using actual booleans... see hacks.py in conbench
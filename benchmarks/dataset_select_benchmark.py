@@ -1,7 +1,7 @@
 import conbenchlegacy.runner
 import pyarrow.dataset
 
-from benchmarks import _benchmark
+from benchmarks import _benchmark, _cloud
 
 
 @conbenchlegacy.runner.register_benchmark
@@ -14,26 +14,44 @@ class DatasetSelectBenchmark(_benchmark.Benchmark):
     # This does not load a large amount of data in tests because we
     # always pluck exactly one file from the dataset
     sources_test = ["nyctaxi_multi_parquet_s3_repartitioned"]
+    # The same partition pruning, over datasets partitioned on local disk
+    sources_generated = [
+        "nyctaxi_repartitioned_sample",
+        "nyctaxi_repartitioned_sample_hive",
+        "nyctaxi_repartitioned_10k",
+    ]
     flags = {"cloud": True}
 
     def run(self, source, **kwargs):
+        for source in self.get_sources(source):
+            if source.repartition:
+                dataset = pyarrow.dataset.dataset(
+                    str(source.create_partitioned()),
+                    format="parquet",
+                    partitioning=source.partitioning(),
+                )
+            else:
+                dataset = self._get_s3_dataset(source)
+            f = self._get_benchmark_function(dataset)
+            tags = self.get_tags(kwargs, source)
+            if not source.repartition:
+                tags.update(_cloud.tags())
+            yield self.benchmark(f, tags, kwargs)
+
+    def _get_s3_dataset(self, source):
         path_prefix = "ursa-labs-taxi-data-repartitioned-10k/"
         partitioning = pyarrow.dataset.DirectoryPartitioning.discover(
             field_names=["year", "month", "part"],
             infer_dictionary=True,
         )
-        for source in self.get_sources(source):
-            s3 = pyarrow.fs.S3FileSystem(region=source.region, anonymous=True)
-            dataset = pyarrow.dataset.dataset(
-                source.paths,
-                format="parquet",
-                filesystem=s3,
-                partitioning=partitioning,
-                partition_base_dir=path_prefix,
-            )
-            f = self._get_benchmark_function(dataset)
-            tags = self.get_tags(kwargs, source)
-            yield self.benchmark(f, tags, kwargs)
+        s3 = _cloud.filesystem(source.region, source.paths)
+        return pyarrow.dataset.dataset(
+            source.paths,
+            format="parquet",
+            filesystem=s3,
+            partitioning=partitioning,
+            partition_base_dir=path_prefix,
+        )
 
     def _get_benchmark_function(self, dataset):
         year = pyarrow.dataset.field("year")
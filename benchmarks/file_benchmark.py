@@ -31,39 +31,41 @@ class FileBenchmark(_benchmark.BenchmarkPythonR):
 
         for source in self.get_sources(source):
             tags = self.get_tags(kwargs, source)
-            for case in cases:
-                if language == "python":
+            if language == "python":
+                for case in cases:
                     f = self._get_benchmark_function(source, case)
                     yield self.benchmark(f, tags, kwargs, case)
-                elif language == "r":
-                    command = self._get_r_command(source, case, kwargs)
-                    yield self.r_benchmark(command, tags, kwargs, case)
-
-    def _get_r_command(self, source, case, options):
+            elif language == "r":
+                r_cases = [
+                    (self._get_r_params(source, case, kwargs), tags, case)
+                    for case in cases
+                ]
+                yield from self.r_benchmarks(r_cases, kwargs)
+
+    def _get_r_params(self, source, case, options):
         # changed param names to align with Python in version 0.2.0
-        is_legacy_str, _ = self.conbench.execute_r_command(
-            'cat(packageVersion("arrowbench") <= "0.1.0")'
-        )
-        is_legacy = is_legacy_str == "TRUE"
+        if not hasattr(self, "_is_legacy_r"):
+            is_legacy_str, _ = self.conbench.execute_r_command(
+                'cat(packageVersion("arrowbench") <= "0.1.0")'
+            )
+            self._is_legacy_r = is_legacy_str == "TRUE"
 
         file_type, compression, _type = case
         file_type_var = "file_type"
         _type = "arrow_table" if _type == "table" else "data_frame"
         _name = "input_type" if self.r_name == "write_file" else "output_type"
 
-        if is_legacy:
+        if self._is_legacy_r:
             file_type_var = "format"
             _name = _name.split("_")[0]
 
-        return (
-            f"library(arrowbench); "
-            f"run_one({self.r_name}, "
-            f'source="{source.name}", '
-            f'{file_type_var}="{file_type}", '
-            f'compression="{compression}", '
-            f'{_name}="{_type}", '
-            f"cpu_count={self.r_cpu_count(options)})"
-        )
+        return {
+            "source": source.name,
+            file_type_var: file_type,
+            "compression": compression,
+            _name: _type,
+            "cpu_count": options.get("cpu_count"),
+        }
 
 
 @conbenchlegacy.runner.register_benchmark
@@ -75,6 +77,12 @@ class FileReadBenchmark(FileBenchmark):
     arguments = ["source"]
     sources = ["fanniemae_2016Q4", "nyctaxi_2010-01"]
     sources_test = ["fanniemae_sample", "nyctaxi_sample"]
+    sources_generated = [
+        "generated_sample",
+        "generated_1M",
+        "generated_10M",
+        "generated_100M",
+    ]
 
     def _get_benchmark_function(self, source, case):
         file_type, compression, output_type = case
@@ -103,6 +111,12 @@ class FileWriteBenchmark(FileBenchmark):
     arguments = ["source"]
     sources = ["fanniemae_2016Q4", "nyctaxi_2010-01"]
     sources_test = ["fanniemae_sample", "nyctaxi_sample"]
+    sources_generated = [
+        "generated_sample",
+        "generated_1M",
+        "generated_10M",
+        "generated_100M",
+    ]
 
     def _get_benchmark_function(self, source, case):
         file_type, compression, input_type = case
@@ -1,11 +1,12 @@
 import conbenchlegacy.runner
 import pyarrow.dataset as ds
 
+from benchmarks import _cloud
 from benchmarks._benchmark import Benchmark
 
 
-def run_get_file_info(dataset_uri):
-    ds.dataset(dataset_uri, format="parquet")
+def run_get_file_info(dataset_uri, filesystem=None):
+    ds.dataset(dataset_uri, format="parquet", filesystem=filesystem)
 
 
 @conbenchlegacy.runner.register_benchmark
@@ -24,5 +25,7 @@ class GetFileInfoBenchmark(Benchmark):
         for case in self.get_cases(case, kwargs):
             (dataset_uri,) = case
             tags = self.get_tags(kwargs)
-            f = lambda: run_get_file_info(dataset_uri)
+            tags.update(_cloud.tags())
+            filesystem, path = _cloud.resolve(dataset_uri)
+            f = lambda: run_get_file_info(path, filesystem)
             yield self.benchmark(f, tags, kwargs, case)
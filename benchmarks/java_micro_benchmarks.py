@@ -1,10 +1,15 @@
 import copy
 import json
+import logging
+import os
+import re
 import tempfile
 
 import conbenchlegacy.runner
 
-from benchmarks import _benchmark
+from benchmarks import _benchmark, _incremental
+
+log = logging.getLogger(__name__)
 
 RUN_OPTIONS = {
     "iterations": {
@@ -17,6 +22,12 @@ RUN_OPTIONS = {
         "type": str,
         "help": "Arrow commit.",
     },
+    "baseline": {
+        "default": None,
+        "type": str,
+        "help": "Commit whose results to reuse for suites the changes since "
+        "don't affect (see _incremental.py).",
+    },
 }
 
 
@@ -44,6 +55,18 @@ COMMON_OPTIONS = {
 }
 
 
+# Options that change the numbers, so that results taken with other values
+# aren't reused
+FINGERPRINT_OPTIONS = ("iterations", "java_home", "java_options")
+
+
+def run_fingerprint(options):
+    """The fingerprint of the suites' results, for reuse (see _incremental.py)."""
+    return _incremental.options_fingerprint(
+        {key: options.get(key) for key in FINGERPRINT_OPTIONS}
+    )
+
+
 def get_run_command(filename, options):
     commit = options.get("commit", "HEAD")
     command = [
@@ -90,9 +113,62 @@ class RecordJavaMicroBenchmarks(_benchmark.Benchmark):
     flags = {"language": "Java"}
     iterations = 1
 
+    store = _incremental.Store("java")
+
     def run(self, **kwargs):
+        # archery finds Arrow on its own, but results are only stored (and
+        # reused) under commits of a source directory we know to be Arrow's
+        src = kwargs.get("src") or os.environ.get("ARROW_SRC")
+        commit = None
+        if src:
+            commit = _incremental.git_revision(src, kwargs.get("commit") or "HEAD")
+        fingerprint = run_fingerprint(kwargs)
+        affected, reused, stored = None, {}, []
+        baseline = kwargs.get("baseline")
+        if baseline and not src:
+            log.warning("no --src or ARROW_SRC, not reusing results")
+        elif baseline and kwargs.get("benchmark_filter"):
+            log.warning("--benchmark-filter is set, not reusing results")
+        elif baseline:
+            baseline = _incremental.git_revision(src, baseline) or baseline
+            affected = self._get_affected(src, baseline, commit)
+            reused = self.store.reusable(baseline, commit, affected, fingerprint)
+            stored = self.store.suites(baseline)
+
+        suites = {}
+        # Stored suites taken with other options run again, even if unaffected
+        if affected is None or affected or set(reused) != set(stored):
+            options = {**kwargs}
+            if reused:
+                # Everything but the reused suites, including new ones
+                skipped = "|".join(re.escape(suite) for suite in sorted(reused))
+                options["benchmark_filter"] = rf"^org\.apache\.(?!({skipped})\.)"
+            suites = self._run_suites(options)
+            for name in suites:
+                if commit:
+                    self.store.save(commit, name, suites[name], fingerprint)
+
+        for name in suites:
+            self.conbench.mark_new_batch()
+            for result in suites[name]:
+                yield self._record_result(result, kwargs)
+
+        for name, record in reused.items():
+            self.conbench.mark_new_batch()
+            info = {"reused": True, "reused_from": record["reused_from"]}
+            for result in record["results"]:
+                yield self._record_result(result, kwargs, info)
+
+    def _get_affected(self, src, baseline, commit):
+        if commit is None or not self.store.suites(baseline):
+            log.warning("no results stored for %s, running all", baseline)
+            return None
+        paths = _incremental.changed_files(src, baseline, commit)
+        return None if paths is None else _incremental.java_affected(paths)
+
+    def _run_suites(self, options):
         with tempfile.NamedTemporaryFile(delete=False) as result_file:
-            run_command = get_run_command(result_file.name, kwargs)
+            run_command = get_run_command(result_file.name, options)
             self.execute_command(run_command)
             results = json.load(result_file)
 
@@ -104,13 +180,9 @@ class RecordJavaMicroBenchmarks(_benchmark.Benchmark):
                     if name not in suites:
                         suites[name] = []
                     suites[name].append(result)
+            return suites
 
-            for name in suites:
-                self.conbench.mark_new_batch()
-                for result in suites[name]:
-                    yield self._record_result(result, kwargs)
-
-    def _record_result(self, result, options):
+    def _record_result(self, result, options, optional_benchmark_info=None):
         info, context = {}, {"benchmark_language": "Java"}
         suite, name = _parse_benchmark_name(result["name"])
         tags = {"suite": suite, "source": self.name}
@@ -123,6 +195,7 @@ class RecordJavaMicroBenchmarks(_benchmark.Benchmark):
             options=options,
             output=result,
             name=name,
+            optional_benchmark_info=optional_benchmark_info,
         )
 
     def _get_values(self, result):
@@ -1,10 +1,12 @@
-import json
+import logging
 import os
 import pathlib
 
 import conbenchlegacy.runner
 
-from benchmarks import _benchmark
+from benchmarks import _benchmark, _incremental, _streaming
+
+log = logging.getLogger(__name__)
 
 
 def get_run_command():
@@ -40,36 +42,73 @@ class RecordJavaScriptMicroBenchmarks(_benchmark.Benchmark):
             "type": str,
             "help": "Specify Arrow source directory.",
         },
+        "baseline": {
+            "default": None,
+            "type": str,
+            "help": "Commit whose results to reuse if the changes since don't "
+            "affect the JavaScript benchmarks (see _incremental.py).",
+        },
     }
     description = "Run the Arrow JavaScript micro benchmarks."
     flags = {"language": "JavaScript"}
     iterations = None
 
+    store = _incremental.Store("js")
+
     def run(self, **kwargs):
-        src = kwargs.get("src")
-        if not src:
-            src = os.environ.get("ARROW_SRC")
+        # Results are only stored (and reused) under commits of a source
+        # directory we know to be Arrow's, not whatever we were started in
+        src = kwargs.get("src") or os.environ.get("ARROW_SRC")
+        commit = None
         if src:
             os.chdir(pathlib.Path(src).joinpath("js"))
+            commit = _incremental.git_revision(".", "HEAD")
+        affected, reused = None, {}
+        baseline = kwargs.get("baseline")
+        if baseline and not src:
+            log.warning("no --src or ARROW_SRC, not reusing results")
+        elif baseline:
+            baseline = _incremental.git_revision(".", baseline) or baseline
+            affected = self._get_affected(baseline, commit)
+            reused = self.store.reusable(baseline, commit, affected)
 
-        run_command = get_run_command()
-        _, err = self.execute_command(run_command)
-        results = json.loads(err)
-
-        # bucket by suite
-        suites = {}
-        for result in results:
-            name = result["suite"]
-            if name not in suites:
-                suites[name] = []
-            suites[name].append(result)
+        suites, previous = {}, None
+        if affected is None:
+            # Published as they come, while the suites are still running
+            for result in self._stream_results():
+                name = result["suite"]
+                if name != previous:
+                    self.conbench.mark_new_batch()
+                    previous = name
+                suites.setdefault(name, []).append(result)
+                yield self._record_result(result, kwargs)
+            for name in suites:
+                if commit:
+                    self.store.save(commit, name, suites[name])
 
-        for name in suites:
+        for name, record in reused.items():
             self.conbench.mark_new_batch()
-            for result in suites[name]:
-                yield self._record_result(result, kwargs)
+            info = {"reused": True, "reused_from": record["reused_from"]}
+            for result in record["results"]:
+                yield self._record_result(result, kwargs, info)
+
+    def _get_affected(self, baseline, commit):
+        if commit is None or not self.store.suites(baseline):
+            log.warning("no results stored for %s, running all", baseline)
+            return None
+        paths = _incremental.changed_files(".", baseline, commit)
+        return None if paths is None else _incremental.js_affected(paths)
+
+    def _stream_results(self):
+        """Yield results as `yarn perf --json` writes them to stderr."""
+        parser = _streaming.JSONArrayParser()
+        for name, line in self.stream_command(get_run_command()):
+            if name == "stderr":
+                yield from parser.feed(line)
+        if not parser.done:
+            raise ValueError("yarn perf --json didn't write a complete JSON array")
 
-    def _record_result(self, result, options):
+    def _record_result(self, result, options, optional_benchmark_info=None):
         info, context = {}, {"benchmark_language": "JavaScript"}
         tags = _parse_benchmark_tags(result["name"])
         tags["source"] = self.name
@@ -82,6 +121,7 @@ class RecordJavaScriptMicroBenchmarks(_benchmark.Benchmark):
             options=options,
             output=result,
             name=result["suite"],
+            optional_benchmark_info=optional_benchmark_info,
         )
 
     def _get_values(self, result):
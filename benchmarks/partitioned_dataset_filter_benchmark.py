@@ -18,16 +18,12 @@ class PartitionedDatasetFilterBenchmark(_benchmark.BenchmarkR):
     )
 
     def run(self, case=None, **kwargs):
+        cases = []
         for case in self.get_cases(case, kwargs):
             tags = self.get_tags(kwargs)
             tags["dataset"] = "dataset-taxi-parquet"
-            command = self._get_r_command(kwargs, case)
-            yield self.r_benchmark(command, tags, kwargs, case)
+            cases.append((self._get_r_params(kwargs, case), tags, case))
+        yield from self.r_benchmarks(cases, kwargs)
 
-    def _get_r_command(self, options, case):
-        return (
-            f"library(arrowbench); "
-            f"run_one({self.r_name}, "
-            f"cpu_count={self.r_cpu_count(options)}, "
-            f'query="{case[0]}")'
-        )
+    def _get_r_params(self, options, case):
+        return {"cpu_count": options.get("cpu_count"), "query": case[0]}
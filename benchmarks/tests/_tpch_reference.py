@@ -0,0 +1,446 @@
+"""The 22 TPC-H queries in pandas, written from the SQL of the TPC-H
+specification rather than from _tpch_queries.py, to check its answers.
+
+Each query takes the tables as pandas DataFrames (dates as datetime64) and
+the scale factor, and returns a DataFrame with the columns of the
+_tpch_queries.py result it stands for, in the same order of rows.
+"""
+import pandas as pd
+
+D = pd.Timestamp
+
+
+def _revenue(df):
+    return df.l_extendedprice * (1 - df.l_discount)
+
+
+def _sort(df, *keys, limit=None):
+    df = df.sort_values(
+        [k.lstrip("-") for k in keys],
+        ascending=[not k.startswith("-") for k in keys],
+        kind="stable",
+    )
+    return df.head(limit) if limit else df
+
+
+def _nation_keys(t, name):
+    return t["nation"][t["nation"].n_name == name].n_nationkey
+
+
+def _nations_in(t, region):
+    regions = t["region"][t["region"].r_name == region]
+    return t["nation"][t["nation"].n_regionkey.isin(regions.r_regionkey)]
+
+
+def q01(t, sf):
+    li = t["lineitem"]
+    li = li[li.l_shipdate <= D("1998-09-02")]
+    li = li.assign(disc_price=_revenue(li))
+    li = li.assign(charge=li.disc_price * (1 + li.l_tax))
+    result = li.groupby(["l_returnflag", "l_linestatus"], as_index=False).agg(
+        l_quantity_sum=("l_quantity", "sum"),
+        l_extendedprice_sum=("l_extendedprice", "sum"),
+        disc_price_sum=("disc_price", "sum"),
+        charge_sum=("charge", "sum"),
+        l_quantity_mean=("l_quantity", "mean"),
+        l_extendedprice_mean=("l_extendedprice", "mean"),
+        l_discount_mean=("l_discount", "mean"),
+        l_quantity_count=("l_quantity", "size"),
+    )
+    return _sort(result, "l_returnflag", "l_linestatus")
+
+
+def q02(t, sf):
+    europe = _nations_in(t, "EUROPE")
+    suppliers = t["supplier"].merge(
+        europe, left_on="s_nationkey", right_on="n_nationkey"
+    )
+    partsupp = t["partsupp"].merge(
+        suppliers, left_on="ps_suppkey", right_on="s_suppkey"
+    )
+    parts = t["part"][(t["part"].p_size == 15) & t["part"].p_type.str.endswith("BRASS")]
+    result = parts.merge(partsupp, left_on="p_partkey", right_on="ps_partkey")
+    # The cheapest European supplier of each part
+    min_cost = partsupp.groupby("ps_partkey").ps_supplycost.min()
+    result = result[result.ps_supplycost == result.ps_partkey.map(min_cost)]
+    result = _sort(result, "-s_acctbal", "n_name", "s_name", "p_partkey", limit=100)
+    return result[
+        [
+            "s_acctbal",
+            "s_name",
+            "n_name",
+            "p_partkey",
+            "p_mfgr",
+            "s_address",
+            "s_phone",
+            "s_comment",
+        ]
+    ]
+
+
+def q03(t, sf):
+    customer = t["customer"][t["customer"].c_mktsegment == "BUILDING"]
+    orders = t["orders"][t["orders"].o_orderdate < D("1995-03-15")]
+    orders = orders.merge(customer, left_on="o_custkey", right_on="c_custkey")
+    lineitem = t["lineitem"][t["lineitem"].l_shipdate > D("1995-03-15")]
+    result = lineitem.merge(orders, left_on="l_orderkey", right_on="o_orderkey")
+    result = result.assign(revenue_sum=_revenue(result))
+    result = result.groupby(
+        ["l_orderkey", "o_orderdate", "o_shippriority"], as_index=False
+    ).revenue_sum.sum()
+    return _sort(result, "-revenue_sum", "o_orderdate", limit=10)
+
+
+def q04(t, sf):
+    orders = t["orders"]
+    orders = orders[
+        (orders.o_orderdate >= D("1993-07-01")) & (orders.o_orderdate < D("1993-10-01"))
+    ]
+    lineitem = t["lineitem"]
+    late = lineitem[lineitem.l_commitdate < lineitem.l_receiptdate]
+    orders = orders[orders.o_orderkey.isin(late.l_orderkey)]
+    result = orders.groupby("o_orderpriority", as_index=False).agg(
+        o_orderkey_count=("o_orderkey", "size")
+    )
+    return _sort(result, "o_orderpriority")
+
+
+def q05(t, sf):
+    customer = t["customer"].merge(
+        _nations_in(t, "ASIA"), left_on="c_nationkey", right_on="n_nationkey"
+    )
+    orders = t["orders"]
+    orders = orders[
+        (orders.o_orderdate >= D("1994-01-01")) & (orders.o_orderdate < D("1995-01-01"))
+    ]
+    orders = orders.merge(customer, left_on="o_custkey", right_on="c_custkey")
+    lineitem = t["lineitem"].merge(
+        t["supplier"], left_on="l_suppkey", right_on="s_suppkey"
+    )
+    # The customer and the supplier are in the same nation
+    result = lineitem.merge(
+        orders,
+        left_on=["l_orderkey", "s_nationkey"],
+        right_on=["o_orderkey", "c_nationkey"],
+    )
+    result = result.assign(revenue_sum=_revenue(result))
+    result = result.groupby("n_name", as_index=False).revenue_sum.sum()
+    return _sort(result, "-revenue_sum")
+
+
+def q06(t, sf):
+    li = t["lineitem"]
+    li = li[
+        (li.l_shipdate >= D("1994-01-01"))
+        & (li.l_shipdate < D("1995-01-01"))
+        & (li.l_discount >= 0.05)
+        & (li.l_discount <= 0.07)
+        & (li.l_quantity < 24)
+    ]
+    return pd.DataFrame({"revenue": [(li.l_extendedprice * li.l_discount).sum()]})
+
+
+def q07(t, sf):
+    nations = t["nation"][t["nation"].n_name.isin(["FRANCE", "GERMANY"])]
+    suppliers = t["supplier"].merge(
+        nations.rename(columns={"n_name": "supp_nation"}),
+        left_on="s_nationkey",
+        right_on="n_nationkey",
+    )
+    customers = t["customer"].merge(
+        nations.rename(columns={"n_name": "cust_nation"}),
+        left_on="c_nationkey",
+        right_on="n_nationkey",
+    )
+    lineitem = t["lineitem"]
+    lineitem = lineitem[
+        (lineitem.l_shipdate >= D("1995-01-01"))
+        & (lineitem.l_shipdate <= D("1996-12-31"))
+    ]
+    result = (
+        lineitem.merge(suppliers, left_on="l_suppkey", right_on="s_suppkey")
+        .merge(t["orders"], left_on="l_orderkey", right_on="o_orderkey")
+        .merge(customers, left_on="o_custkey", right_on="c_custkey")
+    )
+    result = result[result.supp_nation != result.cust_nation]
+    result = result.assign(
+        l_year=result.l_shipdate.dt.year, volume_sum=_revenue(result)
+    )
+    result = result.groupby(
+        ["supp_nation", "cust_nation", "l_year"], as_index=False
+    ).volume_sum.sum()
+    return _sort(result, "supp_nation", "cust_nation", "l_year")
+
+
+def q08(t, sf):
+    customers = t["customer"][
+        t["customer"].c_nationkey.isin(_nations_in(t, "AMERICA").n_nationkey)
+    ]
+    orders = t["orders"]
+    orders = orders[
+        (orders.o_orderdate >= D("1995-01-01"))
+        & (orders.o_orderdate <= D("1996-12-31"))
+        & orders.o_custkey.isin(customers.c_custkey)
+    ]
+    parts = t["part"][t["part"].p_type == "ECONOMY ANODIZED STEEL"]
+    lineitem = t["lineitem"][t["lineitem"].l_partkey.isin(parts.p_partkey)]
+    result = (
+        lineitem.merge(orders, left_on="l_orderkey", right_on="o_orderkey")
+        .merge(t["supplier"], left_on="l_suppkey", right_on="s_suppkey")
+        .merge(t["nation"], left_on="s_nationkey", right_on="n_nationkey")
+    )
+    volume = _revenue(result)
+    result = result.assign(
+        o_year=result.o_orderdate.dt.year,
+        volume=volume,
+        brazil_volume=volume.where(result.n_name == "BRAZIL", 0.0),
+    )
+    result = result.groupby("o_year", as_index=False)[["brazil_volume", "volume"]].sum()
+    result = result.assign(mkt_share=result.brazil_volume / result.volume)
+    return _sort(result[["o_year", "mkt_share"]], "o_year")
+
+
+def q09(t, sf):
+    parts = t["part"][t["part"].p_name.str.contains("green", regex=False)]
+    lineitem = t["lineitem"][t["lineitem"].l_partkey.isin(parts.p_partkey)]
+    result = (
+        lineitem.merge(
+            t["partsupp"],
+            left_on=["l_suppkey", "l_partkey"],
+            right_on=["ps_suppkey", "ps_partkey"],
+        )
+        .merge(t["supplier"], left_on="l_suppkey", right_on="s_suppkey")
+        .merge(t["nation"], left_on="s_nationkey", right_on="n_nationkey")
+        .merge(t["orders"], left_on="l_orderkey", right_on="o_orderkey")
+    )
+    result = result.assign(
+        o_year=result.o_orderdate.dt.year,
+        amount_sum=_revenue(result) - result.ps_supplycost * result.l_quantity,
+    )
+    result = result.groupby(["n_name", "o_year"], as_index=False).amount_sum.sum()
+    return _sort(result, "n_name", "-o_year")
+
+
+def q10(t, sf):
+    orders = t["orders"]
+    orders = orders[
+        (orders.o_orderdate >= D("1993-10-01")) & (orders.o_orderdate < D("1994-01-01"))
+    ]
+    lineitem = t["lineitem"][t["lineitem"].l_returnflag == "R"]
+    result = lineitem.merge(orders, left_on="l_orderkey", right_on="o_orderkey")
+    result = result.assign(revenue_sum=_revenue(result))
+    result = result.groupby("o_custkey", as_index=False).revenue_sum.sum()
+    result = result.merge(
+        t["customer"], left_on="o_custkey", right_on="c_custkey"
+    ).merge(t["nation"], left_on="c_nationkey", right_on="n_nationkey")
+    result = _sort(result, "-revenue_sum", limit=20)
+    return result[
+        [
+            "o_custkey",
+            "c_name",
+            "revenue_sum",
+            "c_acctbal",
+            "n_name",
+            "c_address",
+            "c_phone",
+            "c_comment",
+        ]
+    ]
+
+
+def q11(t, sf):
+    suppliers = t["supplier"][
+        t["supplier"].s_nationkey.isin(_nation_keys(t, "GERMANY"))
+    ]
+    partsupp = t["partsupp"][t["partsupp"].ps_suppkey.isin(suppliers.s_suppkey)]
+    partsupp = partsupp.assign(value_sum=partsupp.ps_supplycost * partsupp.ps_availqty)
+    threshold = partsupp.value_sum.sum() * 0.0001 / sf
+    result = partsupp.groupby("ps_partkey", as_index=False).value_sum.sum()
+    return _sort(result[result.value_sum > threshold], "-value_sum")
+
+
+def q12(t, sf):
+    li = t["lineitem"]
+    li = li[
+        li.l_shipmode.isin(["MAIL", "SHIP"])
+        & (li.l_commitdate < li.l_receiptdate)
+        & (li.l_shipdate < li.l_commitdate)
+        & (li.l_receiptdate >= D("1994-01-01"))
+        & (li.l_receiptdate < D("1995-01-01"))
+    ]
+    result = li.merge(t["orders"], left_on="l_orderkey", right_on="o_orderkey")
+    high = result.o_orderpriority.isin(["1-URGENT", "2-HIGH"])
+    result = result.assign(
+        high_line_sum=high.astype(int), low_line_sum=(~high).astype(int)
+    )
+    result = result.groupby("l_shipmode", as_index=False)[
+        ["high_line_sum", "low_line_sum"]
+    ].sum()
+    return _sort(result, "l_shipmode")
+
+
+def q13(t, sf):
+    orders = t["orders"]
+    orders = orders[~orders.o_comment.str.contains("special.*requests")]
+    c_count = t["customer"].c_custkey.map(orders.groupby("o_custkey").size()).fillna(0)
+    result = c_count.astype(int).value_counts()
+    result = pd.DataFrame(
+        {"o_orderkey_count": result.index, "c_custkey_count": result.values}
+    )
+    return _sort(result, "-c_custkey_count", "-o_orderkey_count")
+
+
+def q14(t, sf):
+    li = t["lineitem"]
+    li = li[(li.l_shipdate >= D("1995-09-01")) & (li.l_shipdate < D("1995-10-01"))]
+    result = li.merge(t["part"], left_on="l_partkey", right_on="p_partkey")
+    revenue = _revenue(result)
+    promo = revenue.where(result.p_type.str.startswith("PROMO"), 0.0)
+    return pd.DataFrame({"promo_revenue": [100.0 * promo.sum() / revenue.sum()]})
+
+
+def q15(t, sf):
+    li = t["lineitem"]
+    li = li[(li.l_shipdate >= D("1996-01-01")) & (li.l_shipdate < D("1996-04-01"))]
+    li = li.assign(revenue_sum=_revenue(li))
+    revenue = li.groupby("l_suppkey", as_index=False).revenue_sum.sum()
+    top = revenue[revenue.revenue_sum == revenue.revenue_sum.max()]
+    result = t["supplier"].merge(top, left_on="s_suppkey", right_on="l_suppkey")
+    result = result[["s_suppkey", "s_name", "s_address", "s_phone", "revenue_sum"]]
+    return _sort(result, "s_suppkey")
+
+
+def q16(t, sf):
+    part = t["part"]
+    parts = part[
+        (part.p_brand != "Brand#45")
+        & ~part.p_type.str.startswith("MEDIUM POLISHED")
+        & part.p_size.isin([49, 14, 23, 45, 19, 3, 36, 9])
+    ]
+    supplier = t["supplier"]
+    complaints = supplier[supplier.s_comment.str.contains("Customer.*Complaints")]
+    partsupp = t["partsupp"][~t["partsupp"].ps_suppkey.isin(complaints.s_suppkey)]
+    result = partsupp.merge(parts, left_on="ps_partkey", right_on="p_partkey")
+    result = result.groupby(["p_brand", "p_type", "p_size"], as_index=False).agg(
+        ps_suppkey_count_distinct=("ps_suppkey", "nunique")
+    )
+    return _sort(result, "-ps_suppkey_count_distinct", "p_brand", "p_type", "p_size")
+
+
+def q17(t, sf):
+    part = t["part"]
+    parts = part[(part.p_brand == "Brand#23") & (part.p_container == "MED BOX")]
+    li = t["lineitem"][t["lineitem"].l_partkey.isin(parts.p_partkey)]
+    average = li.groupby("l_partkey").l_quantity.mean()
+    li = li[li.l_quantity < 0.2 * li.l_partkey.map(average)]
+    return pd.DataFrame({"avg_yearly": [li.l_extendedprice.sum() / 7.0]})
+
+
+def q18(t, sf):
+    quantities = (
+        t["lineitem"]
+        .groupby("l_orderkey", as_index=False)
+        .agg(l_quantity_sum=("l_quantity", "sum"))
+    )
+    large = quantities[quantities.l_quantity_sum > 300]
+    result = (
+        t["orders"]
+        .merge(large, left_on="o_orderkey", right_on="l_orderkey")
+        .merge(t["customer"], left_on="o_custkey", right_on="c_custkey")
+    )
+    result = _sort(result, "-o_totalprice", "o_orderdate", limit=100)
+    return result[
+        [
+            "c_name",
+            "o_custkey",
+            "o_orderkey",
+            "o_orderdate",
+            "o_totalprice",
+            "l_quantity_sum",
+        ]
+    ]
+
+
+def q19(t, sf):
+    li = t["lineitem"]
+    li = li[
+        li.l_shipmode.isin(["AIR", "AIR REG"])
+        & (li.l_shipinstruct == "DELIVER IN PERSON")
+    ]
+    result = li.merge(t["part"], left_on="l_partkey", right_on="p_partkey")
+
+    def condition(brand, containers, quantity, size):
+        return (
+            (result.p_brand == brand)
+            & result.p_container.isin(containers)
+            & result.l_quantity.between(quantity, quantity + 10)
+            & result.p_size.between(1, size)
+        )
+
+    result = result[
+        condition("Brand#12", ["SM CASE", "SM BOX", "SM PACK", "SM PKG"], 1, 5)
+        | condition("Brand#23", ["MED BAG", "MED BOX", "MED PKG", "MED PACK"], 10, 10)
+        | condition("Brand#34", ["LG CASE", "LG BOX", "LG PACK", "LG PKG"], 20, 15)
+    ]
+    return pd.DataFrame({"revenue": [_revenue(result).sum()]})
+
+
+def q20(t, sf):
+    parts = t["part"][t["part"].p_name.str.startswith("forest")]
+    li = t["lineitem"]
+    li = li[(li.l_shipdate >= D("1994-01-01")) & (li.l_shipdate < D("1995-01-01"))]
+    shipped = li.groupby(["l_partkey", "l_suppkey"], as_index=False).l_quantity.sum()
+    partsupp = t["partsupp"][t["partsupp"].ps_partkey.isin(parts.p_partkey)]
+    partsupp = partsupp.merge(
+        shipped,
+        left_on=["ps_partkey", "ps_suppkey"],
+        right_on=["l_partkey", "l_suppkey"],
+    )
+    partsupp = partsupp[partsupp.ps_availqty > 0.5 * partsupp.l_quantity]
+    supplier = t["supplier"]
+    result = supplier[
+        supplier.s_nationkey.isin(_nation_keys(t, "CANADA"))
+        & supplier.s_suppkey.isin(partsupp.ps_suppkey)
+    ]
+    return _sort(result[["s_name", "s_address"]], "s_name")
+
+
+def q21(t, sf):
+    li = t["lineitem"]
+    late = li[li.l_receiptdate > li.l_commitdate]
+    # exists another supplier of the order...
+    suppliers = li.groupby("l_orderkey").l_suppkey.nunique()
+    # ...and not exists another supplier of the order that was late
+    late_suppliers = late.groupby("l_orderkey").l_suppkey.nunique()
+    orders = t["orders"][t["orders"].o_orderstatus == "F"]
+    late = late[
+        late.l_orderkey.isin(orders.o_orderkey)
+        & (late.l_orderkey.map(suppliers) > 1)
+        & (late.l_orderkey.map(late_suppliers) == 1)
+    ]
+    supplier = t["supplier"]
+    supplier = supplier[supplier.s_nationkey.isin(_nation_keys(t, "SAUDI ARABIA"))]
+    result = late.merge(supplier, left_on="l_suppkey", right_on="s_suppkey")
+    result = result.groupby("s_name", as_index=False).agg(
+        l_orderkey_count=("l_orderkey", "size")
+    )
+    return _sort(result, "-l_orderkey_count", "s_name", limit=100)
+
+
+def q22(t, sf):
+    customer = t["customer"]
+    customer = customer.assign(cntrycode=customer.c_phone.str[:2])
+    customer = customer[
+        customer.cntrycode.isin(["13", "31", "23", "29", "30", "18", "17"])
+    ]
+    average = customer[customer.c_acctbal > 0.0].c_acctbal.mean()
+    customer = customer[
+        (customer.c_acctbal > average) & ~customer.c_custkey.isin(t["orders"].o_custkey)
+    ]
+    result = customer.groupby("cntrycode", as_index=False).agg(
+        c_custkey_count=("c_custkey", "size"), c_acctbal_sum=("c_acctbal", "sum")
+    )
+    return _sort(result, "cntrycode")
+
+
+QUERIES = {i: globals()[f"q{i:02d}"] for i in range(1, 23)}
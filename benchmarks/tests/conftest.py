@@ -1,4 +1,5 @@
 import os
+import subprocess
 
 import pytest
 
@@ -32,3 +33,32 @@ def pytest_collection_modifyitems(config, items):
     for item in items:
         if "slow" in item.keywords:
             item.add_marker(skip_slow)
+
+
+class GitRepo:
+    """A git repository standing in for Arrow's."""
+
+    def __init__(self, path):
+        self.path = path
+        path.mkdir()
+        self.git("init", "-q")
+
+    def git(self, *args):
+        command = ["git", "-C", str(self.path), "-c", "user.name=x"]
+        command += ["-c", "user.email=x@x", *args]
+        return subprocess.run(command, check=True, capture_output=True, text=True)
+
+    def commit(self, files):
+        """Commit {path: content}, returning the commit's hash."""
+        for path, content in files.items():
+            file = self.path / path
+            file.parent.mkdir(parents=True, exist_ok=True)
+            file.write_text(content)
+        self.git("add", "-A")
+        self.git("commit", "-q", "-m", "commit")
+        return self.git("rev-parse", "HEAD").stdout.strip()
+
+
+@pytest.fixture
+def arrow_repo(tmp_path):
+    return GitRepo(tmp_path / "arrow")
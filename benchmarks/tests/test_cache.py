@@ -0,0 +1,137 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from .. import _cache
+
+
+def writer(content):
+    def write(path):
+        with open(path, "wb") as f:
+            f.write(content)
+
+    return write
+
+
+def test_key():
+    a = _cache.key(file_type="parquet", compression="snappy", pyarrow="12.0.0")
+    b = _cache.key(compression="snappy", pyarrow="12.0.0", file_type="parquet")
+    c = _cache.key(file_type="parquet", compression="snappy", pyarrow="13.0.0")
+    assert a == b
+    assert a != c
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(None, None), ("", None), ("1000", 1000), ("2K", 2048), ("1.5G", 1610612736)],
+)
+def test_parse_bytes(value, expected):
+    assert _cache.parse_bytes(value) == expected
+
+
+def test_get_or_create(tmp_path):
+    cache = _cache.DerivedCache(tmp_path)
+    key = _cache.key(name="a")
+
+    path = cache.get_or_create(key, "a.parquet", writer(b"aaaa"))
+    assert path == tmp_path / key / "a.parquet"
+    assert path.read_bytes() == b"aaaa"
+    assert os.listdir(path.parent) == ["a.parquet"]
+
+    again = cache.get_or_create(key, "a.parquet", writer(b"bbbb"))
+    assert again == path
+    assert again.read_bytes() == b"aaaa"
+
+    summary = cache.summary()
+    assert summary["hits"] == 1
+    assert summary["misses"] == 1
+    assert summary["entries"] == 1
+    assert summary["bytes"] == 4
+
+
+def test_hits_dont_resize_entries(tmp_path, monkeypatch):
+    cache = _cache.DerivedCache(tmp_path)
+    key = _cache.key(name="a")
+    sized = []
+    size = _cache._size
+    monkeypatch.setattr(_cache, "_size", lambda path: sized.append(path) or size(path))
+
+    path = cache.get_or_create(key, "a", writer(b"aaaa"))
+    for _ in range(3):
+        assert cache.lookup(key, "a") == path
+    assert sized == [path]
+    assert cache.summary()["bytes"] == 4
+
+
+def test_failed_write_leaves_nothing_behind(tmp_path):
+    cache = _cache.DerivedCache(tmp_path)
+    key = _cache.key(name="a")
+
+    def write(path):
+        with open(path, "wb") as f:
+            f.write(b"aa")
+        raise RuntimeError("writer failed")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_create(key, "a.parquet", write)
+    assert os.listdir(tmp_path / key) == []
+    assert cache.lookup(key, "a.parquet") is None
+
+
+def test_lru_eviction(tmp_path):
+    cache = _cache.DerivedCache(tmp_path, budget=10)
+    keys = [_cache.key(name=name) for name in "abc"]
+
+    cache.get_or_create(keys[0], "a", writer(b"a" * 4))
+    cache.get_or_create(keys[1], "b", writer(b"b" * 4))
+    # touch "a" so that "b" is now the least recently used entry
+    assert cache.lookup(keys[0], "a") is not None
+    cache.get_or_create(keys[2], "c", writer(b"c" * 4))
+
+    assert (tmp_path / keys[0] / "a").exists()
+    assert not (tmp_path / keys[1]).exists()
+    assert (tmp_path / keys[2] / "c").exists()
+    assert cache.summary()["bytes"] == 8
+
+
+def _create_slowly(root, key, calls):
+    def write(path):
+        with open(calls, "a") as f:
+            f.write("x")
+        time.sleep(0.5)
+        with open(path, "wb") as f:
+            f.write(b"aaaa")
+
+    path = _cache.DerivedCache(root).get_or_create(key, "a", write)
+    assert path.read_bytes() == b"aaaa"
+
+
+def test_concurrent_processes_create_once(tmp_path):
+    key = _cache.key(name="a")
+    calls = tmp_path / "calls"
+    ctx = multiprocessing.get_context("spawn")
+    processes = [
+        ctx.Process(target=_create_slowly, args=(tmp_path / "cache", key, calls))
+        for _ in range(3)
+    ]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+
+    assert [p.exitcode for p in processes] == [0, 0, 0]
+    assert calls.read_text() == "x"
+    summary = _cache.DerivedCache(tmp_path / "cache").summary()
+    assert (summary["hits"], summary["misses"]) == (2, 1)
+
+
+def test_lock_is_reentrant(tmp_path):
+    cache = _cache.DerivedCache(tmp_path)
+    key = _cache.key(name="a")
+    with cache.lock(key):
+        with cache.lock(key, blocking=False) as acquired:
+            assert acquired
+        path = cache.get_or_create(key, "a", writer(b"aaaa"))
+    assert path.read_bytes() == b"aaaa"
@@ -0,0 +1,70 @@
+import time
+
+import pyarrow
+import pyarrow.dataset
+import pyarrow.fs
+import pyarrow.parquet as parquet
+import pytest
+
+from .. import _cloud
+
+TABLE = pyarrow.table({"x": range(1000), "y": [str(i) for i in range(1000)]})
+
+
+@pytest.fixture
+def mirror(tmp_path, monkeypatch):
+    for month in ["01", "02"]:
+        path = tmp_path / "bucket" / "2009" / month
+        path.mkdir(parents=True)
+        parquet.write_table(TABLE, path / "data.parquet")
+    monkeypatch.setattr(_cloud, "mode", "local")
+    monkeypatch.setattr(_cloud, "mirror_dir", str(tmp_path))
+    return tmp_path
+
+
+def test_remote_by_default():
+    assert _cloud.is_remote()
+    assert _cloud.tags() == {}
+    assert _cloud.resolve("s3://ursa-qa/wide-partition") == (
+        None,
+        "s3://ursa-qa/wide-partition",
+    )
+
+
+def test_local(mirror):
+    paths = ["bucket/2009/01/data.parquet", "bucket/2009/02/data.parquet"]
+    filesystem = _cloud.filesystem(paths=paths)
+    dataset = pyarrow.dataset.dataset(paths, format="parquet", filesystem=filesystem)
+    assert dataset.to_table().num_rows == 2000
+    assert _cloud.tags() == {"cloud": "local"}
+
+
+def test_resolve(mirror):
+    filesystem, path = _cloud.resolve("s3://bucket/2009")
+    assert path == "bucket/2009"
+    dataset = pyarrow.dataset.dataset(path, format="parquet", filesystem=filesystem)
+    assert len(dataset.files) == 2
+
+
+def test_throttled(mirror, monkeypatch):
+    monkeypatch.setattr(_cloud, "latency", 0.05)
+    monkeypatch.setattr(_cloud, "bandwidth", 1024**3)
+    assert _cloud.tags() == {
+        "cloud": "local",
+        "cloud_latency": 0.05,
+        "cloud_bandwidth": 1024**3,
+    }
+    filesystem = _cloud.filesystem()
+    assert isinstance(filesystem, pyarrow.fs.PyFileSystem)
+
+    start = time.monotonic()
+    table = parquet.read_table("bucket/2009/01/data.parquet", filesystem=filesystem)
+    assert time.monotonic() - start >= 0.1  # at least an open and a read
+    assert table.equals(TABLE)
+
+
+def test_throttled_bandwidth():
+    handler = _cloud.ThrottledHandler(pyarrow.fs.LocalFileSystem(), 0, 1000)
+    start = time.monotonic()
+    handler.wait(100)
+    assert time.monotonic() - start >= 0.1
@@ -1,8 +1,11 @@
 import copy
+import os
+import re
+import shutil
 
 import pytest
 
-from .. import cpp_micro_benchmarks
+from .. import _incremental, _parallel, cpp_micro_benchmarks
 from ..tests import _asserts
 
 HELP = """
@@ -30,6 +33,9 @@ Options:
   --rev-or-path TEXT           Git rev or path to already-built arrow. Default
                                is ${ARROW_BUILD_DIR}/cpp unless that env var
                                is undefined (then build from scratch instead).
+  --baseline TEXT              Commit whose results to reuse for suites whose
+                               binaries haven't changed since (see
+                               _incremental.py).
   --show-result BOOLEAN        [default: true]
   --show-output BOOLEAN        [default: false]
   --run-id TEXT                Group executions together with a run id.
@@ -41,6 +47,83 @@ Options:
 """
 
 
+SUITES = [
+    "arrow-array-benchmark",
+    "arrow-compute-scalar-benchmark",
+    "arrow-io-file-benchmark",
+]
+
+
+class FakeResult:
+    def __init__(self, suite):
+        self.suite = suite
+        self.optional_benchmark_info = None
+
+    def to_publishable_dict(self):
+        return {
+            "tags": {"suite": self.suite},
+            "optional_benchmark_info": self.optional_benchmark_info,
+        }
+
+
+class FakeAdapter:
+    """Stands in for ArcheryAdapter, recording the suites each run would run
+    (those the suite filter matches) and on which cores."""
+
+    def __init__(self, runs, cores=None):
+        self.runs, self.cores = runs, cores
+        self.result_fields_override = {}
+        self.results = []
+
+    def run(self, params):
+        pattern = ""
+        if "--suite-filter" in params:
+            pattern = params[params.index("--suite-filter") + 1]
+        suites = [suite for suite in SUITES if re.search(pattern, suite)]
+        self.runs.append((self.cores, suites))
+        self.results = [FakeResult(suite) for suite in suites]
+        return self.results
+
+
+@pytest.fixture
+def build_dir(tmp_path):
+    """An arrow build with a benchmark binary per suite."""
+    release = tmp_path / "cpp" / "release"
+    release.mkdir(parents=True)
+    for i, suite in enumerate(SUITES):
+        shutil.copy(shutil.which("true"), release / suite)
+        with open(release / suite, "ab") as f:
+            f.write(bytes([i]))
+    return str(tmp_path / "cpp")
+
+
+@pytest.fixture
+def make_benchmark(monkeypatch, tmp_path):
+    """Make a cpp-micro for an arrow commit, with a FakeAdapter."""
+    # Set by RecordCppMicroBenchmarks(), restored after the test
+    monkeypatch.setenv("CONBENCH_PROJECT_REPOSITORY", "")
+    monkeypatch.setenv("CONBENCH_PROJECT_COMMIT", "")
+    monkeypatch.setattr(_parallel, "cores", "")
+    store = _incremental.Store("cpp", root=str(tmp_path / "results"))
+
+    def make(commit):
+        github_info = {
+            "repository": "https://github.com/apache/arrow",
+            "pr_number": None,
+            "commit": commit,
+        }
+        monkeypatch.setattr(
+            cpp_micro_benchmarks.RecordCppMicroBenchmarks, "github_info", github_info
+        )
+        benchmark = cpp_micro_benchmarks.RecordCppMicroBenchmarks()
+        benchmark.store, benchmark.runs = store, []
+        benchmark._get_adapter = lambda cores=None: FakeAdapter(benchmark.runs, cores)
+        benchmark.adapter = benchmark._get_adapter()
+        return benchmark
+
+    return make
+
+
 def test_get_run_command():
     options = {
         "repetitions": 100,
@@ -86,6 +169,54 @@ def test_cpp_micro():
     assert_benchmark(result)
 
 
+def _reused_from(result):
+    return (result["optional_benchmark_info"] or {}).get("reused_from")
+
+
+def test_cpp_micro_reuses_unchanged_suites(make_benchmark, build_dir):
+    old = make_benchmark("old")
+    assert len(list(old.run(rev_or_path=build_dir))) == len(SUITES)
+    assert old.runs == [(None, SUITES)]
+
+    with open(os.path.join(build_dir, "release", SUITES[0]), "ab") as f:
+        f.write(b"changed")
+    new = make_benchmark("new")
+    results = [result for result, _ in new.run(rev_or_path=build_dir, baseline="old")]
+
+    # Only the changed suite runs, the others' results are the baseline's
+    assert new.runs == [(None, SUITES[:1])]
+    reused_from = {result["tags"]["suite"]: _reused_from(result) for result in results}
+    assert reused_from == {SUITES[0]: None, SUITES[1]: "old", SUITES[2]: "old"}
+    # ...and all of them are stored for the new commit to be a baseline
+    assert new.store.suites("new") == SUITES
+
+
+def test_cpp_micro_runs_suites_in_parallel(make_benchmark, build_dir, monkeypatch):
+    monkeypatch.setattr(_parallel, "cores", "0:1")
+    benchmark = make_benchmark("new")
+    results = [result for result, _ in benchmark.run(rev_or_path=build_dir)]
+
+    # The multi-threaded suite alone on all cores, then the others on one
+    # core each, at the same time
+    exclusive, *shared = benchmark.runs
+    assert exclusive == (None, ["arrow-io-file-benchmark"])
+    assert sorted(suites for _, suites in shared) == [
+        ["arrow-array-benchmark"],
+        ["arrow-compute-scalar-benchmark"],
+    ]
+    assert sorted(cores for cores, _ in shared) == [[0], [1]]
+
+    cores = {suites[0]: cores for cores, suites in shared}
+    cores["arrow-io-file-benchmark"] = sorted(os.sched_getaffinity(0))
+    for result in results:
+        suite = result["tags"]["suite"]
+        assert result["optional_benchmark_info"]["isolation"] == {
+            "cores": cores[suite],
+            "exclusive": suite == "arrow-io-file-benchmark",
+        }
+    assert benchmark.store.suites("new") == SUITES
+
+
 def test_cpp_micro_cli():
     command = ["conbench", "cpp-micro", "--help"]
     _asserts.assert_cli(command, HELP)
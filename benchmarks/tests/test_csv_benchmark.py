@@ -68,6 +68,9 @@ Options:
   --all BOOLEAN                   [default: false]
   --language [Python|R]
   --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
+  --profile BOOLEAN
   --iterations INTEGER            [default: 1]
   --drop-caches BOOLEAN           [default: false]
   --gc-collect BOOLEAN            [default: true]
@@ -132,6 +135,9 @@ Options:
   --all BOOLEAN                   [default: false]
   --language [Python|R]
   --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
+  --profile BOOLEAN
   --iterations INTEGER            [default: 1]
   --drop-caches BOOLEAN           [default: false]
   --gc-collect BOOLEAN            [default: true]
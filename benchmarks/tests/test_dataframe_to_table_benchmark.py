@@ -11,6 +11,9 @@ Usage: conbench dataframe-to-table [OPTIONS] SOURCE
 Options:
   --language [Python|R]
   --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
+  --profile BOOLEAN
   --iterations INTEGER   [default: 1]
   --drop-caches BOOLEAN  [default: false]
   --gc-collect BOOLEAN   [default: true]
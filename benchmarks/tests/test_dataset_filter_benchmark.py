@@ -8,6 +8,9 @@ Usage: conbench dataset-filter [OPTIONS] SOURCE
 
 Options:
   --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
+  --profile BOOLEAN
   --iterations INTEGER   [default: 1]
   --drop-caches BOOLEAN  [default: false]
   --gc-collect BOOLEAN   [default: true]
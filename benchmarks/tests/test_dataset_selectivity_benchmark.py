@@ -24,6 +24,9 @@ Options:
   --selectivity [1%|10%|100%]
   --all BOOLEAN                [default: false]
   --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
+  --profile BOOLEAN
   --iterations INTEGER         [default: 1]
   --drop-caches BOOLEAN        [default: false]
   --gc-collect BOOLEAN         [default: true]
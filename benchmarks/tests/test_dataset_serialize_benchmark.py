@@ -39,6 +39,9 @@ Options:
   --format [arrow|csv|feather|parquet]
   --all BOOLEAN                   [default: false]
   --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
+  --profile BOOLEAN
   --iterations INTEGER            [default: 1]
   --drop-caches BOOLEAN           [default: false]
   --gc-collect BOOLEAN            [default: true]
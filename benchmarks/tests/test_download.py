@@ -0,0 +1,123 @@
+import http.server
+import threading
+
+import pytest
+
+from .. import _download
+
+PAYLOAD = bytes(range(256)) * 4096  # 1 MiB
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    """Serves PAYLOAD at every path, honouring single "bytes=N-" ranges.
+
+    `server.truncate` makes the next N responses stop halfway through the
+    body, and `server.ignore_range` makes the server always send everything.
+    """
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get("Range")))
+        start = 0
+        range_ = self.headers.get("Range")
+        if range_ and not self.server.ignore_range:
+            start = int(range_.split("=")[1].rstrip("-"))
+            if start >= len(PAYLOAD):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(PAYLOAD)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}"
+            )
+        else:
+            self.send_response(200)
+
+        body = PAYLOAD[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.server.truncate:
+            self.server.truncate -= 1
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.requests, httpd.truncate, httpd.ignore_range = [], 0, False
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def url(server, name="data.bin"):
+    return f"http://127.0.0.1:{server.server_port}/{name}"
+
+
+def test_download(server, tmp_path):
+    path = tmp_path / "nested" / "data.bin"
+    _download.download(url(server), path)
+    assert path.read_bytes() == PAYLOAD
+    assert not (tmp_path / "nested" / "data.bin.part").exists()
+
+
+def test_download_resumes_partial_file(server, tmp_path):
+    path = tmp_path / "data.bin"
+    (tmp_path / "data.bin.part").write_bytes(PAYLOAD[:1000])
+    _download.download(url(server), path)
+    assert path.read_bytes() == PAYLOAD
+    assert server.requests == [("/data.bin", "bytes=1000-")]
+
+
+def test_download_retries_truncated_response(server, tmp_path):
+    server.truncate = 1
+    path = tmp_path / "data.bin"
+    _download.download(url(server), path, backoff=0)
+    assert path.read_bytes() == PAYLOAD
+    assert len(server.requests) == 2
+    assert server.requests[0][1] is None
+    assert server.requests[1][1] == f"bytes={len(PAYLOAD) // 2}-"
+
+
+def test_download_gives_up(server, tmp_path):
+    server.truncate = 10
+    path = tmp_path / "data.bin"
+    with pytest.raises(Exception):
+        _download.download(url(server), path, retries=2, backoff=0)
+    assert not path.exists()
+
+
+def test_download_server_ignores_range(server, tmp_path):
+    server.ignore_range = True
+    path = tmp_path / "data.bin"
+    (tmp_path / "data.bin.part").write_bytes(b"garbage")
+    _download.download(url(server), path)
+    assert path.read_bytes() == PAYLOAD
+
+
+def test_download_complete_partial_file(server, tmp_path):
+    path = tmp_path / "data.bin"
+    (tmp_path / "data.bin.part").write_bytes(PAYLOAD)
+    _download.download(url(server), path)
+    assert path.read_bytes() == PAYLOAD
+
+
+def test_download_many(server, tmp_path):
+    jobs = [
+        (url(server, f"{i}.bin"), tmp_path / f"{i:02}" / "data.bin") for i in range(20)
+    ]
+    paths = _download.download_many(jobs, max_workers=4)
+    assert paths == [path for _, path in jobs]
+    for path in paths:
+        assert path.read_bytes() == PAYLOAD
+    assert len(server.requests) == 20
@@ -12,6 +12,9 @@ Usage: conbench example-simple [OPTIONS]
 
 Options:
   --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
+  --profile BOOLEAN
   --iterations INTEGER   [default: 1]
   --drop-caches BOOLEAN  [default: false]
   --gc-collect BOOLEAN   [default: true]
@@ -33,6 +36,9 @@ Usage: conbench example-external [OPTIONS]
 
 Options:
   --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
+  --profile BOOLEAN
   --show-result BOOLEAN  [default: true]
   --show-output BOOLEAN  [default: false]
   --run-id TEXT          Group executions together with a run id.
@@ -52,6 +58,8 @@ Options:
   --iterations INTEGER   [default: 1]
   --drop-caches BOOLEAN  [default: false]
   --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
   --show-result BOOLEAN  [default: true]
   --show-output BOOLEAN  [default: false]
   --run-id TEXT          Group executions together with a run id.
@@ -83,6 +91,9 @@ Options:
   --columns [10|2]
   --all BOOLEAN          [default: false]
   --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
+  --profile BOOLEAN
   --iterations INTEGER   [default: 1]
   --drop-caches BOOLEAN  [default: false]
   --gc-collect BOOLEAN   [default: true]
@@ -32,6 +32,9 @@ Options:
   --all BOOLEAN                   [default: false]
   --language [Python|R]
   --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
+  --profile BOOLEAN
   --iterations INTEGER            [default: 1]
   --drop-caches BOOLEAN           [default: false]
   --gc-collect BOOLEAN            [default: true]
@@ -73,6 +76,9 @@ Options:
   --all BOOLEAN                   [default: false]
   --language [Python|R]
   --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
+  --profile BOOLEAN
   --iterations INTEGER            [default: 1]
   --drop-caches BOOLEAN           [default: false]
   --gc-collect BOOLEAN            [default: true]
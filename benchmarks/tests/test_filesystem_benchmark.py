@@ -23,6 +23,9 @@ Options:
   --dataset-uri [s3://ursa-qa/flat-partition|s3://ursa-qa/wide-partition]
   --all BOOLEAN                   [default: false]
   --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
+  --profile BOOLEAN
   --iterations INTEGER            [default: 1]
   --drop-caches BOOLEAN           [default: false]
   --gc-collect BOOLEAN            [default: true]
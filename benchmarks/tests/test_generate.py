@@ -0,0 +1,73 @@
+import pyarrow
+import pyarrow.parquet as parquet
+import pytest
+
+from .. import _generate, _sources
+
+SCHEMA = pyarrow.schema(
+    [
+        pyarrow.field("i", pyarrow.int8()),
+        pyarrow.field("f", pyarrow.float32()),
+        pyarrow.field("s", pyarrow.string()),
+        pyarrow.field("d", pyarrow.dictionary(pyarrow.int32(), pyarrow.string())),
+        pyarrow.field("t", pyarrow.timestamp("ns")),
+    ]
+)
+
+
+def generate(**generator):
+    return _generate.reader(SCHEMA, {"rows": 1000, **generator}).read_all()
+
+
+def test_deterministic():
+    assert generate(seed=1).equals(generate(seed=1))
+    assert not generate(seed=1).equals(generate(seed=2))
+
+
+def test_batches():
+    batches = list(_generate.batches(SCHEMA, {"rows": 1000, "batch_size": 300}))
+    assert [b.num_rows for b in batches] == [300, 300, 300, 100]
+    assert all(b.schema == SCHEMA for b in batches)
+
+
+def test_null_fraction():
+    table = generate(null_fraction=0.25, columns={"i": {"null_fraction": 0}})
+    assert table["i"].null_count == 0
+    for name in ["f", "s", "d", "t"]:
+        assert 150 < table[name].null_count < 350
+
+
+def test_strings():
+    table = generate(
+        string_length=5,
+        columns={"d": {"cardinality": 7}, "s": {"values": ["a", "b"]}},
+    )
+    assert {len(s) for s in table["d"].to_pylist()} == {5}
+    assert len(table["d"].unique()) == 7
+    assert set(table["s"].to_pylist()) == {"a", "b"}
+
+
+def test_unsupported_type():
+    schema = pyarrow.schema([pyarrow.field("l", pyarrow.list_(pyarrow.int8()))])
+    with pytest.raises(ValueError):
+        _generate.reader(schema, {"rows": 10}).read_all()
+
+
+def test_generated_source():
+    source = _sources.Source("generated_sample")
+    assert source.table.num_rows == 10_000
+    assert source.table.schema == source.schema
+
+    path = source.create_if_not_exists("parquet", "lz4")
+    assert parquet.read_table(path, schema=source.schema).equals(source.table)
+
+
+@pytest.mark.parametrize(
+    "name", [name for name, store in _sources.STORE.items() if "generator" in store]
+)
+def test_generated_sources_as_snappy_parquet(name):
+    source = _sources.Source(name)
+    # The same data, but only the first rows of the larger sources
+    source.store = {**source.store, "generator": {**source.generator, "rows": 2000}}
+    path = source.create_if_not_exists("parquet", "snappy")
+    assert parquet.read_table(path, schema=source.schema).equals(source.table)
@@ -0,0 +1,130 @@
+import re
+import shutil
+import subprocess
+
+from .. import _incremental
+
+
+def test_binary_fingerprint(tmp_path):
+    binary = tmp_path / "arrow-compute-benchmark"
+    shutil.copy(shutil.which("true"), binary)
+    fingerprint = _incremental.binary_fingerprint(str(binary), {"repetitions": 6})
+    assert _incremental.binary_fingerprint(str(binary), {"repetitions": 6}) == (
+        fingerprint
+    )
+    assert _incremental.binary_fingerprint(str(binary), {"repetitions": 1}) != (
+        fingerprint
+    )
+    binary.write_bytes(binary.read_bytes() + b"\0")
+    assert _incremental.binary_fingerprint(str(binary), {"repetitions": 6}) != (
+        fingerprint
+    )
+
+
+def test_linked_libraries():
+    libraries = _incremental.linked_libraries(shutil.which("python3"))
+    assert any("libc.so" in library for library in libraries)
+    assert _incremental.linked_libraries("/does/not/exist") == []
+
+
+def test_suite_filter():
+    pattern = _incremental.suite_filter(["arrow-io-benchmark", "arrow-benchmark"])
+    assert re.search(pattern, "arrow-io-benchmark")
+    assert re.search(pattern, "arrow-benchmark")
+    assert not re.search(pattern, "arrow-io-benchmark-2")
+
+
+def test_store_and_mark_reused(tmp_path):
+    store = _incremental.Store("cpp", root=str(tmp_path))
+    result = {"run_id": "old", "tags": {"suite": "s"}, "optional_benchmark_info": None}
+    assert store.load("abc", "s") is None
+    store.save("abc", "s", [result], fingerprint="f")
+    assert store.load("abc", "s") == {
+        "fingerprint": "f",
+        "reused_from": None,
+        "results": [result],
+    }
+
+    reused = _incremental.mark_reused(result, "abc", run_id="new")
+    assert reused["run_id"] == "new"
+    assert reused["optional_benchmark_info"] == {"reused": True, "reused_from": "abc"}
+    assert result["run_id"] == "old"
+
+
+def test_java_affected():
+    unrelated = ["cpp/src/arrow/array.cc", "java/README.md"]
+    assert _incremental.java_affected(unrelated) == set()
+    assert _incremental.java_affected(
+        [
+            "java/performance/src/main/java/org/apache/arrow/vector/IntBenchmarks.java",
+            "java/algorithm/src/main/java/org/apache/arrow/algorithm/sort/Sorter.java",
+            "java/vector/src/test/java/org/apache/arrow/vector/TestIntVector.java",
+        ]
+    ) == {"arrow.vector.IntBenchmarks", "arrow.algorithm"}
+    vector = "java/vector/src/main/java/org/apache/arrow/vector/IntVector.java"
+    assert _incremental.java_affected([vector]) is None
+    assert _incremental.java_affected(["java/pom.xml"]) is None
+    assert _incremental.java_affected(["format/Schema.fbs"]) is None
+
+
+def test_js_affected():
+    assert _incremental.js_affected(["java/pom.xml", "js/test/unit/table.ts"]) == set()
+    assert _incremental.js_affected(["js/src/table.ts"]) is None
+
+
+def test_is_affected():
+    affected = {"arrow.algorithm", "arrow.vector.IntBenchmarks"}
+    assert _incremental.is_affected("arrow.algorithm.sort.SortBenchmarks", affected)
+    assert _incremental.is_affected("arrow.vector.IntBenchmarks", affected)
+    assert not _incremental.is_affected("arrow.vector.IntBenchmarksX", affected)
+    assert _incremental.is_affected("anything", None)
+
+
+def test_changed_files(tmp_path):
+    def git(*args):
+        return subprocess.run(
+            ["git", "-C", str(tmp_path), "-c", "user.name=x", "-c", "user.email=x@x"]
+            + list(args),
+            check=True,
+            capture_output=True,
+        )
+
+    git("init", "-q")
+    (tmp_path / "a.txt").write_text("a")
+    git("add", "a.txt")
+    git("commit", "-q", "-m", "a")
+    baseline = _incremental.git_revision(str(tmp_path), "HEAD")
+    (tmp_path / "b.txt").write_text("b")
+    git("add", "b.txt")
+    git("commit", "-q", "-m", "b")
+    commit = _incremental.git_revision(str(tmp_path), "HEAD")
+
+    assert len(commit) == 40 and commit != baseline
+    assert _incremental.changed_files(str(tmp_path), baseline, commit) == ["b.txt"]
+    assert _incremental.changed_files(str(tmp_path), "nope", commit) is None
+    assert _incremental.git_revision(str(tmp_path), "nope") is None
+
+
+def test_store_reusable(tmp_path):
+    store = _incremental.Store("java", root=str(tmp_path))
+    store.save("old", "arrow.vector.IntBenchmarks", [{"name": "a"}])
+    store.save("old", "arrow.memory.ArrowBufBenchmarks", [{"name": "b"}])
+
+    reused = store.reusable("old", "new", {"arrow.vector"})
+    assert list(reused) == ["arrow.memory.ArrowBufBenchmarks"]
+    assert reused["arrow.memory.ArrowBufBenchmarks"]["reused_from"] == "old"
+    assert store.suites("new") == ["arrow.memory.ArrowBufBenchmarks"]
+    # Reuse carries over, and still points at the commit that was measured
+    reused = store.reusable("new", "newer", set())
+    assert reused["arrow.memory.ArrowBufBenchmarks"]["reused_from"] == "old"
+    assert store.reusable("old", "new", None) == {}
+
+
+def test_store_reusable_with_fingerprint(tmp_path):
+    store = _incremental.Store("java", root=str(tmp_path))
+    store.save("old", "arrow.vector.IntBenchmarks", [{"name": "a"}], "x")
+    store.save("old", "arrow.memory.ArrowBufBenchmarks", [{"name": "b"}], "y")
+    assert list(store.reusable("old", None, set(), "y")) == [
+        "arrow.memory.ArrowBufBenchmarks"
+    ]
+    assert len(store.reusable("old", None, set())) == 2
@@ -0,0 +1,111 @@
+import os
+import time
+
+import pytest
+
+from .. import _isolation, _publish
+
+
+class FakeConbench:
+    _run_id, _batch_id = "run", "batch"
+
+    def get_run_id(self, options):
+        return self._run_id
+
+
+class FakeBenchmark:
+    cases = []
+    isolation = None
+
+    def __init__(self):
+        self.conbench = FakeConbench()
+
+    def get_sources(self, source):
+        raise AssertionError("no sources")
+
+    def run(self, **kwargs):
+        yield {
+            "pid": os.getpid(),
+            "cores": sorted(os.sched_getaffinity(0)),
+            "isolation": self.isolation,
+            "ids": [self.conbench._run_id, self.conbench._batch_id],
+        }, "output"
+
+
+def slow_post(path, body):
+    time.sleep(0.5)
+    with open(os.environ["POSTED"], "a") as f:
+        f.write(f"{path}\n")
+
+
+class PublishingBenchmark(FakeBenchmark):
+    def run(self, **kwargs):
+        _publish.publish("/benchmark-results/", {}, slow_post)
+        yield from super().run(**kwargs)
+
+
+class FailingBenchmark(FakeBenchmark):
+    cases = [("fails",), ("works",)]
+
+    def get_cases(self, case, kwargs):
+        return self.cases
+
+    def run(self, **kwargs):
+        if kwargs["case"] == ("fails",):
+            raise ValueError("boom")
+        yield from super().run(**kwargs)
+
+
+def test_parse_cpulist():
+    assert _isolation.parse_cpulist("0-3,8") == [0, 1, 2, 3, 8]
+    assert _isolation.parse_cpulist("5\n") == [5]
+
+
+def test_core_groups():
+    assert _isolation.core_groups("", "") == [None]
+    assert _isolation.core_groups("0-1:2-3", "") == [[0, 1], [2, 3]]
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="Linux only")
+def test_run_in_pinned_worker(monkeypatch):
+    core = sorted(os.sched_getaffinity(0))[0]
+    monkeypatch.setattr(_isolation, "mode", "spawn")
+    monkeypatch.setenv("BENCHMARKS_ISOLATION", "spawn")
+    monkeypatch.setattr(_isolation, "core_groups", lambda: [[core]])
+
+    instance = FakeBenchmark()
+    instance.conbench._batch_id = "parent-batch"
+    (result, output), *rest = _isolation.run(instance, {})
+
+    assert rest == []
+    assert output is None
+    assert result["pid"] != os.getpid()
+    assert result["cores"] == [core]
+    assert result["isolation"]["start_method"] == "spawn"
+    assert result["ids"] == ["run", "parent-batch"]
+
+
+def test_workers_publish_before_exiting(monkeypatch, tmp_path):
+    # forkserver workers leave with os._exit(), which skips atexit
+    monkeypatch.setattr(_isolation, "mode", "forkserver")
+    monkeypatch.setenv("BENCHMARKS_ISOLATION", "forkserver")
+    monkeypatch.setenv("BENCHMARKS_DATA_DIR", str(tmp_path))
+    monkeypatch.setenv("POSTED", str(tmp_path / "posted"))
+
+    results = list(_isolation.run(PublishingBenchmark(), {}))
+
+    assert len(results) == 1
+    assert (tmp_path / "posted").read_text() == "/benchmark-results/\n"
+
+
+def test_failed_workers_fail_the_run(monkeypatch):
+    monkeypatch.setattr(_isolation, "mode", "spawn")
+    monkeypatch.setenv("BENCHMARKS_ISOLATION", "spawn")
+    monkeypatch.setattr(_isolation, "core_groups", lambda: [None])
+
+    results = []
+    with pytest.raises(RuntimeError, match="1 isolated worker.*fails"):
+        for result, _ in _isolation.run(FailingBenchmark(), {}):
+            results.append(result)
+    # The other cases still ran
+    assert len(results) == 1
@@ -1,8 +1,9 @@
 import copy
+import re
 
 import pytest
 
-from .. import java_micro_benchmarks
+from .. import _incremental, java_micro_benchmarks
 from ..tests import _asserts
 
 HELP = """
@@ -17,6 +18,8 @@ Options:
   --java-options TEXT      Java compiler options.
   --iterations INTEGER     Number of iterations of each benchmark.
   --commit TEXT            Arrow commit.
+  --baseline TEXT          Commit whose results to reuse for suites the changes
+                           since don't affect (see _incremental.py).
   --show-result BOOLEAN    [default: true]
   --show-output BOOLEAN    [default: false]
   --run-id TEXT            Group executions together with a run id.
@@ -28,6 +31,39 @@ Options:
 """
 
 
+SUITES = ["arrow.memory.ArrowBufBenchmarks", "arrow.vector.IntBenchmarks"]
+INT_BENCHMARKS = (
+    "java/performance/src/main/java/org/apache/arrow/vector/IntBenchmarks.java"
+)
+
+
+def _result(suite):
+    name = f"org.apache.{suite}.setZero"
+    return {"name": name, "values": [1.0], "unit": "items_per_second"}
+
+
+@pytest.fixture
+def benchmark(monkeypatch, tmp_path):
+    """A java-micro whose suites "run" without archery, recording the
+    benchmark filters they ran with."""
+    monkeypatch.delenv("ARROW_SRC", raising=False)
+    benchmark = java_micro_benchmarks.RecordJavaMicroBenchmarks()
+    benchmark.store = _incremental.Store("java", root=str(tmp_path / "results"))
+    benchmark.filters = []
+
+    def run_suites(options):
+        pattern = options.get("benchmark_filter")
+        benchmark.filters.append(pattern)
+        return {
+            suite: [_result(suite)]
+            for suite in SUITES
+            if re.search(pattern or "", _result(suite)["name"])
+        }
+
+    monkeypatch.setattr(benchmark, "_run_suites", run_suites)
+    return benchmark
+
+
 def assert_benchmark(result):
     munged = copy.deepcopy(result)
     _asserts.assert_info_and_context(munged, language="Java")
@@ -86,3 +122,59 @@ def test_java_micro():
 def test_java_micro_cli():
     command = ["conbench", "java-micro", "--help"]
     _asserts.assert_cli(command, HELP)
+
+
+def test_java_micro_reuses_unaffected_suites(benchmark, arrow_repo):
+    baseline = arrow_repo.commit({INT_BENCHMARKS: "1"})
+    fingerprint = java_micro_benchmarks.run_fingerprint({})
+    for suite in SUITES:
+        benchmark.store.save(baseline, suite, [_result(suite)], fingerprint)
+    commit = arrow_repo.commit({INT_BENCHMARKS: "2"})
+
+    results = benchmark.run(src=str(arrow_repo.path), baseline=baseline)
+    reused = [
+        (result["tags"]["suite"], result["optional_benchmark_info"].get("reused_from"))
+        for result, _ in results
+    ]
+
+    # Only the changed benchmark ran, the other suite's results are reused
+    [pattern] = benchmark.filters
+    assert re.search(pattern, _result("arrow.vector.IntBenchmarks")["name"])
+    assert not re.search(pattern, _result("arrow.memory.ArrowBufBenchmarks")["name"])
+    assert reused == [
+        ("arrow.vector.IntBenchmarks", None),
+        ("arrow.memory.ArrowBufBenchmarks", baseline),
+    ]
+    assert benchmark.store.suites(commit) == SUITES
+
+
+def test_java_micro_needs_arrow_source_to_reuse(benchmark, arrow_repo, monkeypatch):
+    baseline = arrow_repo.commit({INT_BENCHMARKS: "1"})
+    fingerprint = java_micro_benchmarks.run_fingerprint({})
+    for suite in SUITES:
+        benchmark.store.save(baseline, suite, [_result(suite)], fingerprint)
+    commit = arrow_repo.commit({INT_BENCHMARKS: "2"})
+    # Without --src, the current directory isn't taken for Arrow's
+    monkeypatch.chdir(arrow_repo.path)
+
+    results = list(benchmark.run(baseline=baseline))
+
+    assert benchmark.filters == [None]
+    assert len(results) == len(SUITES)
+    assert benchmark.store.suites(commit) == []
+
+
+def test_java_micro_reuses_results_of_the_same_options(benchmark, arrow_repo):
+    baseline = arrow_repo.commit({INT_BENCHMARKS: "1"})
+    fingerprint = java_micro_benchmarks.run_fingerprint({"iterations": 5})
+    for suite in SUITES:
+        benchmark.store.save(baseline, suite, [_result(suite)], fingerprint)
+    arrow_repo.commit({"java/README.md": "2"})
+
+    results = list(benchmark.run(src=str(arrow_repo.path), baseline=baseline))
+    assert benchmark.filters == [None]
+    assert len(results) == len(SUITES)
+
+    results = benchmark.run(src=str(arrow_repo.path), baseline=baseline, iterations=5)
+    assert all(result["optional_benchmark_info"]["reused"] for result, _ in results)
+    assert benchmark.filters == [None]
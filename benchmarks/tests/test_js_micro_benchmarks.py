@@ -1,8 +1,9 @@
 import copy
+import json
 
 import pytest
 
-from .. import js_micro_benchmarks
+from .. import _incremental, js_micro_benchmarks
 from ..tests import _asserts
 
 HELP = """
@@ -12,6 +13,9 @@ Usage: conbench js-micro [OPTIONS]
 
 Options:
   --src TEXT             Specify Arrow source directory.
+  --baseline TEXT        Commit whose results to reuse if the changes since
+                         don't affect the JavaScript benchmarks (see
+                         _incremental.py).
   --show-result BOOLEAN  [default: true]
   --show-output BOOLEAN  [default: false]
   --run-id TEXT          Group executions together with a run id.
@@ -23,6 +27,37 @@ Options:
 """
 
 
+RESULTS = [
+    {"suite": suite, "name": f"dataset: tracks, column: {column}"}
+    for suite, column in [("Parse", "lng"), ("Parse", "lat"), ("Get", "lng")]
+]
+for result in RESULTS:
+    result["details"] = {"sampleResults": [0.5]}
+
+
+@pytest.fixture
+def benchmark(monkeypatch, tmp_path):
+    """A js-micro whose `yarn perf --json` writes RESULTS, a line at a time,
+    recording the batches they're in."""
+    monkeypatch.chdir(tmp_path)  # run() changes directory
+    benchmark = js_micro_benchmarks.RecordJavaScriptMicroBenchmarks()
+    benchmark.store = _incremental.Store("js", root=str(tmp_path / "results"))
+    benchmark.commands, benchmark.batches = [], 0
+
+    def stream_command(command):
+        benchmark.commands.append(command)
+        yield "stdout", "yarn run v1\n"
+        for line in json.dumps(RESULTS, indent=1).splitlines(keepends=True):
+            yield "stderr", line
+
+    def mark_new_batch():
+        benchmark.batches += 1
+
+    monkeypatch.setattr(benchmark, "stream_command", stream_command)
+    monkeypatch.setattr(benchmark.conbench, "mark_new_batch", mark_new_batch)
+    return benchmark
+
+
 def assert_benchmark(result):
     munged = copy.deepcopy(result)
     _asserts.assert_info_and_context(munged, language="JavaScript")
@@ -81,3 +116,52 @@ def test_javascript_micro():
 def test_javascript_micro_cli():
     command = ["conbench", "js-micro", "--help"]
     _asserts.assert_cli(command, HELP)
+
+
+def test_javascript_micro_streams_results(benchmark, arrow_repo):
+    baseline = arrow_repo.commit({"js/src/table.ts": "1"})
+    benchmark.store.save(baseline, "Parse", RESULTS[:2])
+    commit = arrow_repo.commit({"js/src/table.ts": "2"})
+
+    results = benchmark.run(src=str(arrow_repo.path), baseline=baseline)
+    names = [result["tags"]["column"] for result, _ in results]
+
+    assert benchmark.commands == [js_micro_benchmarks.get_run_command()]
+    assert names == ["lng", "lat", "lng"]
+    # A batch per suite
+    assert benchmark.batches == 2
+    assert benchmark.store.suites(commit) == ["Get", "Parse"]
+
+
+def test_javascript_micro_reuses_unaffected_results(benchmark, arrow_repo):
+    baseline = arrow_repo.commit({"js/src/table.ts": "1"})
+    benchmark.store.save(baseline, "Parse", RESULTS[:2])
+    benchmark.store.save(baseline, "Get", RESULTS[2:])
+    commit = arrow_repo.commit({"js/test/unit/table-tests.ts": "2"})
+
+    results = list(benchmark.run(src=str(arrow_repo.path), baseline=baseline))
+
+    assert benchmark.commands == []
+    assert len(results) == len(RESULTS)
+    for result, _ in results:
+        assert result["optional_benchmark_info"]["reused_from"] == baseline
+    assert benchmark.store.suites(commit) == ["Get", "Parse"]
+
+
+def test_javascript_micro_needs_arrow_source_to_reuse(
+    benchmark, arrow_repo, monkeypatch
+):
+    monkeypatch.delenv("ARROW_SRC", raising=False)
+    baseline = arrow_repo.commit({"js/src/table.ts": "1"})
+    benchmark.store.save(baseline, "Parse", RESULTS[:2])
+    benchmark.store.save(baseline, "Get", RESULTS[2:])
+    commit = arrow_repo.commit({"js/test/unit/table-tests.ts": "2"})
+    # Without --src, the current directory isn't taken for Arrow's
+    monkeypatch.chdir(arrow_repo.path)
+
+    results = list(benchmark.run(baseline=baseline))
+
+    assert benchmark.commands == [js_micro_benchmarks.get_run_command()]
+    assert len(results) == len(RESULTS)
+    assert not any(result["optional_benchmark_info"] for result, _ in results)
+    assert benchmark.store.suites(commit) == []
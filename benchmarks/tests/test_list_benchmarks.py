@@ -42,6 +42,23 @@ def test_list():
     assert actual == expected
 
 
+def test_list_memory_pools(monkeypatch):
+    monkeypatch.setenv("BENCHMARKS_MEMORY_POOLS", "jemalloc,System")
+    classes = {"simple": _example_benchmarks.SimpleBenchmark}
+    actual = _benchmark.BenchmarkList().list(classes)
+    expected = [
+        {
+            "command": "simple --iterations=3 --drop-caches=true --memory-pool=jemalloc",
+            "flags": {"language": "Python", "memory_pool": "jemalloc"},
+        },
+        {
+            "command": "simple --iterations=3 --drop-caches=true --memory-pool=system",
+            "flags": {"language": "Python", "memory_pool": "system"},
+        },
+    ]
+    assert actual == expected
+
+
 def test_list_cli():
     command = ["conbench", "list"]
 
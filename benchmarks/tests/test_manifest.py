@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+from .. import _manifest
+
+
+@pytest.fixture
+def data(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"a,b\n1,2\n")
+    return str(path), str(tmp_path / ".checksums.json")
+
+
+def test_verify(data):
+    path, cache_path = data
+    expected = _manifest.describe(path, cache_path)
+    assert expected == {
+        "size": 8,
+        "sha256": "492d5ea496056f1a6a6592241032fab764c321596317930b4fa0e1e8bc3b7470",
+    }
+    _manifest.verify(path, expected, cache_path)
+
+
+def test_verify_truncated(data):
+    path, cache_path = data
+    expected = _manifest.describe(path, cache_path)
+    with open(path, "wb") as f:
+        f.write(b"a,b\n")
+    with pytest.raises(_manifest.IntegrityError, match="partial download"):
+        _manifest.verify(path, expected, cache_path)
+
+
+def test_verify_modified(data):
+    path, cache_path = data
+    expected = _manifest.describe(path, cache_path)
+    with open(path, "wb") as f:
+        f.write(b"a,b\n3,4\n")
+    with pytest.raises(_manifest.IntegrityError, match="SHA-256"):
+        _manifest.verify(path, expected, cache_path)
+
+
+def test_checksum_is_cached(data, monkeypatch):
+    path, cache_path = data
+    calls = []
+    sha256sum = _manifest.sha256sum
+    monkeypatch.setattr(
+        _manifest, "sha256sum", lambda p: calls.append(p) or sha256sum(p)
+    )
+
+    first = _manifest.checksum(path, cache_path)
+    assert _manifest.checksum(path, cache_path) == first
+    assert len(calls) == 1
+
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert _manifest.checksum(path, cache_path) == first
+    assert len(calls) == 2
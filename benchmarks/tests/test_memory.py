@@ -0,0 +1,37 @@
+import os
+
+import pyarrow
+import pytest
+
+from .. import _memory, _timing
+
+
+def test_memory_probe_records_each_iteration():
+    probe = _memory.MemoryProbe()
+    kept = []
+
+    def allocate():
+        kept.append(pyarrow.array(range(100_000)))
+
+    timer = _timing.Timer(iterations=2, adaptive=False, probes=[probe])
+    timer.run(allocate)
+
+    memory = timer.info()["memory"]
+    assert memory["backend"] == pyarrow.default_memory_pool().backend_name
+    assert len(memory["peak_rss"]) == 2
+    assert all(rss > 0 for rss in memory["peak_rss"])
+    assert memory["allocated_bytes"][0] >= 100_000 * 8
+    assert memory["max_memory"][1] >= memory["allocated_bytes"][0]
+
+
+def test_use_pool(monkeypatch):
+    monkeypatch.delenv("ARROW_DEFAULT_MEMORY_POOL", raising=False)
+    default = pyarrow.default_memory_pool()
+    try:
+        assert _memory.use_pool("System") == "system"
+        assert pyarrow.default_memory_pool().backend_name == "system"
+        assert os.environ["ARROW_DEFAULT_MEMORY_POOL"] == "system"
+        with pytest.raises(ValueError):
+            _memory.use_pool("tcmalloc")
+    finally:
+        pyarrow.set_memory_pool(default)
@@ -0,0 +1,49 @@
+import os
+import threading
+import time
+
+from .. import _parallel
+
+
+class Result:
+    optional_benchmark_info = None
+
+
+def test_split():
+    suites = ["arrow-acero-hash-join-benchmark", "arrow-bit-util-benchmark"]
+    assert _parallel.split(suites) == (
+        ["arrow-acero-hash-join-benchmark"],
+        ["arrow-bit-util-benchmark"],
+    )
+    assert _parallel.split(suites, pattern="^$") == ([], suites)
+
+
+def test_mark():
+    [pinned] = _parallel.mark([Result()], [2, 3])
+    assert pinned.optional_benchmark_info == {
+        "isolation": {"cores": [2, 3], "exclusive": False}
+    }
+    [alone] = _parallel.mark([Result()], None)
+    assert alone.optional_benchmark_info["isolation"] == {
+        "cores": sorted(os.sched_getaffinity(0)),
+        "exclusive": True,
+    }
+
+
+def test_run_uses_each_core_group_once_at_a_time():
+    running, overlaps, lock = set(), [], threading.Lock()
+
+    def run_suite(suite, cores):
+        with lock:
+            overlaps.append(tuple(cores) in running)
+            running.add(tuple(cores))
+        time.sleep(0.01)
+        with lock:
+            running.remove(tuple(cores))
+        return suite, cores
+
+    suites = [f"suite-{i}" for i in range(8)]
+    results = list(_parallel.run(suites, run_suite, groups=[[0], [1], [2]]))
+    assert sorted(suite for suite, _ in results) == suites
+    assert {tuple(cores) for _, cores in results} == {(0,), (1,), (2,)}
+    assert not any(overlaps)
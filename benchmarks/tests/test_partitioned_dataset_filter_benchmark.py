@@ -27,6 +27,8 @@ Options:
   --iterations INTEGER            [default: 1]
   --drop-caches BOOLEAN           [default: false]
   --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
   --show-result BOOLEAN           [default: true]
   --show-output BOOLEAN           [default: false]
   --run-id TEXT                   Group executions together with a run id.
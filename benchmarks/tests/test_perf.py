@@ -0,0 +1,86 @@
+import errno
+import queue
+import threading
+
+import pytest
+
+from .. import _perf
+
+
+def test_probe_counts_each_iteration():
+    probe = _perf.PerfProbe(["page_faults", "context_switches"])
+    for size in (1, 64 * 1024 * 1024):
+        probe.start()
+        bytearray(size)
+        probe.stop()
+    info = probe.info()["perf"]
+    if "page_faults" in info["unavailable"]:
+        pytest.skip(f"can't count page faults: {info['unavailable']}")
+    assert len(info["page_faults"]) == 2
+    # Zeroing 64MB touches thousands of pages
+    assert info["page_faults"][1] > 1000 > info["page_faults"][0]
+
+
+def test_unavailable_counters_are_left_out(monkeypatch):
+    def open_counter(name, tid, user_only=False):
+        if name == "cycles":
+            raise OSError(errno.ENOENT, "No such file or directory")
+        if not user_only:
+            raise OSError(errno.EACCES, "Permission denied")
+        raise OSError(errno.ENOSYS, "Function not implemented")
+
+    monkeypatch.setattr(_perf, "open_counter", open_counter)
+    probe = _perf.PerfProbe(["cycles", "instructions"])
+    probe.start()
+    probe.stop()
+    assert probe.info() == {
+        "perf": {
+            "user_only": [],
+            "unavailable": {
+                "cycles": "No such file or directory",
+                "instructions": "Function not implemented",
+            },
+        }
+    }
+
+
+def test_threads_are_counted_once():
+    class Worker(threading.Thread):
+        """Allocates 64MB each time it's asked to."""
+
+        def __init__(self):
+            super().__init__()
+            self.requests, self.done = queue.Queue(), queue.Queue()
+            self.start()
+
+        def run(self):
+            while self.requests.get():
+                bytearray(64 * 1024 * 1024)
+                self.done.put(True)
+
+        def work(self):
+            self.requests.put(True)
+            self.done.get()
+
+    # One thread from before the first iteration, and one started during it,
+    # the way Arrow starts its thread pools
+    workers = [Worker()]
+    probe = _perf.PerfProbe(["page_faults"])
+    try:
+        for i in range(3):
+            probe.start()
+            if i == 0:
+                workers.append(Worker())
+            for worker in workers:
+                worker.work()
+            probe.stop()
+    finally:
+        for worker in workers:
+            worker.requests.put(False)
+            worker.join()
+
+    info = probe.info()["perf"]
+    if "page_faults" in info["unavailable"]:
+        pytest.skip(f"can't count page faults: {info['unavailable']}")
+    first, *others = info["page_faults"]
+    assert all(0.8 < count / first < 1.2 for count in others), info["page_faults"]
@@ -0,0 +1,29 @@
+import time
+
+from .. import _profile
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampler():
+    with _profile.Sampler(interval=0.001) as sampler:
+        busy(0.1)
+    lines = sampler.collapsed().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert "busy (test_profile.py:" in stack.split(";")[-1]
+    assert "test_sampler (test_profile.py:" in stack
+    assert int(count) > 0
+
+
+def test_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(_profile.shutil, "which", lambda name: None)
+    path = _profile.profile(lambda: busy(0.05), "file-read", str(tmp_path))
+    assert path.startswith(str(tmp_path / "file-read-"))
+    assert path.endswith(".collapsed.txt")
+    with open(path) as f:
+        assert "busy (test_profile.py:" in f.read()
@@ -0,0 +1,92 @@
+import http.server
+import json
+import os
+import threading
+
+import pytest
+from benchclients import ConbenchClient
+
+from .. import _publish
+
+
+class StubConbench(http.server.BaseHTTPRequestHandler):
+    """Accepts benchmark results, except "bad" ones, unless `down` is set."""
+
+    received = []
+    down = False
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.down:
+            self.send_response(503)
+        elif "bad" in json.loads(body):
+            self.send_response(400)
+        else:
+            self.received.append((self.path, json.loads(body)))
+            self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def conbench():
+    StubConbench.received, StubConbench.down = [], False
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubConbench)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    yield ConbenchClient(url=f"http://{host}:{port}", default_retry_for_seconds=1)
+    server.shutdown()
+
+
+def test_publish_in_background(conbench, tmp_path):
+    publisher = _publish.Publisher(conbench.post, spool_dir=str(tmp_path))
+    for i in range(5):
+        publisher.publish("/benchmark-results/", {"i": i})
+    publisher.close()
+
+    assert StubConbench.received == [
+        ("/api/benchmark-results/", {"i": i}) for i in range(5)
+    ]
+    assert publisher.posted == 5
+    assert os.listdir(tmp_path) == []
+
+
+def test_spooled_results_are_replayed(conbench, tmp_path):
+    StubConbench.down = True
+    publisher = _publish.Publisher(conbench.post, spool_dir=str(tmp_path))
+    publisher.publish("/benchmark-results/", {"i": 0})
+    publisher.publish("/benchmark-results/", {"i": 1})
+    publisher.close()
+    assert publisher.failed
+    assert len(_publish.Spool(publisher.spool.path).read()) == 2
+
+    StubConbench.down = False
+    publisher = _publish.Publisher(conbench.post, spool_dir=str(tmp_path))
+    publisher.publish("/benchmark-results/", {"i": 2})
+    publisher.close()
+
+    assert [body["i"] for _, body in StubConbench.received] == [0, 1, 2]
+    assert os.listdir(tmp_path) == []
+
+
+def test_rejected_results_are_set_aside(conbench, tmp_path):
+    spool = _publish.Spool(str(tmp_path / "1-left-behind.jsonl"))
+    for i, body in enumerate([{"i": 0}, {"bad": True}, {"i": 1}]):
+        spool.append({"id": str(i), "path": "/benchmark-results/", "body": body})
+
+    for i in (2, 3):
+        publisher = _publish.Publisher(conbench.post, spool_dir=str(tmp_path))
+        publisher.publish("/benchmark-results/", {"i": i})
+        publisher.close()
+        assert not publisher.failed
+
+    assert [body["i"] for _, body in StubConbench.received] == [0, 1, 2, 3]
+    rejected = os.listdir(tmp_path / "rejected")
+    assert len(rejected) == 1
+    records = _publish.Spool(str(tmp_path / "rejected" / rejected[0])).read()
+    assert [record["body"] for record in records] == [{"bad": True}]
+    assert os.listdir(tmp_path) == ["rejected"]
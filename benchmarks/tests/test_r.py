@@ -0,0 +1,77 @@
+import shutil
+
+import pytest
+
+from .. import _r
+from . import _asserts
+
+requires_r = pytest.mark.skipif(shutil.which("R") is None, reason="R not installed")
+
+
+def test_run_one():
+    params = {"cpu_count": None, "format": "native", "scale_factor": 1}
+    assert _r.run_one("tpc_h", params) == (
+        'library(arrowbench); run_one(tpc_h, cpu_count=NULL, format="native", '
+        "scale_factor=1)"
+    )
+
+
+def test_run_benchmark():
+    grid = [
+        {"cpu_count": None, "memory_map": False, "query_id": 1},
+        {"cpu_count": None, "memory_map": False, "query_id": 2},
+    ]
+    assert _r.run_benchmark("tpc_h", grid, n_iter=3) == (
+        "library(arrowbench); run_benchmark(tpc_h, params = data.frame("
+        "memory_map = c(FALSE, FALSE), query_id = c(1, 2), "
+        "stringsAsFactors = FALSE), n_iter = 3)"
+    )
+    assert _r.run_benchmark("tpc_h", grid, drop_caches=True).endswith(
+        'n_iter = 1, drop_caches = "iteration")'
+    )
+    grid[0]["cpu_count"] = 4
+    with pytest.raises(ValueError, match="cpu_count"):
+        _r.run_benchmark("tpc_h", grid)
+
+
+def test_matches():
+    result = {"tags": {"query_id": 2, "scale_factor": 1.0, "memory_map": False}}
+    assert _r.matches(result, {"query_id": 2, "scale_factor": 1, "cpu_count": None})
+    assert _r.matches(result, {"memory_map": False, "format": "native"})
+    assert not _r.matches(result, {"query_id": 1, "scale_factor": 1})
+    # Nothing to tell cases apart by, so results are taken in order
+    assert _r.matches(result, {"cpu_count": None})
+    assert _r.matches({"tags": {}}, {"query_id": 1})
+
+
+@requires_r
+def test_session_runs_commands():
+    session = _r.RSession()
+    try:
+        assert session.execute("x <- 41; x + 1") == ("[1] 42", "")
+        # State persists between commands
+        assert session.execute("cat(x)")[0] == "41"
+        assert _asserts.R_CLI in session.execute("x", quiet=False)[0]
+    finally:
+        session.close()
+
+
+@requires_r
+def test_session_survives_errors():
+    session = _r.RSession()
+    try:
+        with pytest.raises(_r.RSessionError, match="boom"):
+            session.execute("stop('boom')")
+        assert session.execute("cat('still here')")[0] == "still here"
+    finally:
+        session.close()
+
+
+@requires_r
+def test_session_is_replaced_when_startup_env_changes(monkeypatch):
+    first = _r.session()
+    assert _r.session() is first
+    monkeypatch.setenv("ARROW_IO_THREADS", "3")
+    second = _r.session()
+    assert second is not first
+    assert not first.alive
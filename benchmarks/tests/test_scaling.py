@@ -0,0 +1,85 @@
+import json
+import subprocess
+
+import pytest
+
+from .. import _scaling
+
+
+def _result(cpu_count, io_thread_count, median, **tags):
+    return {
+        "tags": {
+            "name": "file-read",
+            "cpu_count": cpu_count,
+            "io_thread_count": io_thread_count,
+            **tags,
+        },
+        "stats": {"median": f"{median:.6f}"},
+    }
+
+
+def test_thread_counts():
+    assert _scaling.thread_counts(1) == [1]
+    assert _scaling.thread_counts(8) == [1, 2, 4, 8]
+    assert _scaling.thread_counts(12) == [1, 2, 4, 8, 12]
+
+
+def test_parse_results():
+    results = [_result(1, 1, 2.0), _result(2, 1, 1.0)]
+    stdout = "\n".join(
+        f"Benchmark result:\n{json.dumps(r, indent=4)}\n" for r in results
+    )
+    assert _scaling.parse_results("not json {\n" + stdout) == results
+
+
+def test_curves():
+    results = [
+        _result(4, 1, 1.0, file_type="parquet"),
+        _result(1, 1, 4.0, file_type="parquet"),
+        _result(2, 1, 2.5, file_type="parquet"),
+        _result(1, 1, 3.0, file_type="feather"),
+        {"tags": {"name": "file-read", "cpu_count": 8}, "error": {}},
+    ]
+    report = _scaling.curves(results)
+    assert [case["tags"]["file_type"] for case in report] == ["parquet", "feather"]
+
+    points = report[0]["points"]
+    assert [p["cpu_count"] for p in points] == [1, 2, 4]
+    assert [p["speedup"] for p in points] == [1.0, 1.6, 4.0]
+    assert [p["efficiency"] for p in points] == [1.0, 0.8, 1.0]
+
+
+def test_curves_from_more_than_one_thread():
+    results = [_result(4, 4, 2.0), _result(8, 8, 1.25)]
+    [case] = _scaling.curves(results)
+    assert [p["speedup"] for p in case["points"]] == [1.0, 1.6]
+    assert [p["efficiency"] for p in case["points"]] == [1.0, 0.8]
+
+
+def test_sweep_goes_on_after_a_failed_point(monkeypatch, tmp_path, capsys):
+    def run(command, capture_output):
+        cpu_count = int(command[-4].split("=")[1])
+        stdout = json.dumps(_result(cpu_count, 1, 4.0 / cpu_count)).encode()
+        if cpu_count == 2:
+            return subprocess.CompletedProcess(command, 1, b"", b"out of memory\n")
+        return subprocess.CompletedProcess(command, 0, stdout, b"")
+
+    monkeypatch.setattr(subprocess, "run", run)
+    output = tmp_path / "scaling.json"
+    with pytest.raises(SystemExit, match="1 grid point"):
+        _scaling.main(
+            ["--cpu-counts=1,2,4", "--io-thread-counts=1", f"--output={output}"]
+            + ["file-read"]
+        )
+
+    report = json.loads(output.read_text())
+    [case] = report["cases"]
+    assert [p["cpu_count"] for p in case["points"]] == [1, 4]
+    assert report["failed"] == [
+        {
+            "cpu_count": 2,
+            "io_thread_count": 1,
+            "returncode": 1,
+            "stderr": "out of memory",
+        }
+    ]
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from .. import _schedule
+
+
+def _benchmark(command, **flags):
+    return {"command": command, "flags": {"language": "Python", **flags}}
+
+
+BENCHMARKS = [
+    _benchmark("a --drop-caches=true"),
+    _benchmark("b", exclusive=True),
+    _benchmark("c", cloud=True),
+    _benchmark("d", cloud=True),
+    _benchmark("e", language="R"),
+    _benchmark("f"),
+    _benchmark("g"),
+]
+
+
+def test_interference():
+    kinds = [_schedule.interference(b) for b in BENCHMARKS]
+    assert kinds == ["exclusive", "exclusive", "cloud", "cloud", "R", None, None]
+
+
+def test_estimate_defaults_to_median_of_known():
+    durations = {"a --drop-caches=true": 10, "b": 20, "c": 60}
+    costs = _schedule.estimate(BENCHMARKS, durations)
+    assert costs["c"] == 60
+    assert costs["g"] == 20
+    assert _schedule.estimate(BENCHMARKS[:1], {}) == {
+        "a --drop-caches=true": _schedule.DEFAULT_SECONDS
+    }
+
+
+def test_plan_longest_processing_time():
+    durations = {"c": 30, "d": 30, "e": 50, "f": 40, "g": 10}
+    [host] = _schedule.plan(BENCHMARKS[2:], hosts=1, lanes=2, durations=durations)
+    assert host["exclusive"] == []
+    # The cloud commands stay together in one lane
+    assert host["lanes"] == [["c", "d", "g"], ["e", "f"]]
+    assert host["estimated_seconds"] == 90
+
+
+def test_plan_hosts():
+    durations = {b["command"]: 10 for b in BENCHMARKS}
+    durations["f"] = 40
+    hosts = _schedule.plan(BENCHMARKS, hosts=2, durations=durations)
+    assert [h["lanes"] for h in hosts] == [[["f", "e"]], [["c", "d", "g"]]]
+    assert hosts[1]["exclusive"] == ["a --drop-caches=true", "b"]
+    assert [h["estimated_seconds"] for h in hosts] == [50, 50]
+
+
+def test_record_duration(tmp_path):
+    path = str(tmp_path / "durations.json")
+    _schedule.record_duration("a", 10, path)
+    _schedule.record_duration("a", 20, path)
+    assert _schedule.load_durations(path) == {"a": 15}
+
+
+def test_plan_benchmarks_json():
+    with open(_schedule.benchmarks_file) as f:
+        benchmarks = json.load(f)
+    hosts = _schedule.plan(benchmarks, hosts=3, lanes=2)
+
+    planned = [c for h in hosts for c in h["exclusive"] + sum(h["lanes"], [])]
+    assert sorted(planned) == sorted(b["command"] for b in benchmarks)
+    # Every other command drops caches, and so runs alone...
+    in_lanes = {c.split()[0] for h in hosts for lane in h["lanes"] for c in lane}
+    assert in_lanes == {"cpp-micro", "java-micro", "js-micro"}
+    # ...but the hosts share them
+    assert all(h["exclusive"] for h in hosts)
+
+
+def test_run_reports_failures_from_every_lane(monkeypatch):
+    def run_command(command, extra_args, cores=None):
+        return command != "d"
+
+    monkeypatch.setattr(_schedule, "_run_command", run_command)
+    host = {"exclusive": ["a"], "lanes": [["b", "c"], ["d"]]}
+    assert not _schedule.run(host, [[0], [1]])
+    host["lanes"][1] = ["e"]
+    assert _schedule.run(host, [[0], [1]])
+
+
+def test_hosts_run_a_shared_plan(monkeypatch, tmp_path, capsys):
+    benchmarks = tmp_path / "benchmarks.json"
+    benchmarks.write_text(json.dumps(BENCHMARKS))
+    monkeypatch.setattr(_schedule, "load_durations", lambda: {"f": 40})
+    _schedule.main(["plan", "--hosts=2", f"--benchmarks={benchmarks}"])
+    plan = tmp_path / "plan.json"
+    plan.write_text(capsys.readouterr().out)
+
+    ran = []
+    monkeypatch.setattr(
+        _schedule, "_run_command", lambda command, *args: ran.append(command) or True
+    )
+    # Durations differ on each host, which mustn't change their shares
+    for host, durations in enumerate([{}, {"g": 1000}]):
+        monkeypatch.setattr(_schedule, "load_durations", lambda: durations)
+        _schedule.main(["run", f"--plan={plan}", f"--host={host}"])
+    assert sorted(ran) == sorted(b["command"] for b in BENCHMARKS)
+
+    with pytest.raises(SystemExit, match="--plan"):
+        _schedule.main(["run", "--hosts=2", "--host=0"])
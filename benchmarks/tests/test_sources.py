@@ -0,0 +1,108 @@
+import pyarrow
+import pyarrow.dataset
+
+from .. import _sources
+
+
+def test_registry_returns_same_source():
+    registry = _sources.SourceRegistry()
+    source = registry.get("nyctaxi_sample")
+    assert registry.get("nyctaxi_sample") is source
+    assert registry.get("fanniemae_sample") is not source
+    assert (registry.hits, registry.misses) == (1, 2)
+
+
+def test_registry_reuses_cached_table():
+    registry = _sources.SourceRegistry()
+    table = registry.get("nyctaxi_sample").table
+    source = registry.get("nyctaxi_sample")
+    assert source.cached == ["table"]
+    assert source.table is table
+    assert registry.saved_seconds == source.setup_seconds["table"]
+
+
+def test_registry_evicts_least_recently_used():
+    registry = _sources.SourceRegistry(memory_budget=1)
+    nyctaxi = registry.get("nyctaxi_sample")
+    nyctaxi.dataframe
+    assert nyctaxi.cached == ["table", "dataframe"]
+    assert nyctaxi.cached_nbytes() > nyctaxi.table.nbytes
+
+    fanniemae = registry.get("fanniemae_sample")
+    assert nyctaxi.cached == []
+    fanniemae.table
+    registry.get("nyctaxi_sample")
+    assert fanniemae.cached == []
+
+
+def test_paths_are_computed_lazily():
+    store = _sources.STORE["nyctaxi_multi_parquet_s3_repartitioned"]
+    assert callable(store["paths"])
+    paths = _sources.Source("nyctaxi_multi_parquet_s3_repartitioned").paths
+    assert len(paths) == 12625
+    assert paths[0] == "ursa-labs-taxi-data-repartitioned-10k/2009/01/0000/data.parquet"
+    assert not any("/2010/03/" in path or "/2019/07/" in path for path in paths)
+
+
+def test_partition_paths():
+    assert _sources.partition_paths([2009], 2, 1) == [
+        "2009/01/0000/data.parquet",
+        "2009/02/0000/data.parquet",
+    ]
+    assert _sources.partition_paths([2009], 1, 2, flavor="hive") == [
+        "year=2009/month=1/part=0/data.parquet",
+        "year=2009/month=1/part=1/data.parquet",
+    ]
+
+
+def test_create_partitioned():
+    source = _sources.Source("nyctaxi_repartitioned_sample_hive")
+    path = source.create_partitioned()
+    assert source.create_partitioned() == path
+    assert (path / "year=2011" / "month=12" / "part=3" / "data.parquet").exists()
+
+    dataset = pyarrow.dataset.dataset(
+        str(path), format="parquet", partitioning=source.partitioning()
+    )
+    assert len(dataset.files) == 3 * 12 * 4
+    year, part = pyarrow.dataset.field("year"), pyarrow.dataset.field("part")
+    table = dataset.to_table(filter=(year == 2011) & (part == 2))
+    assert table.num_rows == 12 * 100
+
+
+def test_canonical_format_ipc(monkeypatch):
+    parquet_table = _sources.Source("nyctaxi_sample").table
+
+    monkeypatch.setattr(_sources, "canonical_format", "ipc")
+    allocated = pyarrow.total_allocated_bytes()
+    source = _sources.Source("nyctaxi_sample")
+    table = source.table
+
+    assert table.equals(parquet_table)
+    # Memory mapped, rather than read into Arrow's memory pool
+    assert pyarrow.total_allocated_bytes() - allocated < table.nbytes / 10
+
+
+def test_unpinned_sources_are_reported(monkeypatch, caplog):
+    source = _sources.Source("nyctaxi_sample")
+    source.verify()
+    assert "manifest.json" not in caplog.text
+
+    monkeypatch.setattr(_sources.Source, "manifest", {})
+    source.verify()
+    assert "1 file(s) of nyctaxi_sample" in caplog.text
+    assert "nyctaxi_sample.csv" in caplog.text
+
+
+def test_unpinned_files_are_reported_once(monkeypatch, caplog, tmp_path):
+    paths = [str(tmp_path / f"part-{i}.parquet") for i in range(100)]
+    for path in paths:
+        open(path, "w").close()
+    monkeypatch.setattr(_sources.Source, "manifest", {})
+    monkeypatch.setattr(_sources.Source, "source_paths", paths)
+
+    source = _sources.Source("nyctaxi_sample")
+    caplog.clear()
+    source.verify()
+    [record] = [r for r in caplog.records if "manifest.json" in r.getMessage()]
+    assert "100 file(s)" in record.getMessage()
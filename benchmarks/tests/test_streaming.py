@@ -0,0 +1,50 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from .. import _streaming
+
+
+def test_stream_command():
+    command = ["sh", "-c", "echo a; echo b >&2; echo c"]
+    lines = list(_streaming.stream_command(command))
+    assert [line for name, line in lines if name == "stdout"] == ["a\n", "c\n"]
+    assert [line for name, line in lines if name == "stderr"] == ["b\n"]
+
+
+def test_stream_command_keeps_a_tail_of_failures():
+    command = ["sh", "-c", "for i in 1 2 3 4; do echo $i; done; exit 3"]
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        list(_streaming.stream_command(command, tail=2))
+    assert error.value.returncode == 3
+    assert error.value.stdout == "3\n4\n"
+
+
+def test_stream_command_yields_lines_as_they_are_written():
+    script = "import sys, time; print('first', flush=True); time.sleep(30)"
+    lines = _streaming.stream_command([sys.executable, "-c", script])
+    # Long before the child exits; closing the generator kills it
+    assert next(lines) == ("stdout", "first\n")
+    lines.close()
+
+
+@pytest.mark.parametrize("size", [1, 3, 10, 1000])
+def test_json_array_parser(size):
+    items = [{"suite": "Parse", "ms": [1, 2]}, {"suite": "Get", "name": "]["}, 3, "x"]
+    text = f"yarn noise\n{json.dumps(items, indent=2)}\n"
+    parser = _streaming.JSONArrayParser()
+    parsed = []
+    for start in range(0, len(text), size):
+        parsed += parser.feed(text[start:][:size])
+    assert parsed == items
+    assert parser.done
+
+
+def test_json_array_parser_yields_complete_items_only():
+    parser = _streaming.JSONArrayParser()
+    assert parser.feed('[{"a": 1}, {"b":') == [{"a": 1}]
+    assert parser.feed(" 2}, 1") == [{"b": 2}]
+    assert parser.feed("2]") == [12]
+    assert parser.done
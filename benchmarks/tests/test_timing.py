@@ -0,0 +1,63 @@
+import itertools
+
+import pytest
+
+from .. import _timing
+
+
+def test_median_ci():
+    assert _timing.median_ci([1, 2, 3, 4, 5]) is None
+    assert _timing.median_ci([1, 2, 3, 4, 5, 6]) == (1, 6)
+    times = list(range(100))
+    low, high = _timing.median_ci(times)
+    assert low < 49.5 < high
+    assert (low, high) == (39, 60)
+    assert _timing.median_ci(times, confidence=0.5) == (46, 53)
+
+
+def test_warmup_count():
+    assert _timing.warmup_count([1.0]) == 0
+    assert _timing.warmup_count([1.0, 1.01, 0.99, 1.0]) == 0
+    assert _timing.warmup_count([5.0, 2.0, 1.0, 1.01, 0.99, 1.0]) == 2
+    assert _timing.warmup_count([9.0, 9.0, 9.0] + [1.0] * 6) == 3
+    # Never more than half
+    assert _timing.warmup_count([9.0, 1.0]) == 1
+
+
+def test_fixed_timer():
+    calls = itertools.count()
+    timer = _timing.Timer(iterations=3, adaptive=False)
+    data, output = timer.run(lambda: next(calls))
+    assert len(data) == 3
+    assert output == 2
+    info = timer.info()
+    assert info["timing"] == "fixed"
+    assert info["iterations_run"] == 3
+    assert info["median_ci"] is None
+
+
+def test_adaptive_timer_stops_once_converged(monkeypatch):
+    # A clock that ticks once a call, so that every iteration takes the
+    # same time, however busy the machine is
+    clock = itertools.count()
+    monkeypatch.setattr(_timing.time, "monotonic", lambda: next(clock))
+    timer = _timing.Timer(iterations=2, adaptive=True, min_time=0, target=1.0)
+    data, _ = timer.run(lambda: None)
+    # The first iteration with a 95% confidence interval
+    assert len(data) == 6
+    assert timer.info()["converged"]
+
+
+def test_adaptive_timer_respects_max_iterations():
+    timer = _timing.Timer(
+        iterations=1, adaptive=True, min_time=0, target=0, max_iterations=10
+    )
+    timer.run(lambda: None)
+    info = timer.info()
+    assert info["iterations_run"] == 10
+    assert not info["converged"]
+
+
+def test_timer_rejects_no_iterations():
+    with pytest.raises(ValueError):
+        _timing.Timer(iterations=0)
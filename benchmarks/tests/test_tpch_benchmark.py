@@ -1,9 +1,11 @@
 import copy
+import json
+import weakref
 
 import conbenchlegacy.runner
 import pytest
 
-from .. import tpch_benchmark
+from .. import _r, tpch_benchmark
 from ..tests import _asserts
 
 HELP = """
@@ -70,6 +72,132 @@ Options:
   --iterations INTEGER            [default: 1]
   --drop-caches BOOLEAN           [default: false]
   --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
+  --show-result BOOLEAN           [default: true]
+  --show-output BOOLEAN           [default: false]
+  --run-id TEXT                   Group executions together with a run id.
+  --run-name TEXT                 Free-text name of run (commit ABC, pull
+                                  request 123, etc).
+  --run-reason TEXT               Low-cardinality reason for run (commit, pull
+                                  request, manual, etc).
+  --help                          Show this message and exit.
+"""
+
+HELP_PYTHON = """
+Usage: conbench tpch-python [OPTIONS]
+
+  Run tpch-python benchmark(s).
+
+  For each benchmark option, the first option value is the default.
+
+  Valid benchmark combinations:
+  --query-id=1 --scale-factor=1 --format=native
+  --query-id=1 --scale-factor=1 --format=parquet
+  --query-id=1 --scale-factor=10 --format=native
+  --query-id=1 --scale-factor=10 --format=parquet
+  --query-id=2 --scale-factor=1 --format=native
+  --query-id=2 --scale-factor=1 --format=parquet
+  --query-id=2 --scale-factor=10 --format=native
+  --query-id=2 --scale-factor=10 --format=parquet
+  --query-id=3 --scale-factor=1 --format=native
+  --query-id=3 --scale-factor=1 --format=parquet
+  --query-id=3 --scale-factor=10 --format=native
+  --query-id=3 --scale-factor=10 --format=parquet
+  --query-id=4 --scale-factor=1 --format=native
+  --query-id=4 --scale-factor=1 --format=parquet
+  --query-id=4 --scale-factor=10 --format=native
+  --query-id=4 --scale-factor=10 --format=parquet
+  --query-id=5 --scale-factor=1 --format=native
+  --query-id=5 --scale-factor=1 --format=parquet
+  --query-id=5 --scale-factor=10 --format=native
+  --query-id=5 --scale-factor=10 --format=parquet
+  --query-id=6 --scale-factor=1 --format=native
+  --query-id=6 --scale-factor=1 --format=parquet
+  --query-id=6 --scale-factor=10 --format=native
+  --query-id=6 --scale-factor=10 --format=parquet
+  --query-id=7 --scale-factor=1 --format=native
+  --query-id=7 --scale-factor=1 --format=parquet
+  --query-id=7 --scale-factor=10 --format=native
+  --query-id=7 --scale-factor=10 --format=parquet
+  --query-id=8 --scale-factor=1 --format=native
+  --query-id=8 --scale-factor=1 --format=parquet
+  --query-id=8 --scale-factor=10 --format=native
+  --query-id=8 --scale-factor=10 --format=parquet
+  --query-id=9 --scale-factor=1 --format=native
+  --query-id=9 --scale-factor=1 --format=parquet
+  --query-id=9 --scale-factor=10 --format=native
+  --query-id=9 --scale-factor=10 --format=parquet
+  --query-id=10 --scale-factor=1 --format=native
+  --query-id=10 --scale-factor=1 --format=parquet
+  --query-id=10 --scale-factor=10 --format=native
+  --query-id=10 --scale-factor=10 --format=parquet
+  --query-id=11 --scale-factor=1 --format=native
+  --query-id=11 --scale-factor=1 --format=parquet
+  --query-id=11 --scale-factor=10 --format=native
+  --query-id=11 --scale-factor=10 --format=parquet
+  --query-id=12 --scale-factor=1 --format=native
+  --query-id=12 --scale-factor=1 --format=parquet
+  --query-id=12 --scale-factor=10 --format=native
+  --query-id=12 --scale-factor=10 --format=parquet
+  --query-id=13 --scale-factor=1 --format=native
+  --query-id=13 --scale-factor=1 --format=parquet
+  --query-id=13 --scale-factor=10 --format=native
+  --query-id=13 --scale-factor=10 --format=parquet
+  --query-id=14 --scale-factor=1 --format=native
+  --query-id=14 --scale-factor=1 --format=parquet
+  --query-id=14 --scale-factor=10 --format=native
+  --query-id=14 --scale-factor=10 --format=parquet
+  --query-id=15 --scale-factor=1 --format=native
+  --query-id=15 --scale-factor=1 --format=parquet
+  --query-id=15 --scale-factor=10 --format=native
+  --query-id=15 --scale-factor=10 --format=parquet
+  --query-id=16 --scale-factor=1 --format=native
+  --query-id=16 --scale-factor=1 --format=parquet
+  --query-id=16 --scale-factor=10 --format=native
+  --query-id=16 --scale-factor=10 --format=parquet
+  --query-id=17 --scale-factor=1 --format=native
+  --query-id=17 --scale-factor=1 --format=parquet
+  --query-id=17 --scale-factor=10 --format=native
+  --query-id=17 --scale-factor=10 --format=parquet
+  --query-id=18 --scale-factor=1 --format=native
+  --query-id=18 --scale-factor=1 --format=parquet
+  --query-id=18 --scale-factor=10 --format=native
+  --query-id=18 --scale-factor=10 --format=parquet
+  --query-id=19 --scale-factor=1 --format=native
+  --query-id=19 --scale-factor=1 --format=parquet
+  --query-id=19 --scale-factor=10 --format=native
+  --query-id=19 --scale-factor=10 --format=parquet
+  --query-id=20 --scale-factor=1 --format=native
+  --query-id=20 --scale-factor=1 --format=parquet
+  --query-id=20 --scale-factor=10 --format=native
+  --query-id=20 --scale-factor=10 --format=parquet
+  --query-id=21 --scale-factor=1 --format=native
+  --query-id=21 --scale-factor=1 --format=parquet
+  --query-id=21 --scale-factor=10 --format=native
+  --query-id=21 --scale-factor=10 --format=parquet
+  --query-id=22 --scale-factor=1 --format=native
+  --query-id=22 --scale-factor=1 --format=parquet
+  --query-id=22 --scale-factor=10 --format=native
+  --query-id=22 --scale-factor=10 --format=parquet
+
+  To run all combinations:
+  $ conbench tpch-python --all=true
+
+Options:
+  --query-id [1|2|3|4|5|6|7|8|9|10|11|12|13|14|15|16|17|18|19|20|21|22]
+  --scale-factor [1|10]
+  --format [native|parquet]
+  --all BOOLEAN                   [default: false]
+  --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
+  --profile BOOLEAN
+  --scale-factors TEXT
+  --iterations INTEGER            [default: 1]
+  --drop-caches BOOLEAN           [default: false]
+  --gc-collect BOOLEAN            [default: true]
+  --gc-disable BOOLEAN            [default: true]
   --show-result BOOLEAN           [default: true]
   --show-output BOOLEAN           [default: false]
   --run-id TEXT                   Group executions together with a run id.
@@ -108,6 +236,39 @@ def test_benchmark_r():
     assert _asserts.R_CLI in str(output)
 
 
+@pytest.mark.parametrize("r_fails", [False, True])
+def test_benchmark_r_case_without_results(monkeypatch, tmp_path, r_fails):
+    monkeypatch.chdir(tmp_path)
+    benchmark = tpch_benchmark.TpchBenchmark()
+    monkeypatch.setattr(benchmark, "_add_r_tags_info_context", lambda *args: None)
+
+    def execute_r_command(command, quiet=True):
+        # arrowbench gets through query 1, then R stops
+        (tmp_path / "results" / "tpc_h").mkdir(parents=True)
+        result = {"tags": {"query_id": 1}, "stats": {"data": [1.0]}}
+        (tmp_path / "results" / "tpc_h" / "1.json").write_text(json.dumps(result))
+        if r_fails:
+            raise _r.RSessionError("Error: query 2 crashed")
+        return "", "Warning: query 2 crashed"
+
+    monkeypatch.setattr(benchmark.conbench, "execute_r_command", execute_r_command)
+    options = {"iterations": 1, "run_id": "some-run-id", "cpu_count": None}
+    cases = [
+        ({"query_id": query_id}, {"query_id": f"TPCH-{query_id:02d}"}, None)
+        for query_id in (1, 2)
+    ]
+    [(first, _), (second, _)] = benchmark.r_benchmarks(cases, options)
+
+    assert first["tags"]["query_id"] == "TPCH-01"
+    assert not first.get("error")
+    assert second["tags"]["query_id"] == "TPCH-02"
+    stack_trace = second["error"]["stack_trace"]
+    assert "query 2 crashed" in stack_trace
+    if r_fails:
+        assert "RSessionError" in stack_trace
+    assert "NoneType: None" not in stack_trace
+
+
 def test_cli():
     if (
         int(conbenchlegacy.runner.machine_info(None)["memory_bytes"])
@@ -117,3 +278,52 @@ def test_cli():
 
     command = ["conbench", "tpch", "--help"]
     _asserts.assert_cli(command, HELP)
+
+
+def test_benchmark_python():
+    benchmark = tpch_benchmark.TpchPythonBenchmark()
+    [(result, output)] = benchmark.run(
+        iterations=1, query_id=6, scale_factor=1, format="parquet"
+    )
+    munged = copy.deepcopy(result)
+    assert munged["tags"] == {
+        "name": "tpch-python",
+        "cpu_count": None,
+        "engine": "arrow",
+        "query_id": "TPCH-06",
+        "scale_factor": 1,
+        "format": "parquet",
+    }
+    _asserts.assert_info_and_context(munged)
+    assert output.column_names == ["revenue"]
+
+
+def test_benchmark_python_frees_tables_between_scale_factors(monkeypatch):
+    benchmark = tpch_benchmark.TpchPythonBenchmark()
+    loaded = []
+
+    class Tables(dict):
+        pass
+
+    def load_tables(scale_factor):
+        # The previous scale factor's tables are gone by now
+        assert all(ref() is None for ref in loaded)
+        tables = Tables()
+        loaded.append(weakref.ref(tables))
+        return tables
+
+    cases = [(1, 1, "native"), (2, 1, "native"), (1, 10, "native")]
+    monkeypatch.setattr(benchmark, "get_cases", lambda case, kwargs: cases)
+    monkeypatch.setattr(benchmark, "_load_tables", load_tables)
+    monkeypatch.setattr(benchmark, "benchmark", lambda f, *args: (None, None))
+    monkeypatch.setattr(tpch_benchmark, "fits_in_memory", lambda scale_factor: True)
+
+    assert len(list(benchmark.run())) == 3
+    assert len(loaded) == 2
+    # Only the scale factors pinned
+    assert len(list(benchmark.run(scale_factors="10"))) == 1
+
+
+def test_cli_python():
+    command = ["conbench", "tpch-python", "--help"]
+    _asserts.assert_cli(command, HELP_PYTHON)
@@ -0,0 +1,70 @@
+import pandas.testing
+import pyarrow.dataset
+import pytest
+
+from .. import _sources, _tpch, _tpch_queries
+from . import _tpch_reference
+
+SCALE_FACTOR = 0.01
+
+
+@pytest.fixture(scope="module")
+def tables():
+    path = _sources.tpch_dataset(SCALE_FACTOR, "parquet")
+    return {
+        name: pyarrow.dataset.dataset(path / name, format="parquet").to_table()
+        for name in _tpch.TABLES
+    }
+
+
+def test_cardinalities(tables):
+    rows = {name: table.num_rows for name, table in tables.items()}
+    assert rows["region"] == 5
+    assert rows["nation"] == 25
+    assert rows["supplier"] == 100
+    assert rows["part"] == 2000
+    assert rows["partsupp"] == 8000
+    assert rows["customer"] == 1500
+    assert rows["orders"] == 15000
+    assert 15000 <= rows["lineitem"] <= 7 * 15000
+
+
+def test_deterministic(tables):
+    again = dict(_tpch.generate(SCALE_FACTOR))
+    assert again["customer"].equals(tables["customer"])
+
+
+def test_partsupp_matches_lineitem(tables):
+    lineitem = tables["lineitem"].select(["l_partkey", "l_suppkey"])
+    partsupp = tables["partsupp"].select(["ps_partkey", "ps_suppkey"])
+    joined = lineitem.join(
+        partsupp, ["l_partkey", "l_suppkey"], ["ps_partkey", "ps_suppkey"]
+    )
+    assert joined.num_rows == lineitem.num_rows
+
+
+@pytest.fixture(scope="module")
+def frames(tables):
+    return {
+        name: table.to_pandas(date_as_object=False) for name, table in tables.items()
+    }
+
+
+@pytest.mark.parametrize("query_id", range(1, 23))
+def test_query(tables, frames, query_id):
+    def get(name, columns):
+        return tables[name].select(columns)
+
+    result = _tpch_queries.QUERIES[query_id](get, SCALE_FACTOR)
+    # No order is large enough for query 18 at this scale factor.
+    assert result.num_rows > 0 or query_id == 18
+
+    expected = _tpch_reference.QUERIES[query_id](frames, SCALE_FACTOR)
+    actual = result.to_pandas(date_as_object=False)[list(expected.columns)]
+    pandas.testing.assert_frame_equal(
+        actual.reset_index(drop=True),
+        expected.reset_index(drop=True),
+        check_dtype=False,
+        check_index_type=False,
+        rtol=1e-6,
+    )
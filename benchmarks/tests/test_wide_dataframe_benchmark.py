@@ -22,6 +22,9 @@ Options:
   --use-legacy-dataset [false]
   --all BOOLEAN                 [default: false]
   --cpu-count INTEGER
+  --io-thread-count INTEGER
+  --memory-pool TEXT
+  --profile BOOLEAN
   --iterations INTEGER          [default: 1]
   --drop-caches BOOLEAN         [default: false]
   --gc-collect BOOLEAN          [default: true]
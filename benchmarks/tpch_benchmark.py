@@ -1,6 +1,18 @@
+import functools
+import logging
+import os
+
 import conbenchlegacy.runner
+import pyarrow
+import pyarrow.dataset
+
+from benchmarks import _benchmark, _sources, _tpch, _tpch_queries
+
+log = logging.getLogger(__name__)
 
-from benchmarks import _benchmark
+# Peak memory of the most demanding queries, as a multiple of the size of
+# the dataset in memory.
+PEAK_MEMORY_FACTOR = 4
 
 
 def get_valid_cases():
@@ -29,14 +41,19 @@ class TpchBenchmark(_benchmark.BenchmarkR):
 
     def run(self, case=None, **kwargs):
         self._set_defaults(kwargs)
+        # One arrowbench call per batch, whose queries share the same data
+        batches = {}
         for case in self.get_cases(case, kwargs):
             tags = self.get_tags(kwargs)
             tags["engine"] = "arrow"
             tags["memory_map"] = False
             tags["query_id"] = f"TPCH-{case[0]:02d}"
-            self._manually_batch(kwargs, case)
-            command = self._get_r_command(kwargs, case)
-            yield self.r_benchmark(command, tags, kwargs, case)
+            params = self._get_r_params(kwargs, case)
+            batches.setdefault(tuple(case[1:]), []).append((params, tags, case))
+
+        for cases in batches.values():
+            self._manually_batch(kwargs, cases[0][2])
+            yield from self.r_benchmarks(cases, kwargs)
 
     def _set_defaults(self, options):
         options["query_id"] = int(options.get("query_id", 1))
@@ -50,14 +67,119 @@ class TpchBenchmark(_benchmark.BenchmarkR):
         batch_id = f"{run_id}-{scale_factor}{_format[0]}"
         self.conbench.manually_batch(batch_id)
 
-    def _get_r_command(self, options, case):
-        return (
-            f"library(arrowbench); "
-            f"run_one({self.r_name}, "
-            f"cpu_count={self.r_cpu_count(options)}, "
-            f"format='{case[2]}', "
-            f"scale_factor={case[1]}, "
-            f"engine='arrow', "
-            f"memory_map=FALSE, "
-            f"query_id={case[0]})"
+    def _get_r_params(self, options, case):
+        return {
+            "cpu_count": options.get("cpu_count"),
+            "format": case[2],
+            "scale_factor": case[1],
+            "engine": "arrow",
+            "memory_map": False,
+            "query_id": case[0],
+        }
+
+
+def available_memory():
+    """Memory available to the benchmark, in bytes."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    machine_info = conbenchlegacy.runner.machine_info(host_name=None)
+    return int(machine_info["memory_bytes"])
+
+
+@functools.lru_cache()
+def fits_in_memory(scale_factor):
+    required = PEAK_MEMORY_FACTOR * _tpch.bytes_per_scale_factor() * scale_factor
+    available = available_memory()
+    if required > available:
+        log.warning(
+            "skipping TPC-H scale factor %s, which needs about %s of memory (%s available)",
+            scale_factor,
+            _sources.bytes_fmt(required),
+            _sources.bytes_fmt(available),
         )
+    return required <= available
+
+
+def get_valid_python_cases():
+    result = [["query_id", "scale_factor", "format"]]
+    for query_id in range(1, 23):
+        for scale_factor in [1, 10]:
+            for _format in ["native", "parquet"]:
+                result.append([query_id, scale_factor, _format])
+    return result
+
+
+@conbenchlegacy.runner.register_benchmark
+class TpchPythonBenchmark(_benchmark.Benchmark):
+    """Run the TPC-H queries with pyarrow, on generated data (see _tpch.py).
+
+    Cases whose scale factor wouldn't fit in the memory available are
+    skipped, and --scale-factors (e.g. "1,10") limits --all=true to the
+    scale factors listed. The "native" format runs queries on tables
+    already in memory, "parquet" reads the tables from partitioned parquet
+    files as part of each query.
+    """
+
+    name = "tpch-python"
+    valid_cases = get_valid_python_cases()
+    options = {**_benchmark.Benchmark.options, "scale_factors": {"type": str}}
+
+    def run(self, case=None, **kwargs):
+        scale_factors = kwargs.get("scale_factors")
+        if scale_factors:
+            scale_factors = {float(s) for s in scale_factors.split(",")}
+        for case in self.get_cases(case, kwargs):
+            query_id, scale_factor, _format = case
+            if scale_factors and scale_factor not in scale_factors:
+                continue
+            if not fits_in_memory(scale_factor):
+                continue
+            tags = self.get_tags(kwargs)
+            tags["engine"] = "arrow"
+            tags["query_id"] = f"TPCH-{query_id:02d}"
+            f = self._get_benchmark_function(query_id, scale_factor, _format)
+            yield self.benchmark(f, tags, kwargs, case)
+            del f  # It holds on to the tables, see _tables()
+
+    def _get_benchmark_function(self, query_id, scale_factor, _format):
+        query = _tpch_queries.QUERIES[query_id]
+        if _format == "native":
+            tables = self._tables(scale_factor)
+
+            def get(name, columns):
+                return tables[name].select(columns)
+
+        else:
+            path = _sources.tpch_dataset(scale_factor, "parquet")
+
+            def get(name, columns):
+                dataset = pyarrow.dataset.dataset(
+                    os.path.join(path, name), format="parquet"
+                )
+                return dataset.to_table(columns=columns)
+
+        return lambda: query(get, scale_factor)
+
+    def _tables(self, scale_factor):
+        # Benchmark setup, shared by the cases of the same scale factor.
+        if getattr(self, "_tables_scale_factor", None) != scale_factor:
+            # Let go of the previous scale factor's tables first, so that
+            # both aren't in memory at once
+            self._tables_cache = self._tables_scale_factor = None
+            self._tables_cache = self._load_tables(scale_factor)
+            self._tables_scale_factor = scale_factor
+        return self._tables_cache
+
+    def _load_tables(self, scale_factor):
+        path = _sources.tpch_dataset(scale_factor, "feather")
+        return {
+            name: pyarrow.dataset.dataset(
+                os.path.join(path, name), format="feather"
+            ).to_table()
+            for name in _tpch.TABLES
+        }